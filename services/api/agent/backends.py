@@ -0,0 +1,148 @@
+"""
+llama.cpp backend pool for the agent
+"""
+import asyncio
+import time
+import zlib
+from typing import Any, Awaitable, Callable, List, Optional, TypeVar
+import httpx
+import openai
+
+from services.api.core.config import settings
+from services.api.utils.deadline import with_deadline
+from services.api.utils.logger import logger
+from services.api.utils.tracing import current_span, span
+
+T = TypeVar("T")
+
+# Errors meaning the replica itself is unavailable (down, restarting, loading the model)
+FAILOVER_ERRORS = (openai.APIConnectionError, openai.InternalServerError, httpx.TransportError)
+
+def record_usage(message: Any) -> None:
+    """Record a response's token usage and generation rate on the current LLM span."""
+    usage = getattr(message, "usage_metadata", None)
+    current = current_span()
+    if not usage or current is None:
+        return
+    current.set(prompt_tokens=usage.get("input_tokens"), completion_tokens=usage.get("output_tokens"))
+    if usage.get("output_tokens") and current.duration_ms:
+        current.set(tokens_per_second=round(usage["output_tokens"] / (current.duration_ms / 1000), 1))
+
+class LLMBackend:
+    """One OpenAI-compatible llama.cpp replica."""
+
+    def __init__(self, url: str):
+        self.url = url
+        self.health_url = f"{url.rstrip('/').removesuffix('/v1')}/health"
+        self.healthy = True
+        self.outstanding = 0
+        self.failures = 0
+        self.checked_at = 0.0
+
+    def stats(self) -> dict:
+        return {"url": self.url, "healthy": self.healthy, "outstanding": self.outstanding, "failures": self.failures, "checked_at": self.checked_at}
+
+class LLMBackendPool:
+    """
+    Routes LLM calls across llama.cpp replicas.
+
+    Calls go to the healthy replica with the fewest outstanding requests. Calls for
+    a thread prefer the thread's home replica (rendezvous hashing, so only threads
+    homed on a failed replica move) unless it is more than `affinity_slack`
+    requests busier than the least loaded one, keeping the thread's prompt prefix
+    in that replica's KV cache. Replicas are health-checked against /health in
+    the background; a call that fails with a connection or 5xx error marks its
+    replica unhealthy and is retried once on each other replica. Calls are
+    cancelled when the request's deadline passes, which closes the connection
+    and makes llama.cpp stop generating.
+    """
+
+    def __init__(self, urls: List[str], health_check_seconds: float, affinity_slack: int):
+        self.backends = [LLMBackend(url) for url in urls]
+        self.health_check_seconds = health_check_seconds
+        self.affinity_slack = affinity_slack
+        self._health_task: Optional[asyncio.Task] = None
+
+    def _home(self, candidates: List[LLMBackend], affinity: str) -> LLMBackend:
+        return max(candidates, key=lambda backend: zlib.crc32(f"{affinity}|{backend.url}".encode("utf-8")))
+
+    def choose(self, affinity: Optional[str] = None, exclude: Optional[set] = None) -> Optional[LLMBackend]:
+        """Pick a replica for a call, or None if every replica has been excluded."""
+        candidates = [backend for backend in self.backends if backend.url not in (exclude or set())]
+        if not candidates:
+            return None
+        # With every replica unhealthy, still try the least recently failed ones
+        candidates = [backend for backend in candidates if backend.healthy] or candidates
+        least_loaded = min(candidates, key=lambda backend: backend.outstanding)
+        if affinity is None:
+            return least_loaded
+        home = self._home(candidates, affinity)
+        return home if home.outstanding <= least_loaded.outstanding + self.affinity_slack else least_loaded
+
+    async def run(self, call: Callable[[str], Awaitable[T]], affinity: Optional[str] = None) -> T:
+        """Run `call(base_url)` on a chosen replica, failing over to the others."""
+        tried: set = set()
+        while True:
+            backend = self.choose(affinity, exclude=tried)
+            if backend is None:
+                raise RuntimeError("No LLM backend available")
+            backend.outstanding += 1
+            try:
+                with span("llm", backend=backend.url):
+                    result = await with_deadline(call(backend.url), "LLM call")
+                    record_usage(result)
+                return result
+            except FAILOVER_ERRORS as e:
+                tried.add(backend.url)
+                self.mark_unhealthy(backend, e)
+                if len(tried) == len(self.backends):
+                    raise
+            finally:
+                backend.outstanding -= 1
+
+    def mark_unhealthy(self, backend: LLMBackend, error: Exception) -> None:
+        backend.failures += 1
+        if backend.healthy:
+            logger.warning(f"LLM backend {backend.url} marked unhealthy: {type(error).__name__}: {error}")
+        backend.healthy = False
+
+    async def check_health(self) -> None:
+        """Probe every replica's /health endpoint."""
+        async with httpx.AsyncClient(timeout=2.0) as client:
+            responses = await asyncio.gather(*(client.get(backend.health_url) for backend in self.backends), return_exceptions=True)
+        for backend, response in zip(self.backends, responses):
+            backend.checked_at = time.time()
+            if isinstance(response, Exception) or response.status_code != 200:
+                self.mark_unhealthy(backend, response if isinstance(response, Exception) else RuntimeError(f"HTTP {response.status_code}"))
+            elif not backend.healthy:
+                logger.info(f"LLM backend {backend.url} is healthy again")
+                backend.healthy = True
+
+    async def _health_loop(self) -> None:
+        while True:
+            try:
+                await self.check_health()
+            except Exception as e:
+                logger.error(f"LLM health check failed: {e}")
+            await asyncio.sleep(self.health_check_seconds)
+
+    async def start(self) -> None:
+        """Start background health checks."""
+        if self._health_task is None or self._health_task.done():
+            self._health_task = asyncio.create_task(self._health_loop())
+
+    async def stop(self) -> None:
+        """Stop background health checks."""
+        if self._health_task:
+            self._health_task.cancel()
+            self._health_task = None
+
+    def stats(self) -> List[dict]:
+        return [backend.stats() for backend in self.backends]
+
+# Global LLM backend pool instance
+llm_backends = LLMBackendPool(
+    urls=settings.LLM_BASE_URLS or [settings.LLM_BASE_URL],
+    health_check_seconds=settings.LLM_HEALTH_CHECK_SECONDS,
+    affinity_slack=settings.LLM_AFFINITY_SLACK,
+)
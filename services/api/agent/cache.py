@@ -0,0 +1,242 @@
+"""
+In-process caches for the agent
+"""
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Iterator, List, Optional, Tuple
+from rapidfuzz import process, fuzz
+
+from services.api.agent.schemas import PlanResponse
+from services.api.core.config import settings
+
+class TTLCache:
+    """
+    Bounded LRU cache whose entries expire after a time-to-live.
+
+    Not thread-safe; it is only touched from the event loop.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Hashable, Tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value, or None if missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        """Store a value, evicting the least recently used entry when full."""
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def keys(self) -> Iterator[Hashable]:
+        """Iterate over keys that have not expired."""
+        now = time.monotonic()
+        return (key for key, (expires_at, _) in list(self._entries.items()) if expires_at >= now)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        """Hit/miss counters for metrics endpoints."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+# First-person pronouns mark questions about the user's own team or league
+PERSONAL_PATTERN = re.compile(r"\b(i|me|my|mine|we|us|our|ours|i'm|im|i've)\b")
+# Numbers and IDs (seasons, weeks, league and player ids)
+NUMBER_PATTERN = re.compile(r"\b\w*\d\w*\b")
+
+def normalize_question(question: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace."""
+    return " ".join(re.sub(r"[^\w\s']", " ", question.lower()).split())
+
+def question_signature(question: str) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    """Named entities (in order) and numbers/IDs, which must match exactly for two questions to share an answer."""
+    return tuple(entity.lower() for entity in extract_entities(question)), tuple(NUMBER_PATTERN.findall(question.lower()))
+
+class AnswerCache:
+    """
+    Near-duplicate cache of gatekeeper direct answers.
+
+    Questions only match when their named entities (in order) and numbers/IDs
+    are identical; the rest of the normalized question is then matched fuzzily
+    with an order-sensitive scorer (rapidfuzz ratio), so "Allen vs Mahomes" never
+    reuses "Mahomes vs Allen" and week 5 never reuses week 6. Only context-free
+    questions, asked as the first message of a thread without first-person
+    references, numbers or IDs, are shared globally; anything about the user's
+    own team or league, or that follows earlier turns, is cached under its thread
+    so it is never served to another user.
+    """
+
+    def __init__(self, max_entries: int, global_ttl_seconds: float, thread_ttl_seconds: float, min_similarity: float):
+        self.global_ttl_seconds = global_ttl_seconds
+        self.thread_ttl_seconds = thread_ttl_seconds
+        self.min_similarity = min_similarity
+        self.cache = TTLCache(max_entries=max_entries, ttl_seconds=global_ttl_seconds)
+
+    @staticmethod
+    def scope(question: str, thread_id: str, has_history: bool) -> str:
+        """Cache scope for a question: "global" or the thread it belongs to."""
+        if has_history or PERSONAL_PATTERN.search(normalize_question(question)) or NUMBER_PATTERN.search(question):
+            return f"thread:{thread_id}"
+        return "global"
+
+    def get(self, question: str, scope: str) -> Optional[str]:
+        """Return the cached answer of the closest matching question in scope."""
+        key, signature = normalize_question(question), question_signature(question)
+        answer = self.cache.get((scope, signature, key))
+        if answer is not None:
+            return answer
+
+        candidates = [
+            cached_key
+            for cached_scope, cached_signature, cached_key in self.cache.keys()
+            if cached_scope == scope and cached_signature == signature
+        ]
+        match = process.extractOne(key, candidates, scorer=fuzz.ratio, score_cutoff=self.min_similarity) if candidates else None
+        if match is None:
+            return None
+        # The exact lookup above already counted a miss; reclassify it as a hit
+        self.cache.misses -= 1
+        return self.cache.get((scope, signature, match[0]))
+
+    def set(self, question: str, scope: str, answer: str) -> None:
+        ttl = self.global_ttl_seconds if scope == "global" else self.thread_ttl_seconds
+        self.cache.set((scope, question_signature(question), normalize_question(question)), answer, ttl_seconds=ttl)
+
+    def stats(self) -> dict:
+        return self.cache.stats()
+
+# Global gatekeeper answer cache instance
+answer_cache = AnswerCache(
+    max_entries=settings.ANSWER_CACHE_MAX_ENTRIES,
+    global_ttl_seconds=settings.ANSWER_CACHE_TTL_SECONDS,
+    thread_ttl_seconds=settings.ANSWER_CACHE_THREAD_TTL_SECONDS,
+    min_similarity=settings.ANSWER_CACHE_MIN_SIMILARITY,
+)
+
+# Capitalized word runs (player and team names) and numbers fill a question template's slots
+ENTITY_PATTERN = re.compile(r"[A-Z][\w'.-]*(?:\s+[A-Z][\w'.-]*)*|\b\d+(?:\.\d+)?\b")
+SLOT_PATTERN = re.compile(r"\{slot(\d+)\}")
+# Capitalized words that shape the research rather than name what it is about
+TEMPLATE_WORDS = {
+    "i", "qb", "rb", "wr", "te", "k", "dst", "def", "flex", "ppr", "half", "nfl", "sleeper", "dynasty", "keeper",
+    "who", "what", "which", "when", "where", "why", "how", "should", "would", "will", "can", "could", "is", "are",
+    "do", "does", "compare", "evaluate", "analyze", "rank", "trade", "start", "sit", "find", "show", "get", "give",
+    "tell", "list", "please", "hey", "hi",
+}
+
+def extract_entities(question: str) -> List[str]:
+    """
+    Entity mentions in a question, in order of first appearance.
+
+    Template words at either end of a capitalized run ("Should I", "Compare
+    Patrick Mahomes") are trimmed off, so only the names remain.
+    """
+    entities: List[str] = []
+    for match in ENTITY_PATTERN.finditer(question):
+        words = match.group(0).split()
+        while words and words[0].lower() in TEMPLATE_WORDS:
+            words.pop(0)
+        while words and words[-1].lower() in TEMPLATE_WORDS:
+            words.pop()
+        text = " ".join(words)
+        if text and text not in entities:
+            entities.append(text)
+    return entities
+
+def canonicalize_question(question: str) -> Tuple[str, List[str]]:
+    """Normalized question template with entities replaced by numbered slots, and the entities."""
+    entities = extract_entities(question)
+    template = question
+    for index, entity in sorted(enumerate(entities), key=lambda item: -len(item[1])):
+        template = re.sub(rf"(?<!\w){re.escape(entity)}(?!\w)", f" slot{index} ", template)
+    return normalize_question(template), entities
+
+class PlanCache:
+    """
+    Cache of planner plans keyed by question template and tool catalog version.
+
+    Entity mentions in the subtasks are stored as slots and refilled with the new
+    question's entities, so "compare Mahomes and Allen" reuses the plan made for
+    "compare Burrow and Herbert". Plans that mention an entity in a form that
+    cannot be slotted (e.g. only a surname) are not cached. A plan made without
+    earlier turns is shared; one made with history is kept to its thread. A new
+    tool catalog version changes every key, so stale plans are never reused.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float, thread_ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self.thread_ttl_seconds = thread_ttl_seconds
+        self.cache = TTLCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+
+    @staticmethod
+    def scope(thread_id: str, has_history: bool) -> str:
+        """Cache scope for a plan: "global" or the thread it belongs to."""
+        return f"thread:{thread_id}" if has_history else "global"
+
+    def get(self, question: str, scope: str, catalog_version: str) -> Optional[PlanResponse]:
+        """Return a new plan from the question's cached template, with its entities filled in."""
+        template, entities = canonicalize_question(question)
+        cached = self.cache.get((scope, catalog_version, template))
+        if cached is None:
+            return None
+        subtasks, depends_on = cached
+        return PlanResponse(
+            subtasks=[SLOT_PATTERN.sub(lambda match: entities[int(match.group(1))], subtask) for subtask in subtasks],
+            depends_on=depends_on,
+        )
+
+    def set(self, question: str, scope: str, catalog_version: str, plan: PlanResponse) -> bool:
+        """Store a plan as a template; returns False if its subtasks could not be slotted."""
+        template, entities = canonicalize_question(question)
+        slotted = []
+        for subtask in plan.subtasks:
+            if SLOT_PATTERN.search(subtask):
+                return False
+            for index, entity in sorted(enumerate(entities), key=lambda item: -len(item[1])):
+                subtask = re.sub(rf"(?<!\w){re.escape(entity)}(?!\w)", f"{{slot{index}}}", subtask)
+            slotted.append(subtask)
+
+        # A leftover part of an entity (a surname, a bare first name) would go stale on reuse
+        remainder = SLOT_PATTERN.sub(" ", " ".join(slotted))
+        if any(re.search(rf"(?<!\w){re.escape(word)}(?!\w)", remainder) for entity in entities for word in entity.split()):
+            return False
+
+        ttl = self.ttl_seconds if scope == "global" else self.thread_ttl_seconds
+        self.cache.set((scope, catalog_version, template), (slotted, plan.depends_on), ttl_seconds=ttl)
+        return True
+
+    def stats(self) -> dict:
+        return self.cache.stats()
+
+# Global planner plan cache instance
+plan_cache = PlanCache(
+    max_entries=settings.PLAN_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.PLAN_CACHE_TTL_SECONDS,
+    thread_ttl_seconds=settings.PLAN_CACHE_THREAD_TTL_SECONDS,
+)
@@ -0,0 +1,140 @@
+"""
+MCP tool catalog for the agent
+"""
+import asyncio
+import hashlib
+import time
+from typing import Any, List, Optional
+from fastmcp.client import Client
+
+from services.api.agent.retrieval import BM25Index
+from services.api.agent.tokens import estimate_tokens
+from services.api.core.config import settings
+from services.api.utils.deadline import with_deadline
+from services.api.utils.logger import logger
+from services.api.utils.tracing import span
+
+NO_TOOLS_TEXT = "No tools available."
+
+def render_tool(tool: Any) -> str:
+    """Render a single tool as a prompt line, collapsing docstring indentation."""
+    name = getattr(tool, "name", "Unknown")
+    description = " ".join((getattr(tool, "description", None) or "No description").split())
+    parameters = list((getattr(tool, "inputSchema", None) or {}).get("properties", {}).keys())
+    return f"- {name}({', '.join(parameters)}): {description}"
+
+def render_tools(tools: List[Any]) -> str:
+    """Render tools as the prompt's tool section."""
+    if not tools:
+        return NO_TOOLS_TEXT
+    return "\n".join(render_tool(tool) for tool in tools)
+
+class ToolCatalog:
+    """
+    Cached view of the MCP server's tools.
+
+    Tools are loaded asynchronously at startup and refreshed in the background:
+    every `ttl_seconds` while healthy, and with exponential backoff after a failed
+    load (keeping the last good catalog meanwhile). The rendered prompt text and
+    its token count are computed once per refresh, so nodes read plain attributes.
+    A BM25 index over tool names and docstrings lets nodes inject only the tools
+    relevant to the current question, keeping prompts flat as the toolset grows.
+    """
+
+    def __init__(self, url: str, ttl_seconds: float, retry_seconds: float, max_backoff_seconds: float):
+        self.url = url
+        self.ttl_seconds = ttl_seconds
+        self.retry_seconds = retry_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.tools: List[Any] = []
+        self.tool_lines: List[str] = []
+        self.index: BM25Index = BM25Index([])
+        self.rendered: str = NO_TOOLS_TEXT
+        self.token_count: int = estimate_tokens(NO_TOOLS_TEXT)
+        self.version: str = ""
+        self.loaded_at: float = 0.0
+        self._failures = 0
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    async def load(self) -> bool:
+        """Fetch the tool list from the MCP server and swap it in."""
+        try:
+            async with Client(self.url) as client:
+                tools = await client.list_tools()
+        except Exception as e:
+            self._failures += 1
+            logger.error(f"Failed to load tools from MCP at {self.url} (attempt {self._failures}): {e}")
+            return False
+
+        self.set_tools(tools)
+        logger.info(f"Loaded {len(tools)} tools from MCP (version {self.version})")
+        return True
+
+    def set_tools(self, tools: List[Any]) -> None:
+        """Swap in a new tool list and precompute its prompt rendering."""
+        rendered = render_tools(tools)
+        self.tools = list(tools)
+        self.tool_lines = [render_tool(tool) for tool in tools]
+        self.index = BM25Index([f"{getattr(tool, 'name', '')} {getattr(tool, 'description', None) or ''}" for tool in tools])
+        self.rendered = rendered
+        self.token_count = estimate_tokens(rendered)
+        self.version = hashlib.sha1(rendered.encode("utf-8")).hexdigest()[:12]
+        self.loaded_at = time.time()
+        self._failures = 0
+
+    async def call(self, name: str, arguments: dict) -> Any:
+        """Call a tool on the MCP server and return its structured (or text) result, within the request's deadline."""
+        async def call_tool() -> Any:
+            async with Client(self.url) as client:
+                return await client.call_tool(name, arguments)
+
+        with span("mcp.tool", tool=name):
+            result = await with_deadline(call_tool(), f"MCP tool {name}")
+        if result.structured_content is not None:
+            return result.structured_content
+        if result.data is not None:
+            return result.data
+        return "\n".join(getattr(block, "text", "") for block in result.content)
+
+    def select(self, query: str, k: int) -> str:
+        """
+        Render the k tools most relevant to the query.
+
+        Selected tools keep their catalog order rather than score order, so similar
+        questions produce identical tool sections and keep the cached prompt prefix.
+        """
+        if len(self.tool_lines) <= k:
+            return self.rendered
+        selected = sorted(self.index.top_k(query, k))
+        return "\n".join(self.tool_lines[index] for index in selected)
+
+    def next_refresh_delay(self) -> float:
+        """Seconds until the next refresh: the TTL when healthy, backoff after failures."""
+        if not self._failures:
+            return self.ttl_seconds
+        return min(self.retry_seconds * 2 ** (self._failures - 1), self.max_backoff_seconds)
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.next_refresh_delay())
+            await self.load()
+
+    async def start(self) -> None:
+        """Load the catalog and start the background refresh task."""
+        await self.load()
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self) -> None:
+        """Stop the background refresh task."""
+        if self._refresh_task:
+            self._refresh_task.cancel()
+            self._refresh_task = None
+
+# Global tool catalog instance
+tool_catalog = ToolCatalog(
+    url=f"{settings.MCP_BASE_URL.rstrip('/')}/mcp",
+    ttl_seconds=settings.MCP_CATALOG_TTL_SECONDS,
+    retry_seconds=settings.MCP_CATALOG_RETRY_SECONDS,
+    max_backoff_seconds=settings.MCP_CATALOG_MAX_BACKOFF_SECONDS,
+)
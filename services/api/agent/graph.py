@@ -4,27 +4,33 @@ Lox Genie's Agent Graph
 from langgraph.graph import StateGraph
 from langgraph.graph import START, END
 from services.api.agent.schemas import AgentState
+from services.api.agent.nodes.triage import triage, after_triage
 from services.api.agent.nodes.gatekeeper import gatekeeper, after_gatekeeper
 from services.api.agent.nodes.human_in_loop import human_in_loop
 from services.api.agent.nodes.executor import executor
 from services.api.agent.nodes.planner import planner
 from services.api.agent.config import Configuration
+from services.api.redis.checkpointer import redis_checkpointer
+from services.api.utils.tracing import traced
 
 # Build Lox Genie's Agent Graph
 builder = StateGraph(AgentState, config_schema=Configuration)
 
-# Nodes
-builder.add_node("gatekeeper", gatekeeper)
-builder.add_node("human_in_loop", human_in_loop)
-builder.add_node("planner", planner)
-builder.add_node("executor", executor)
+# Nodes (each traced as a span)
+builder.add_node("triage", traced("node.triage")(triage))
+builder.add_node("gatekeeper", traced("node.gatekeeper")(gatekeeper))
+builder.add_node("human_in_loop", traced("node.human_in_loop")(human_in_loop))
+builder.add_node("planner", traced("node.planner")(planner))
+builder.add_node("executor", traced("node.executor")(executor))
 
 # Edges
-builder.add_edge(START, "gatekeeper")
+builder.add_edge(START, "triage")
+builder.add_conditional_edges("triage", after_triage, ["gatekeeper", END])
 # builder.add_conditional_edges("gatekeeper", after_gatekeeper)
 # builder.add_edge("human_in_loop", "gatekeeper")
 # builder.add_edge("planner", "executor")
 # builder.add_edge("executor", END)
 builder.add_edge("gatekeeper", END)
 
-graph = builder.compile(name="lox-genie-agent")
\ No newline at end of file
+# Checkpointed per thread, so interrupts (human_in_loop) can be resumed
+graph = builder.compile(name="lox-genie-agent", checkpointer=redis_checkpointer)
\ No newline at end of file
@@ -0,0 +1,96 @@
+"""
+LLM client registry for the agent
+"""
+import zlib
+from functools import lru_cache
+from typing import Any, Optional, Type
+from pydantic import BaseModel
+from langchain_core.runnables import Runnable
+from langchain_openai import ChatOpenAI
+from langgraph.config import get_stream_writer
+
+from services.api.agent.structured import GrammarStructuredLLM
+from services.api.core.config import settings
+from services.api.utils.tracing import current_span
+
+def get_slot_id(thread_id: str) -> int:
+    """
+    Pin a thread to one of the llama.cpp server's parallel slots.
+
+    A slot keeps the KV cache of its last prompt, so sending a thread's follow-up
+    turns to the same slot means only the newly appended tokens are prefilled.
+    """
+    return zlib.crc32(thread_id.encode("utf-8")) % max(settings.LLM_PARALLEL_SLOTS, 1)
+
+@lru_cache(maxsize=None)
+def get_llm(model: str, temperature: float, base_url: str = settings.LLM_BASE_URL, max_tokens: Optional[int] = None, slot: Optional[int] = None) -> ChatOpenAI:
+    """
+    Get a shared ChatOpenAI client for (model, temperature, base_url, slot).
+
+    Each ChatOpenAI owns its own OpenAI/HTTP client, so building one per node call
+    pays connection setup to the llama.cpp server on every turn. Clients are
+    stateless between requests and safe to share across concurrent requests.
+    Without a slot, llama.cpp picks the slot whose cached prompt matches best.
+    """
+    extra_body = {"cache_prompt": True}
+    if slot is not None:
+        extra_body["id_slot"] = slot
+    return ChatOpenAI(
+        base_url=base_url,
+        api_key="not-needed",  # llama.cpp doesn't require API key
+        model=model,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        stream_usage=True,
+        extra_body=extra_body,
+    )
+
+@lru_cache(maxsize=None)
+def get_structured_llm(model: str, temperature: float, schema: Type[BaseModel], base_url: str = settings.LLM_BASE_URL, slot: Optional[int] = None) -> Runnable | GrammarStructuredLLM:
+    """
+    Get a shared structured-output runnable for a response schema.
+
+    In "json_schema" mode (LLM_STRUCTURED_OUTPUT) the schema is enforced by a
+    llama.cpp grammar and parsed directly; "function_calling" uses LangChain's
+    tool-calling structured output instead. Completions are capped at
+    LLM_RESPONSE_TOKENS, the share of the context that prompts leave for them.
+    """
+    llm = get_llm(model, temperature, base_url, max_tokens=settings.LLM_RESPONSE_TOKENS, slot=slot)
+    if settings.LLM_STRUCTURED_OUTPUT == "json_schema":
+        return GrammarStructuredLLM(llm, schema, retries=settings.LLM_STRUCTURED_RETRIES)
+    return llm.with_structured_output(schema)
+
+def write_stream_event(event: dict) -> None:
+    """Write an event to the graph's custom stream, if running inside a streamed graph."""
+    try:
+        writer = get_stream_writer()
+    except RuntimeError:
+        return
+    writer(event)
+
+async def ainvoke_streaming(structured_llm: Runnable | GrammarStructuredLLM, prompt: Any, field: str = "response") -> BaseModel:
+    """
+    Invoke a structured LLM while forwarding a text field token-by-token.
+
+    Partial structured outputs are diffed on `field` and each new suffix is written
+    to the graph's custom stream as a token event. Outside a graph run (e.g. the
+    /agents debug routes) there is no stream writer and this is a plain ainvoke.
+    """
+    try:
+        writer = get_stream_writer()
+    except RuntimeError:
+        return await structured_llm.ainvoke(prompt)
+
+    result, streamed = None, ""
+    async for partial in structured_llm.astream(prompt):
+        if result is None and (current := current_span()) is not None:
+            current.set(ttft_ms=round(current.duration_ms, 1))
+        result = partial
+        text = partial.get(field) if isinstance(partial, dict) else getattr(partial, field, None)
+        if isinstance(text, str) and len(text) > len(streamed) and text.startswith(streamed):
+            writer({"event": "token", "content": text[len(streamed):]})
+            streamed = text
+
+    if result is None:
+        raise ValueError("Structured LLM stream ended without output")
+    return result
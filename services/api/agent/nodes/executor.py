@@ -1,42 +1,111 @@
 """
 Executor node for the agent
 """
-import os
-import uuid
-from langchain_openai import ChatOpenAI
+import asyncio
+import json
+import time
 from langchain_core.runnables import RunnableConfig
 
+from services.api.agent.backends import llm_backends
+from services.api.agent.catalog import tool_catalog
 from services.api.agent.config import Configuration
-from services.api.agent.schemas import AgentState, ToolExecutorResponse
-from services.api.agent.utils import get_current_date, update_state, get_mcp_tools_formatted
+from services.api.agent.llm import get_structured_llm
+from services.api.agent.scheduler import llm_scheduler
+from services.api.agent.schemas import AgentState, ToolExecutorResponse, ToolMemoEntry, ToolSelection
+from services.api.agent.tokens import PromptSection, fit_prompt
+from services.api.agent.utils import get_current_date, update_state, get_mcp_tools_formatted, normalize_dependencies, tool_memo_key, get_fresh_tool_memo, memoize_tool_response
 from services.api.agent.prompts.executor import prompt
 from services.api.core.config import settings
+from services.api.utils.deadline import DeadlineExceededError
+from services.api.utils.logger import logger
 
-def executor(state: AgentState, config: RunnableConfig) -> AgentState:
+async def executor(state: AgentState, config: RunnableConfig) -> AgentState:
+    """
+    Executor node that:
+    1. Runs the latest plan's subtasks concurrently, bounded by EXECUTOR_MAX_CONCURRENCY
+    2. Starts each subtask as soon as the subtasks it depends on have finished
+    3. Calls the selected MCP tools, serving repeated calls from the thread's tool memo
+    4. Records the tool executions on the state in plan order
+    """
+    if not state.plan or not state.plan[-1].subtasks:
+        return state
 
-    # Initialize the executor model and LLM instance
+    # Resolve the node configuration. Subtasks are not pinned to the thread's slot
+    # or replica, since llama.cpp would serialize them on it.
     configuration = Configuration.from_runnable_config(config)
-    llm = ChatOpenAI(
-        base_url=settings.LLM_BASE_URL,
-        api_key="not-needed",  # llama.cpp doesn't require API key
-        model=configuration.executor_model,
-        temperature=0.0
-    )
-    structured_llm = llm.with_structured_output(ToolExecutorResponse)
+
+    plan = state.plan[-1]
+    dependencies = normalize_dependencies(len(plan.subtasks), plan.depends_on)
+    semaphore = asyncio.Semaphore(settings.EXECUTOR_MAX_CONCURRENCY)
+    results: dict[int, ToolExecutorResponse] = {}
+    tasks: dict[int, asyncio.Task] = {}
+    tool_tasks: dict[str, asyncio.Task] = {}
+
+    async def call_tool(key: str, tool: str, parameters: dict) -> object:
+        tool_response = await tool_catalog.call(tool, parameters)
+        memoize_tool_response(state, key, ToolMemoEntry(tool=tool, parameters=parameters, tool_response=tool_response, fetched_at=time.time()))
+        return tool_response
+
+    async def run_subtask(index: int) -> None:
+        # Dependencies always point at earlier subtasks, whose tasks already exist
+        await asyncio.gather(*(tasks[dep] for dep in dependencies[index]))
+        dependency_results = [results[dep].model_dump(include={"tool", "parameters", "tool_response"}) for dep in dependencies[index] if dep in results]
+
+        async with semaphore:
+            sections = [
+                PromptSection(name="task", text=plan.subtasks[index], priority=0, required=True),
+                PromptSection(name="tools", text=get_mcp_tools_formatted(plan.subtasks[index]), priority=1),
+                PromptSection(name="dependencies", text=json.dumps(dependency_results, default=str) if dependency_results else "None", priority=2),
+            ]
+            formatted_prompt = fit_prompt(prompt, sections, "executor", current_date=get_current_date())
+            try:
+                async with llm_scheduler.slot("interactive"):
+                    selection = await llm_backends.run(
+                        lambda base_url: get_structured_llm(configuration.executor_model, 0.0, ToolSelection, base_url=base_url).ainvoke(formatted_prompt)
+                    )
+            except DeadlineExceededError:
+                raise
+            except Exception as e:
+                logger.error(f"Error in executor subtask {index}: {type(e).__name__}: {str(e)}", exc_info=True)
+                return
+
+        # The model only selects the tool; the execution fields are filled in here
+        result = ToolExecutorResponse(plan_id=plan.plan_id, tool=selection.tool, parameters=selection.parameters)
+
+        # Serve the call from the memo when fresh; identical calls in this plan share one request
+        key = tool_memo_key(result.tool, result.parameters)
+        entry = get_fresh_tool_memo(state, key)
+        if entry is not None:
+            result.tool_response, result.cached = entry.tool_response, True
+        else:
+            if key not in tool_tasks:
+                tool_tasks[key] = asyncio.create_task(call_tool(key, result.tool, result.parameters))
+            result.cached = False
+            try:
+                result.tool_response = await tool_tasks[key]
+            except DeadlineExceededError:
+                raise
+            except Exception as e:
+                logger.error(f"Error calling tool {result.tool} for subtask {index}: {type(e).__name__}: {str(e)}")
+                result.tool_response = {"error": str(e)}
+
+        results[index] = result
 
     # Run inference on each subtask and add to the state
-    for subtask in state.plan[-1].subtasks:
-        formatted_prompt = prompt.format(
-            current_date=get_current_date(),
-            tools=get_mcp_tools_formatted(),
-            task=subtask
-        )
-        result = structured_llm.invoke(formatted_prompt)
-        
-        result.plan_id = state.plan[-1].plan_id
-        result.tool_id = str(uuid.uuid4())
-        state.tool_calls.append(result)
+    for index in range(len(plan.subtasks)):
+        tasks[index] = asyncio.create_task(run_subtask(index))
+    try:
+        await asyncio.gather(*tasks.values())
+    finally:
+        # On a failure (e.g. the deadline) stop the sibling subtasks and tool calls,
+        # so they release their semaphore and scheduler slots
+        pending = [task for task in (*tasks.values(), *tool_tasks.values()) if not task.done()]
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+    state.tool_calls.extend(results[index] for index in sorted(results))
 
     # Update the state with the result
-    state = update_state(state=state, result=result, agent="executor")
-    return state
\ No newline at end of file
+    state = update_state(state=state, result=plan, agent="executor")
+    return state
@@ -1,49 +1,66 @@
 """
 Gatekeeper node for the agent
 """
+import time
 from langchain_core.runnables import RunnableConfig
-from langchain_openai import ChatOpenAI
 from langgraph.graph import END
 
+from services.api.agent.cache import answer_cache
 from services.api.agent.config import Configuration
+from services.api.agent.llm import get_structured_llm, get_slot_id, ainvoke_streaming, write_stream_event
+from services.api.agent.routing import model_router
+from services.api.agent.scheduler import llm_scheduler
 from services.api.agent.schemas import AgentState, GatekeeperResponse
-from services.api.agent.utils import get_current_date, update_state, get_mcp_tools_formatted
+from services.api.agent.utils import update_state
+from services.api.agent.prompts.assembly import assemble_prompt
 from services.api.agent.prompts.gatekeeper import prompt
-from services.api.core.config import settings
+from services.api.utils.deadline import DeadlineExceededError
 from services.api.utils.logger import logger
 
-def gatekeeper(state: AgentState, config: RunnableConfig) -> AgentState:
+async def gatekeeper(state: AgentState, config: RunnableConfig) -> AgentState:
     """
     Gatekeeper node that can:
     1. Answer simple queries directly
     2. Route to the research planner
     3. Request clarification via human-in-the-loop
+
+    Direct answers are cached, so near-identical questions skip inference.
+    Complex questions are routed to the large model when load allows.
     """
-    
-    # Initialize the model and LLM instance
+    question = state.messages[-1].content
+    cache_scope = answer_cache.scope(question, state.thread_id, has_history=len(state.messages) > 1)
+    cached_answer = answer_cache.get(question, cache_scope)
+    if cached_answer is not None:
+        logger.info(f"Gatekeeper answer cache hit ({cache_scope})")
+        write_stream_event({"event": "token", "content": cached_answer})
+        return update_state(state, GatekeeperResponse(action="direct_answer", response=cached_answer), "gatekeeper")
+
+    # Resolve the node configuration
     configuration = Configuration.from_runnable_config(config)
-    llm = ChatOpenAI(
-        base_url=settings.LLM_BASE_URL,
-        api_key="not-needed",  # llama.cpp doesn't require API key
-        model=configuration.gatekeeper_agent_model,
-        temperature=0.7
-    )
 
-    # Format the prompt
-    formatted_prompt = prompt.format(
-        current_date=get_current_date(),
-        tools=get_mcp_tools_formatted(),
-        messages=state.messages[:-1],
-        question=state.messages[-1].content,
-    )
+    # Assemble the prompt (stable sections first for prompt cache reuse)
+    formatted_prompt = assemble_prompt(prompt, state, "gatekeeper")
 
     # Invoke the LLM and parse the JSON response
     result = None
     try:
-        # Create structured LLM, invoke the endpoint, and update state
-        structured_llm = llm.with_structured_output(GatekeeperResponse) 
-        result = structured_llm.invoke(formatted_prompt)
+        # Get the shared structured LLM on the thread's replica, stream the answer tokens, and update state
+        slot = get_slot_id(state.thread_id)
+        route = model_router.route(question, configuration.gatekeeper_agent_model)
+        async with llm_scheduler.slot("interactive"):
+            # Service time only: the router already scales it by the queue
+            started = time.monotonic()
+            result = await route.backends.run(
+                lambda base_url: ainvoke_streaming(get_structured_llm(route.model, 0.7, GatekeeperResponse, base_url=base_url, slot=slot), formatted_prompt),
+                affinity=state.thread_id,
+            )
+            model_router.observe(route, time.monotonic() - started)
         state = update_state(state, result, "gatekeeper")
+        state.messages[-1].additional_kwargs["model"] = route.model
+        if result.action == "direct_answer":
+            answer_cache.set(question, cache_scope, result.response)
+    except DeadlineExceededError:
+        raise
     except Exception as e:
         logger.error(f"Error in gatekeeper node: {type(e).__name__}: {str(e)}", exc_info=True)
         result = GatekeeperResponse(
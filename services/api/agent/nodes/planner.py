@@ -1,47 +1,65 @@
 """
 Planner node for the agent
 """
+import time
 from langchain_core.runnables import RunnableConfig
-from langchain_openai import ChatOpenAI
 
+from services.api.agent.cache import plan_cache
+from services.api.agent.catalog import tool_catalog
 from services.api.agent.config import Configuration
+from services.api.agent.llm import get_structured_llm, get_slot_id
+from services.api.agent.routing import model_router
+from services.api.agent.scheduler import llm_scheduler
 from services.api.agent.schemas import AgentState, PlanResponse
-from services.api.agent.utils import get_current_date, update_state, get_mcp_tools_formatted
+from services.api.agent.utils import update_state
+from services.api.agent.prompts.assembly import assemble_prompt
 from services.api.agent.prompts.planner import prompt
-from services.api.core.config import settings
+from services.api.utils.deadline import DeadlineExceededError
 from services.api.utils.logger import logger
 
-def planner(state: AgentState, config: RunnableConfig) -> AgentState:
+async def planner(state: AgentState, config: RunnableConfig) -> AgentState:
     """
     Planner node that can:
     1. Plan the trajectory of the agent
     2. Update the state with the result
+
+    Plans are cached by question template, so repeated research shapes reuse a
+    plan with the new question's entities filled in instead of calling the LLM.
+    Complex questions are planned by the large model when load allows.
     """
-    
-    # Initialize the planning model and LLM instance
+    question = state.messages[-1].content
+    cache_scope = plan_cache.scope(state.thread_id, has_history=len(state.messages) > 1)
+    cached_plan = plan_cache.get(question, cache_scope, tool_catalog.version)
+    if cached_plan is not None:
+        logger.info(f"Planner plan cache hit ({cache_scope})")
+        return update_state(state, cached_plan, "planner")
+
+    # Resolve the node configuration
     configuration = Configuration.from_runnable_config(config)
-    llm = ChatOpenAI(
-        base_url=settings.LLM_BASE_URL,
-        api_key="not-needed",  # llama.cpp doesn't require API key
-        model=configuration.planning_agent_model,
-        temperature=0.5,
-    )
 
-    # Format the prompt
-    formatted_prompt = prompt.format(
-        current_date=get_current_date(),
-        tools=get_mcp_tools_formatted(),
-        messages=state.messages[:-1],
-        question=state.messages[-1].content,
-    )
+    # Assemble the prompt (stable sections first for prompt cache reuse)
+    formatted_prompt = assemble_prompt(prompt, state, "planner")
 
     # Invoke the LLM and parse the JSON response
     result = None
     try:
-        # Create structured LLM, invoke the endpoint, and update state
-        structured_llm = llm.with_structured_output(PlanResponse) 
-        result = structured_llm.invoke(formatted_prompt)
+        # Get the shared structured LLM on the thread's replica, invoke the endpoint, and update state
+        slot = get_slot_id(state.thread_id)
+        route = model_router.route(question, configuration.planning_agent_model)
+        async with llm_scheduler.slot("interactive"):
+            # Service time only: the router already scales it by the queue
+            started = time.monotonic()
+            result = await route.backends.run(
+                lambda base_url: get_structured_llm(route.model, 0.5, PlanResponse, base_url=base_url, slot=slot).ainvoke(formatted_prompt),
+                affinity=state.thread_id,
+            )
+            model_router.observe(route, time.monotonic() - started)
         state = update_state(state, result, "planner")
+        state.messages[-1].additional_kwargs["model"] = route.model
+        if result.subtasks:
+            plan_cache.set(question, cache_scope, tool_catalog.version, result)
+    except DeadlineExceededError:
+        raise
     except Exception as e:
         logger.error(f"Error in planner node: {type(e).__name__}: {str(e)}", exc_info=True)
         result = PlanResponse(
@@ -1,60 +1,50 @@
-# from langchain_core.runnables import RunnableConfig
-# from langchain_core.messages import AIMessage
-# from langgraph.graph import StateGraph
-# from langgraph.graph import START, END
-
-# from langchain_google_genai import ChatGoogleGenerativeAI
-# from services.api.core.config import settings
-# from services.api.agent.prompts import get_current_date, get_research_topic, query_writer_instructions, answer_instructions
-# from services.api.models.chat import SearchQueryList
-# from services.api.models.chat import OverallState, QueryGenerationState
-# from services.api.models.chat import Configuration
-# from services.api.api.graph.state import AgentState
-
-# def finalize_answer(state: AgentState, config: RunnableConfig):
-
-#     """LangGraph node that finalizes the research summary.
-
-#     Prepares the final output by deduplicating and formatting sources, then
-#     combining them with the running summary to create a well-structured
-#     research report with proper citations.
-
-#     Args:
-#         state: Current graph state containing the running summary and sources gathered
-
-#     Returns:
-#         Dictionary with state update, including running_summary key containing the formatted final summary with sources
-#     """
-#     configurable = Configuration.from_runnable_config(config)
-#     reasoning_model = state.get("reasoning_model") or configurable.answer_model
-
-#     # Format the prompt
-#     current_date = get_current_date()
-#     formatted_prompt = answer_instructions.format(
-#         current_date=current_date,
-#         research_topic=get_research_topic(state["messages"]),
-#         summaries="\n---\n\n".join(state["web_research_result"]),
-#     )
-
-#     # init Reasoning Model, default to Gemini 2.5 Flash
-#     llm = ChatGoogleGenerativeAI(
-#         model=reasoning_model,
-#         temperature=0,
-#         max_retries=2,
-#         api_key=os.getenv("GEMINI_API_KEY"),
-#     )
-#     result = llm.invoke(formatted_prompt)
-
-#     # Replace the short urls with the original urls and add all used urls to the sources_gathered
-#     unique_sources = []
-#     for source in state["sources_gathered"]:
-#         if source["short_url"] in result.content:
-#             result.content = result.content.replace(
-#                 source["short_url"], source["value"]
-#             )
-#             unique_sources.append(source)
-
-#     return {
-#         "messages": [AIMessage(content=result.content)],
-#         "sources_gathered": unique_sources,
-#     }
\ No newline at end of file
+"""
+Summarize node for the agent
+"""
+from langchain_core.runnables import RunnableConfig
+
+from services.api.agent.backends import llm_backends
+from services.api.agent.config import Configuration
+from services.api.agent.llm import get_llm
+from services.api.agent.scheduler import llm_scheduler
+from services.api.agent.schemas import AgentState, Context
+from services.api.agent.prompts.assembly import render_history
+from services.api.agent.prompts.summarize import prompt
+from services.api.agent.tokens import PromptSection, fit_prompt
+from services.api.core.config import settings
+from services.api.utils.logger import logger
+
+async def summarize(state: AgentState, config: RunnableConfig) -> AgentState:
+    """
+    Summarize node that folds older messages into the thread's reduced context.
+
+    The last CONTEXT_VERBATIM_MESSAGES messages stay verbatim in node prompts; older
+    ones are merged into the rolling summary once at least SUMMARIZE_MIN_NEW_MESSAGES
+    have accumulated, so each message is summarized once. Runs after the response
+    has been returned, never on the request's critical path, on the background lane.
+    """
+    covered = state.reduced_context.covered
+    fold_until = len(state.messages) - settings.CONTEXT_VERBATIM_MESSAGES
+    if fold_until - covered < settings.SUMMARIZE_MIN_NEW_MESSAGES:
+        return state
+
+    # Resolve the node configuration. The summary call is not pinned to the
+    # thread's slot, which would evict the thread's cached chat prompt.
+    configuration = Configuration.from_runnable_config(config)
+
+    sections = [
+        PromptSection(name="summary", text=state.reduced_context.context or "No summary yet.", priority=0),
+        PromptSection(name="messages", text=render_history(state.messages[covered:fold_until]), priority=1),
+    ]
+    formatted_prompt = fit_prompt(prompt, sections, "summarize", max_words=settings.SUMMARY_MAX_WORDS)
+    try:
+        async with llm_scheduler.slot("background"):
+            result = await llm_backends.run(
+                lambda base_url: get_llm(configuration.summarizer_model, 0.0, base_url=base_url, max_tokens=settings.SUMMARY_MAX_TOKENS).ainvoke(formatted_prompt)
+            )
+    except Exception as e:
+        logger.error(f"Error in summarize node: {type(e).__name__}: {str(e)}", exc_info=True)
+        return state
+
+    state.reduced_context = Context(context=str(result.content).strip(), covered=fold_until)
+    return state
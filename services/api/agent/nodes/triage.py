@@ -0,0 +1,57 @@
+"""
+Triage node for the agent
+"""
+from langgraph.graph import END
+
+from services.api.agent.classifier import classify_message
+from services.api.agent.llm import write_stream_event
+from services.api.agent.schemas import AgentState, GatekeeperResponse
+from services.api.agent.utils import update_state
+from services.api.core.config import settings
+from services.api.utils.logger import logger
+
+TEMPLATE_RESPONSES = {
+    "empty": GatekeeperResponse(
+        action="clarification_needed",
+        response="Looks like that message came through empty. What fantasy football question can I help with?",
+    ),
+    "greeting": GatekeeperResponse(
+        action="direct_answer",
+        response="Hey! I'm Lox Genie, your fantasy football consultant. Ask me about start/sit calls, trades, waivers or your league.",
+    ),
+    "off_topic": GatekeeperResponse(
+        action="direct_answer",
+        response="I stick to fantasy football, so I'll have to pass on that one. Got a lineup, trade or waiver question for me?",
+    ),
+}
+
+def triage(state: AgentState) -> AgentState:
+    """
+    Triage node that answers trivial messages without an LLM call:
+    1. Empty messages get a clarification request
+    2. Confident greetings and off-topic requests get templated responses
+    3. Everything else is left for the gatekeeper
+    """
+    label = classify_message(
+        state.messages[-1].content,
+        min_confidence=settings.TRIAGE_MIN_CONFIDENCE,
+        max_trivial_words=settings.TRIAGE_MAX_TRIVIAL_WORDS,
+        has_history=len(state.messages) > 1,
+    )
+    if label not in TEMPLATE_RESPONSES:
+        return state
+
+    logger.info(f"Triage handled {label} message without inference")
+    result = TEMPLATE_RESPONSES[label]
+    write_stream_event({"event": "token", "content": result.response})
+    state = update_state(state, result, "gatekeeper")
+    state.messages[-1].additional_kwargs["triage"] = label
+    return state
+
+def after_triage(state: AgentState) -> str:
+    """
+    End the turn when triage answered, otherwise hand off to the gatekeeper.
+    """
+    if state.messages and state.messages[-1].type == "ai":
+        return END
+    return "gatekeeper"
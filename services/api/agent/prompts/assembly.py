@@ -0,0 +1,48 @@
+"""
+Prompt assembly for llama.cpp prompt (KV cache) reuse
+
+llama.cpp only re-prefills the tokens after the longest prefix shared with the
+slot's previous prompt. Node templates are therefore ordered stable to volatile:
+instructions, then the conversation history (which only grows at its end), then
+the tools selected for this question, the date and the question. The history is
+the thread's rolling summary plus the messages it does not yet cover, so it
+stays bounded.
+"""
+from typing import List, Union
+from langchain_core.messages import HumanMessage, AIMessage
+from langchain_core.prompts import PromptTemplate
+
+from services.api.agent.schemas import AgentState
+from services.api.agent.tokens import PromptSection, fit_prompt
+from services.api.agent.utils import get_current_date, get_mcp_tools_formatted
+
+def render_history(messages: List[Union[HumanMessage, AIMessage]], summary: str = "") -> str:
+    """
+    Render messages as plain "User:"/"Lox:" lines, after the summary if any.
+
+    The repr of a message list embeds ids and additional_kwargs that change from
+    turn to turn, which would invalidate the cached prefix.
+    """
+    if not messages and not summary:
+        return "No previous messages."
+    lines = [f"Summary of earlier messages: {summary}"] if summary else []
+    for message in messages:
+        speaker = "User" if isinstance(message, HumanMessage) else "Lox"
+        lines.append(f"{speaker}: {message.content}")
+    return "\n".join(lines)
+
+def assemble_prompt(prompt: PromptTemplate, state: AgentState, node: str, **variables) -> str:
+    """
+    Format a conversational node prompt (gatekeeper, planner) from the state.
+
+    The question is never truncated (a question too long for the budget is sent
+    whole and logged); history keeps its most recent lines and the tool list its
+    first ones when the prompt exceeds the token budget.
+    """
+    question = state.messages[-1].content
+    sections = [
+        PromptSection(name="question", text=question, priority=0, required=True),
+        PromptSection(name="messages", text=render_history(state.messages[state.reduced_context.covered:-1], state.reduced_context.context), priority=1, keep="tail"),
+        PromptSection(name="tools", text=get_mcp_tools_formatted(question), priority=2),
+    ]
+    return fit_prompt(prompt, sections, node, current_date=get_current_date(), **variables)
@@ -3,46 +3,48 @@ from langchain_core.prompts import PromptTemplate
 prompt = PromptTemplate(
     template="""
         <role>
-        You are an expert in selecting the appropriate tool and parameters to execute a task, then executing the tool.
+        You are an expert in selecting the appropriate tool and parameters to execute a task.
         <role>
 
-        <context>
-        Today's date is {current_date}.
-        </context>
-        
         <tools>
         You have the following tools at your disposal. Only use these tools to execute the task:
         {tools}
         </tools>
-        
-        <task>
-        The task is: {task}
-        </task>
 
         <output_format>
         You must respond with only a valid JSON object with these exact keys:
         "tool": the name of the tool selected to execute the task,
-        "parameters": a dictionary of arguments to pass to the tool,
-        "tool_response": a dictionary of the tool response
+        "parameters": a dictionary of arguments to pass to the tool
         </output_format>
-        
+
         <weather_example>
         If the task is "Get weather for New York", then the output should be:
         {{
             "tool": "weather_search",
-            "parameters": {{"city": "New York"}},
-            "tool_response": {{"temperature": "72°F", "condition": "Sunny"}}
+            "parameters": {{"city": "New York"}}
         }}
         </weather_example>
-        
+
         <reddit_dynasty_example>
         If the task is "Search DynastyFF for rookie running backs", then the output should be:
         {{
             "tool": "subreddit_search",
-            "parameters": {{"query": "rookie running backs", "subreddit": "DynastyFF"}},
-            "tool_response": {{"posts": ["Rookie RB analysis", "Draft strategy discussion"]}}
+            "parameters": {{"query": "rookie running backs", "subreddit": "DynastyFF"}}
         }}
         </reddit_dynasty_example>
+
+        <dependencies>
+        Results from earlier tasks this task depends on:
+        {dependencies}
+        </dependencies>
+
+        <context>
+        Today's date is {current_date}.
+        </context>
+
+        <task>
+        The task is: {task}
+        </task>
     """,
-    input_variables=["current_date", "tools", "task"],
+    input_variables=["tools", "dependencies", "current_date", "task"],
 )
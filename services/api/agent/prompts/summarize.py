@@ -0,0 +1,21 @@
+from langchain_core.prompts import PromptTemplate
+
+prompt = PromptTemplate(
+    template="""
+        #Role
+        You maintain the running memory of a conversation between a fantasy football manager and Lox Genie.
+
+        #Instructions
+        Update the existing summary with the new messages.
+        Keep every fact that later questions may depend on: the user's league settings, roster, players discussed, decisions made and open questions.
+        Drop greetings, jokes and repeated advice.
+        Write at most {max_words} words of plain text. Return only the updated summary.
+
+        #Existing Summary
+        {summary}
+
+        #New Messages
+        {messages}
+    """,
+    input_variables=["max_words", "summary", "messages"],
+)
@@ -0,0 +1,55 @@
+"""
+Lightweight lexical retrieval for the agent
+"""
+import math
+import re
+from collections import Counter
+from typing import List
+
+STOP_WORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "can", "do", "for", "from", "get", "given",
+    "how", "i", "in", "is", "it", "me", "my", "of", "on", "or", "provided", "return", "returns",
+    "should", "the", "this", "to", "what", "who", "with", "you", "your",
+}
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase, split identifiers and words, drop stop words and plural suffixes."""
+    words = re.findall(r"[a-z0-9]+", re.sub(r"([a-z])([A-Z])", r"\1 \2", text or "").lower())
+    return [word[:-1] if len(word) > 3 and word.endswith("s") else word for word in words if word not in STOP_WORDS]
+
+class BM25Index:
+    """
+    Okapi BM25 over a small, static set of documents.
+
+    Pure Python and CPU-only: the corpus is the MCP tool catalog (tens to hundreds
+    of short docstrings), so scoring every document per query takes microseconds.
+    """
+
+    def __init__(self, documents: List[str], k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.term_counts = [Counter(tokenize(document)) for document in documents]
+        self.lengths = [sum(counts.values()) for counts in self.term_counts]
+        self.average_length = (sum(self.lengths) / len(self.lengths)) if self.lengths else 0.0
+        document_frequency = Counter(term for counts in self.term_counts for term in counts)
+        total = len(documents)
+        self.idf = {term: math.log(1 + (total - df + 0.5) / (df + 0.5)) for term, df in document_frequency.items()}
+
+    def scores(self, query: str) -> List[float]:
+        """Score every document against the query."""
+        terms = [term for term in tokenize(query) if term in self.idf]
+        scores = []
+        for counts, length in zip(self.term_counts, self.lengths):
+            score = 0.0
+            norm = 1 - self.b + self.b * length / (self.average_length or 1)
+            for term in terms:
+                frequency = counts.get(term, 0)
+                if frequency:
+                    score += self.idf[term] * frequency * (self.k1 + 1) / (frequency + self.k1 * norm)
+            scores.append(score)
+        return scores
+
+    def top_k(self, query: str, k: int) -> List[int]:
+        """Indices of the k best-scoring documents (ties keep document order)."""
+        scores = self.scores(query)
+        return sorted(range(len(scores)), key=lambda index: (-scores[index], index))[:k]
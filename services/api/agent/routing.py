@@ -0,0 +1,129 @@
+"""
+Load-aware routing between the small and large local models
+"""
+import re
+import time
+from typing import Dict, Literal, NamedTuple, Optional
+
+from services.api.agent.backends import LLMBackendPool, llm_backends
+from services.api.agent.cache import extract_entities
+from services.api.agent.scheduler import llm_scheduler
+from services.api.core.config import settings
+from services.api.utils.logger import logger
+from services.api.utils.tracing import set_span_attributes
+
+Tier = Literal["small", "large"]
+
+# Question shapes that benefit from the stronger model's reasoning
+REASONING_PATTERN = re.compile(
+    r"\b(compare|comparison|versus|vs|trade|analy[sz]e|evaluate|explain|why|should i|rest of (the )?season|playoffs?|dynasty|value|ros)\b",
+    re.IGNORECASE,
+)
+
+def question_complexity(question: str) -> float:
+    """
+    Heuristic 0-1 complexity of a question.
+
+    Long questions, several named players or teams, reasoning-heavy asks
+    (comparisons, trades, explanations) and multi-part questions score higher.
+    """
+    score = 0.4 * min(len(question.split()) / 40, 1.0)
+    score += 0.3 * min(len(extract_entities(question)) / 3, 1.0)
+    score += 0.3 if REASONING_PATTERN.search(question) else 0.0
+    score += 0.1 if question.count("?") > 1 else 0.0
+    return round(min(score, 1.0), 3)
+
+class ModelRoute(NamedTuple):
+    """The model chosen for a call and the replicas that serve it."""
+    tier: Tier
+    model: str
+    backends: LLMBackendPool
+    reason: str
+
+class ModelRouter:
+    """
+    Picks the small or large model per call.
+
+    A question goes to the large model when it is complex enough, the interactive
+    queue is shallow, and the large model's recent latency (scaled by the queue)
+    fits the latency SLO; otherwise the node's configured small model serves it.
+    A latency sample older than `sample_ttl_seconds` is ignored, so the large
+    model is probed again once load has dropped.
+    """
+
+    def __init__(self, large_model: str, large_backends: LLMBackendPool, complexity_threshold: float, max_queue_depth: int, latency_slo_seconds: float, sample_ttl_seconds: float = 60.0):
+        self.large_model = large_model
+        self.large_backends = large_backends
+        self.complexity_threshold = complexity_threshold
+        self.max_queue_depth = max_queue_depth
+        self.latency_slo_seconds = latency_slo_seconds
+        self.sample_ttl_seconds = sample_ttl_seconds
+        self.latency: Dict[str, float] = {}
+        self.sampled_at: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {}
+
+    def predicted_latency(self, tier: Tier, queued: int) -> Optional[float]:
+        """Recent latency of a tier scaled by the work queued ahead, or None without a fresh sample."""
+        if tier not in self.latency or time.monotonic() - self.sampled_at[tier] > self.sample_ttl_seconds:
+            return None
+        return self.latency[tier] * (1 + queued / llm_scheduler.slots)
+
+    def route(self, question: str, small_model: str) -> ModelRoute:
+        """Choose the model for a call on a question; `small_model` is the node's configured model."""
+        complexity = question_complexity(question)
+        queued = llm_scheduler.stats()["interactive"]["queued"]
+        predicted = self.predicted_latency("large", queued)
+
+        if not self.large_model:
+            route = ModelRoute("small", small_model, llm_backends, "routing disabled")
+        elif complexity < self.complexity_threshold:
+            route = ModelRoute("small", small_model, llm_backends, "simple question")
+        elif queued >= self.max_queue_depth:
+            route = ModelRoute("small", small_model, llm_backends, "queue depth")
+        elif predicted is not None and predicted > self.latency_slo_seconds:
+            route = ModelRoute("small", small_model, llm_backends, "latency slo")
+        else:
+            route = ModelRoute("large", self.large_model, self.large_backends, "complex question")
+
+        key = f"{route.tier}:{route.reason}"
+        self.counts[key] = self.counts.get(key, 0) + 1
+        set_span_attributes(model=route.model, model_tier=route.tier, route_reason=route.reason, complexity=complexity)
+        return route
+
+    def observe(self, route: ModelRoute, seconds: float, alpha: float = 0.3) -> None:
+        """
+        Fold a call's service time into its tier's moving average.
+
+        `seconds` must exclude time spent waiting for a scheduler slot, since
+        `predicted_latency` already scales the sample by the queue.
+        """
+        previous = self.latency.get(route.tier)
+        self.latency[route.tier] = seconds if previous is None else alpha * seconds + (1 - alpha) * previous
+        self.sampled_at[route.tier] = time.monotonic()
+
+    def stats(self) -> dict:
+        return {
+            "large_model": self.large_model or None,
+            "routes": dict(self.counts),
+            "latency_seconds": {tier: round(latency, 3) for tier, latency in self.latency.items()},
+        }
+
+# llama.cpp serves whichever model it loaded and ignores the request's model field,
+# so the large model needs replicas of its own or routing would silently hit the small one
+if settings.LLM_LARGE_MODEL and not settings.LLM_LARGE_BASE_URLS:
+    logger.warning("LLM_LARGE_MODEL is set without LLM_LARGE_BASE_URLS; model routing disabled")
+
+# Large-model replicas; only a separate pool when routing is enabled
+llm_large_backends = (
+    LLMBackendPool(urls=settings.LLM_LARGE_BASE_URLS, health_check_seconds=settings.LLM_HEALTH_CHECK_SECONDS, affinity_slack=settings.LLM_AFFINITY_SLACK)
+    if settings.LLM_LARGE_MODEL and settings.LLM_LARGE_BASE_URLS else llm_backends
+)
+
+# Global model router instance
+model_router = ModelRouter(
+    large_model=settings.LLM_LARGE_MODEL if settings.LLM_LARGE_BASE_URLS else "",
+    large_backends=llm_large_backends,
+    complexity_threshold=settings.LLM_ROUTING_COMPLEXITY_THRESHOLD,
+    max_queue_depth=settings.LLM_ROUTING_MAX_QUEUE_DEPTH,
+    latency_slo_seconds=settings.LLM_ROUTING_LATENCY_SLO_SECONDS,
+)
@@ -0,0 +1,130 @@
+"""
+LLM request scheduler for the agent
+"""
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Dict, Literal
+
+from services.api.core.config import settings
+from services.api.utils.deadline import with_deadline
+from services.api.utils.tracing import span
+
+Lane = Literal["interactive", "background"]
+
+# Lanes in priority order: a freed slot always goes to the first lane with a waiter
+LANES: tuple = ("interactive", "background")
+
+class LLMQueueFullError(Exception):
+    """Raised when a lane's queue is at its depth limit; surfaced to clients as 429."""
+
+    def __init__(self, lane: str, retry_after: int = 1):
+        super().__init__(f"LLM {lane} queue is full")
+        self.lane = lane
+        self.retry_after = retry_after
+
+class LLMScheduler:
+    """
+    Priority admission for calls to the llama.cpp server.
+
+    At most `slots` calls (the parallel slots of all replicas) run at once, and
+    each lane has its own concurrency cap, so background work (thread summaries,
+    YouTube summaries) holds at most LLM_BACKGROUND_SLOTS of them. Waiting interactive calls
+    (chat, wishes) are always dispatched before waiting background calls. A lane whose queue is
+    at its depth limit rejects new calls immediately instead of queueing them.
+    """
+
+    def __init__(self, slots: int, lane_limits: Dict[str, int], queue_limits: Dict[str, int]):
+        self.slots = max(slots, 1)
+        self.lane_limits = lane_limits
+        self.queue_limits = queue_limits
+        self.active: Dict[str, int] = {lane: 0 for lane in LANES}
+        self.waiters: Dict[str, Deque[asyncio.Future]] = {lane: deque() for lane in LANES}
+        self.metrics: Dict[str, dict] = {
+            lane: {"admitted": 0, "rejected": 0, "wait_seconds_total": 0.0, "wait_seconds_max": 0.0}
+            for lane in LANES
+        }
+
+    def _can_run(self, lane: str) -> bool:
+        return sum(self.active.values()) < self.slots and self.active[lane] < self.lane_limits.get(lane, self.slots)
+
+    def _has_priority_waiters(self, lane: str) -> bool:
+        return any(self.waiters[other] for other in LANES[:LANES.index(lane) + 1])
+
+    def _reject_if_full(self, lane: str) -> None:
+        if len(self.waiters[lane]) >= self.queue_limits.get(lane, 0):
+            self.metrics[lane]["rejected"] += 1
+            raise LLMQueueFullError(lane)
+
+    def admit(self, lane: Lane) -> None:
+        """Fail fast, before any work is done, if a call on this lane would be rejected."""
+        if not self._can_run(lane):
+            self._reject_if_full(lane)
+
+    async def acquire(self, lane: Lane) -> None:
+        """Wait for a slot on the lane."""
+        started = time.monotonic()
+        if self._can_run(lane) and not self._has_priority_waiters(lane):
+            self.active[lane] += 1
+        else:
+            self._reject_if_full(lane)
+            waiter = asyncio.get_running_loop().create_future()
+            self.waiters[lane].append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    # The slot was granted as we were cancelled: hand it on
+                    self.release(lane)
+                elif waiter in self.waiters[lane]:
+                    self.waiters[lane].remove(waiter)
+                raise
+
+        waited = time.monotonic() - started
+        metrics = self.metrics[lane]
+        metrics["admitted"] += 1
+        metrics["wait_seconds_total"] += waited
+        metrics["wait_seconds_max"] = max(metrics["wait_seconds_max"], waited)
+
+    def release(self, lane: Lane) -> None:
+        """Free a slot and dispatch waiters in lane priority order."""
+        self.active[lane] -= 1
+        for next_lane in LANES:
+            while self.waiters[next_lane] and self._can_run(next_lane):
+                waiter = self.waiters[next_lane].popleft()
+                if waiter.done():
+                    continue
+                self.active[next_lane] += 1
+                waiter.set_result(None)
+
+    @asynccontextmanager
+    async def slot(self, lane: Lane = "interactive") -> AsyncIterator[None]:
+        """Hold an LLM slot for the duration of a call."""
+        with span("llm.queue", lane=lane):
+            await with_deadline(self.acquire(lane), f"LLM {lane} queue")
+        try:
+            yield
+        finally:
+            self.release(lane)
+
+    def stats(self) -> Dict[str, dict]:
+        """Queue depth, concurrency and wait-time metrics per lane."""
+        return {
+            lane: {
+                **metrics,
+                "active": self.active[lane],
+                "queued": len(self.waiters[lane]),
+                "wait_seconds_avg": round(metrics["wait_seconds_total"] / metrics["admitted"], 4) if metrics["admitted"] else 0.0,
+            }
+            for lane, metrics in self.metrics.items()
+        }
+
+# Global LLM scheduler instance, sized to the parallel slots of every replica (large-model ones included)
+LLM_REPLICAS = max(len(settings.LLM_BASE_URLS), 1) + (len(settings.LLM_LARGE_BASE_URLS) if settings.LLM_LARGE_MODEL else 0)
+LLM_TOTAL_SLOTS = settings.LLM_PARALLEL_SLOTS * LLM_REPLICAS
+llm_scheduler = LLMScheduler(
+    slots=LLM_TOTAL_SLOTS,
+    lane_limits={"interactive": LLM_TOTAL_SLOTS, "background": settings.LLM_BACKGROUND_SLOTS},
+    queue_limits={"interactive": settings.LLM_INTERACTIVE_QUEUE_LIMIT, "background": settings.LLM_BACKGROUND_QUEUE_LIMIT},
+)
@@ -1,4 +1,4 @@
-from typing import List, Any, Dict, Union, Literal
+from typing import List, Any, Dict, Optional, Union, Literal
 from langchain_core.messages import HumanMessage, AIMessage
 from pydantic import BaseModel, Field
 import uuid
@@ -10,14 +10,27 @@ class GatekeeperResponse(BaseModel):
     response: str = Field(..., description="Response to give to the user")
 
 class PlanResponse(BaseModel):
+    plan_id: str = Field(default_factory=lambda: str(uuid.uuid4()), description="Unique ID for the plan.")
     subtasks: List[str] = Field(..., description="List of subtasks to perform.")
+    depends_on: List[List[int]] = Field(default_factory=list, description="For each subtask, the indices of earlier subtasks whose results it needs.")
     
+class ToolSelection(BaseModel):
+    tool: str = Field(..., description="Name of the tool selected to execute the task.")
+    parameters: Dict[str, Any] = Field(..., description="Parameters for the tool selected to execute the task.")
+
 class ToolExecutorResponse(BaseModel):
     tool_id: str = Field(default_factory=lambda: str(uuid.uuid4()), description="Unique ID for the tool execution.")
-    plan_id: str = Field(..., description="Unique ID for the plan.")
+    plan_id: str = Field(default="", description="Unique ID for the plan.")
     tool: str = Field(..., description="Name of the tool selected to execute the task.")
     parameters: Dict[str, Any] = Field(..., description="Parameters for the tool selected to execute the task.")
-    tool_response: Any = Field(..., description="Response from the tool selected to execute the task.")
+    tool_response: Optional[Any] = Field(default=None, description="Response from the tool selected to execute the task.")
+    cached: bool = Field(default=False, description="Whether the tool response was served from the thread's tool memo.")
+
+class ToolMemoEntry(BaseModel):
+    tool: str = Field(..., description="Name of the tool called.")
+    parameters: Dict[str, Any] = Field(default_factory=dict, description="Parameters the tool was called with.")
+    tool_response: Any = Field(default=None, description="Response from the tool.")
+    fetched_at: float = Field(..., description="Unix time the response was fetched.")
 
 class MessageCounts(BaseModel):
     total: int = Field(0, description="Total number of messages in thread.")
@@ -26,6 +39,7 @@ class MessageCounts(BaseModel):
 
 class Context(BaseModel):
     context: str = Field(default="", description="Reduced context of the thread.")
+    covered: int = Field(default=0, description="Number of leading messages folded into the reduced context.")
 
 # State schemas
 class AgentState(BaseModel):
@@ -34,4 +48,6 @@ class AgentState(BaseModel):
     message_counts: MessageCounts = Field(default=MessageCounts(), description="Number of human and AI messages in thread.")
     reduced_context: Context = Field(default=Context(), description="Reduced context from the thread (moderate-term agent memory).")
     relevant: bool = Field(default=False, description="Whether the latest user message is relevant to the agent's context.")
-    tool_calls: List[ToolExecutorResponse] = Field(default_factory=list, description="List tool executions performed.")
\ No newline at end of file
+    plan: List[PlanResponse] = Field(default_factory=list, description="Research plans created by the planner.")
+    tool_calls: List[ToolExecutorResponse] = Field(default_factory=list, description="List tool executions performed.")
+    tool_memo: Dict[str, ToolMemoEntry] = Field(default_factory=dict, description="Recent tool responses keyed by tool and canonical parameters.")
\ No newline at end of file
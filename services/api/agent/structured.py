@@ -0,0 +1,127 @@
+"""
+Grammar-constrained structured output for the agent
+"""
+from typing import Any, AsyncIterator, Dict, Optional, Type
+from pydantic import BaseModel, ValidationError
+from langchain_core.language_models import BaseChatModel
+from langchain_core.utils.json import parse_partial_json
+
+from services.api.agent.backends import record_usage
+from services.api.utils.logger import logger
+
+class StructuredOutputError(ValueError):
+    """Raised when an LLM response does not parse into the response schema."""
+
+def json_schema_format(schema: Type[BaseModel]) -> dict:
+    """
+    OpenAI-style response_format for a schema.
+
+    llama.cpp compiles the JSON schema into a sampling grammar, so the model can
+    only emit tokens that keep the output valid against the schema.
+    """
+    return {
+        "type": "json_schema",
+        "json_schema": {"name": schema.__name__, "strict": True, "schema": schema.model_json_schema()},
+    }
+
+def parse_structured(text: str, schema: Type[BaseModel]) -> tuple[BaseModel, bool]:
+    """
+    Parse an LLM response into the schema, returning (result, fast_path).
+
+    The fast path parses and validates the raw text in one pydantic-core pass,
+    which is all a grammar-constrained response needs. Otherwise the outermost
+    JSON object is cut out of any surrounding prose or code fences and retried.
+    """
+    try:
+        return schema.model_validate_json(text), True
+    except ValidationError:
+        pass
+    start, end = text.find("{"), text.rfind("}")
+    if start != -1 and end > start:
+        try:
+            return schema.model_validate_json(text[start:end + 1]), False
+        except ValidationError as e:
+            raise StructuredOutputError(f"Invalid {schema.__name__} response: {e.error_count()} validation errors") from e
+    raise StructuredOutputError(f"No JSON object in {schema.__name__} response")
+
+class StructuredOutputStats:
+    """Per-schema parse outcome counters, exposed for metrics."""
+
+    def __init__(self):
+        self.schemas: Dict[str, dict] = {}
+
+    def record(self, schema: str, outcome: str) -> None:
+        stats = self.schemas.setdefault(schema, {"calls": 0, "fast_path": 0, "recovered": 0, "retries": 0, "failures": 0})
+        if outcome in ("fast_path", "recovered", "failures"):
+            stats["calls"] += 1
+        stats[outcome] += 1
+
+    def stats(self) -> Dict[str, dict]:
+        return {
+            schema: {
+                **stats,
+                "failure_rate": round(stats["failures"] / stats["calls"], 4) if stats["calls"] else 0.0,
+                "retry_rate": round(stats["retries"] / stats["calls"], 4) if stats["calls"] else 0.0,
+            }
+            for schema, stats in self.schemas.items()
+        }
+
+class GrammarStructuredLLM:
+    """
+    Structured-output runnable backed by a llama.cpp JSON schema grammar.
+
+    Exposes the ainvoke/astream subset of the Runnable interface the nodes use.
+    A response that still fails to parse (typically cut off at max_tokens) is
+    regenerated up to `retries` times before StructuredOutputError is raised.
+    """
+
+    def __init__(self, llm: BaseChatModel, schema: Type[BaseModel], retries: int):
+        self.llm = llm.bind(response_format=json_schema_format(schema))
+        self.schema = schema
+        self.retries = retries
+
+    def _parse(self, text: str) -> BaseModel:
+        try:
+            result, fast_path = parse_structured(text, self.schema)
+        except StructuredOutputError:
+            structured_output_stats.record(self.schema.__name__, "failures")
+            raise
+        structured_output_stats.record(self.schema.__name__, "fast_path" if fast_path else "recovered")
+        return result
+
+    def _retry(self, error: StructuredOutputError) -> None:
+        structured_output_stats.record(self.schema.__name__, "retries")
+        logger.warning(f"Retrying {self.schema.__name__} generation: {error}")
+
+    async def ainvoke(self, prompt: Any, retries: Optional[int] = None) -> BaseModel:
+        retries = self.retries if retries is None else retries
+        for attempt in range(retries + 1):
+            message = await self.llm.ainvoke(prompt)
+            record_usage(message)
+            try:
+                return self._parse(message.content)
+            except StructuredOutputError as e:
+                if attempt == retries:
+                    raise
+                self._retry(e)
+
+    async def astream(self, prompt: Any) -> AsyncIterator[Any]:
+        """Yield partial dicts as the JSON is generated, then the parsed result."""
+        text, message = "", None
+        async for chunk in self.llm.astream(prompt):
+            message = chunk if message is None else message + chunk
+            text += chunk.content
+            partial = parse_partial_json(text) if text.lstrip().startswith("{") else None
+            if isinstance(partial, dict):
+                yield partial
+        record_usage(message)
+        try:
+            yield self._parse(text)
+        except StructuredOutputError as e:
+            if not self.retries:
+                raise
+            self._retry(e)
+            yield await self.ainvoke(prompt, retries=self.retries - 1)
+
+# Global structured output stats instance
+structured_output_stats = StructuredOutputStats()
@@ -0,0 +1,104 @@
+"""
+Token estimation and prompt budgeting for the agent
+"""
+from typing import Dict, List, Literal, Optional
+from pydantic import BaseModel, Field
+from langchain_core.prompts import PromptTemplate
+
+from services.api.core.config import settings
+from services.api.utils.logger import logger
+
+# Average characters per token for English prompt text on the Qwen/Llama tokenizers
+CHARS_PER_TOKEN = 4.0
+TRUNCATION_MARKER = "[...truncated]"
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of tokens in a piece of text."""
+    if not text:
+        return 0
+    return max(1, round(len(text) / CHARS_PER_TOKEN))
+
+class PromptSection(BaseModel):
+    """A variable section of a node prompt that may be truncated to fit the budget."""
+    name: str = Field(..., description="Prompt template variable the section fills.")
+    text: str = Field(default="", description="Full section text.")
+    priority: int = Field(default=0, description="Lower values are allotted budget first.")
+    keep: Literal["head", "tail"] = Field(default="head", description="Which end of the text survives truncation.")
+    required: bool = Field(default=False, description="Never truncated, even past the budget (e.g. the user's question).")
+
+def truncate_text(text: str, max_tokens: int, keep: Literal["head", "tail"] = "head") -> str:
+    """
+    Cut text to roughly max_tokens, on line boundaries where possible.
+
+    "tail" keeps the end of the text (e.g. the most recent history), "head" the start.
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    max_chars = max(int(max_tokens * CHARS_PER_TOKEN) - len(TRUNCATION_MARKER) - 1, 0)
+    lines = text.splitlines() if keep == "head" else text.splitlines()[::-1]
+
+    kept, used = [], 0
+    for line in lines:
+        if used + len(line) + 1 > max_chars:
+            break
+        kept.append(line)
+        used += len(line) + 1
+
+    if not kept and max_chars:
+        kept = [text[:max_chars]] if keep == "head" else [text[-max_chars:]]
+    if keep == "head":
+        return "\n".join(kept + [TRUNCATION_MARKER])
+    return "\n".join([TRUNCATION_MARKER] + kept[::-1])
+
+class TokenUsage:
+    """Per-node prompt token counters, exposed for metrics."""
+
+    def __init__(self):
+        self.nodes: Dict[str, dict] = {}
+
+    def record(self, node: str, sections: Dict[str, int], total: int, truncated: List[str]) -> None:
+        stats = self.nodes.setdefault(node, {"calls": 0, "total_tokens": 0, "max_tokens": 0, "truncated_calls": 0})
+        stats["calls"] += 1
+        stats["total_tokens"] += total
+        stats["max_tokens"] = max(stats["max_tokens"], total)
+        stats["truncated_calls"] += bool(truncated)
+        stats["last"] = {"total": total, "sections": sections, "truncated": truncated}
+        logger.debug(f"{node} prompt: ~{total} tokens {sections}" + (f", truncated {truncated}" if truncated else ""))
+
+    def stats(self) -> Dict[str, dict]:
+        return {
+            node: {**stats, "avg_tokens": round(stats["total_tokens"] / stats["calls"], 1)}
+            for node, stats in self.nodes.items()
+        }
+
+def fit_prompt(prompt: PromptTemplate, sections: List[PromptSection], node: str, budget: Optional[int] = None, **variables) -> str:
+    """
+    Format a prompt so it fits the model's context budget.
+
+    The fixed template text (instructions, examples, output format) and the plain
+    variables are always kept. The remaining budget is handed to sections in
+    priority order; a section that does not fit is truncated to what is left, so
+    lower-priority sections shrink first. A required section is kept whole even
+    when it overruns the budget, which is logged. Token counts are recorded per node.
+    """
+    budget = budget if budget is not None else settings.LLM_CONTEXT_TOKENS - settings.LLM_RESPONSE_TOKENS
+    overhead = estimate_tokens(prompt.format(**{section.name: "" for section in sections}, **variables))
+    available = budget - overhead
+
+    fitted, counts, truncated = {}, {"fixed": overhead}, []
+    for section in sorted(sections, key=lambda section: section.priority):
+        text = section.text
+        if estimate_tokens(text) > available and section.required:
+            logger.warning(f"{node} prompt: {section.name} (~{estimate_tokens(text)} tokens) kept whole past the {budget}-token budget")
+        elif estimate_tokens(text) > available:
+            text = truncate_text(text, max(available, 0), section.keep)
+            truncated.append(section.name)
+        fitted[section.name] = text
+        counts[section.name] = estimate_tokens(text)
+        available -= counts[section.name]
+
+    token_usage.record(node, counts, sum(counts.values()), truncated)
+    return prompt.format(**fitted, **variables)
+
+# Global token usage instance
+token_usage = TokenUsage()
@@ -1,15 +1,15 @@
 """
 Utility functions for the agent
 """
+import json
+import time
 from datetime import datetime
-from typing import List, Literal, Union
-from functools import lru_cache
-from fastmcp.client import Client
+from typing import List, Literal, Optional, Union
 from langchain_core.messages import HumanMessage, AIMessage
 
-from services.api.agent.schemas import MessageCounts, AgentState, GatekeeperResponse, PlanResponse, ToolExecutorResponse
+from services.api.agent.catalog import tool_catalog
+from services.api.agent.schemas import MessageCounts, AgentState, GatekeeperResponse, PlanResponse, ToolExecutorResponse, ToolMemoEntry
 from services.api.core.config import settings
-from services.api.utils.logger import logger
 
 def get_current_date() -> str:
     """Get the current date and time in UTC."""
@@ -39,55 +39,64 @@ def update_state(state: AgentState, result: Union[GatekeeperResponse, PlanRespon
             state.messages[-1].additional_kwargs["relevant"] = False
 
     elif agent == "planner":
-        # Adding plan as message (to be displayed to user)
+        # Keep the plan for the executor and add it as a message (to be displayed to user)
+        state.plan.append(result)
         state.messages.append(AIMessage(content=result.subtasks))
 
     state.message_counts = count_messages(state.messages)
     return state
 
-@lru_cache(maxsize=1)
+def normalize_dependencies(subtask_count: int, depends_on: List[List[int]]) -> List[List[int]]:
+    """
+    Sanitize the planner's dependency hints into a DAG.
+
+    Only references to earlier subtasks are kept, so malformed hints (self, forward
+    or out-of-range references) can never deadlock the executor.
+    """
+    dependencies = []
+    for index in range(subtask_count):
+        hints = depends_on[index] if index < len(depends_on) else []
+        dependencies.append(sorted({dep for dep in hints if isinstance(dep, int) and 0 <= dep < index}))
+    return dependencies
+
+def tool_memo_key(tool: str, parameters: dict) -> str:
+    """Key a tool call by its name and canonicalized (sorted, compact JSON) parameters."""
+    return f"{tool}:{json.dumps(parameters, sort_keys=True, separators=(',', ':'), default=str)}"
+
+def get_fresh_tool_memo(state: AgentState, key: str) -> Optional[ToolMemoEntry]:
+    """Return the thread's memoized tool response if it is within TOOL_MEMO_TTL_SECONDS."""
+    entry = state.tool_memo.get(key)
+    if entry is None or time.time() - entry.fetched_at > settings.TOOL_MEMO_TTL_SECONDS:
+        return None
+    return entry
+
+def memoize_tool_response(state: AgentState, key: str, entry: ToolMemoEntry) -> None:
+    """Store a tool response, dropping stale entries and keeping the newest TOOL_MEMO_MAX_ENTRIES."""
+    now = time.time()
+    memo = {k: v for k, v in state.tool_memo.items() if now - v.fetched_at <= settings.TOOL_MEMO_TTL_SECONDS}
+    memo[key] = entry
+    newest = sorted(memo.items(), key=lambda item: item[1].fetched_at)[-settings.TOOL_MEMO_MAX_ENTRIES:]
+    state.tool_memo = dict(newest)
+
 def get_mcp_tools() -> List:
     """
-    Get tools from the MCP server with caching.
-    
-    This function is cached so the MCP connection is only made once.
-    Subsequent calls return the cached result.
-    
+    Get the cached tools from the MCP tool catalog.
+
     Returns:
         List of tools from the MCP server
     """
-    try:
-        logger.info(f"Connecting to MCP server at {settings.MCP_BASE_URL}")
-        config = {
-            "lox-mcp": {
-                "url": settings.MCP_BASE_URL,
-                "transport": "http",
-            }
-        }
-        client = Client(config)
-        tools = [tool for tool in client.tools()]
-        logger.info(f"Successfully loaded {len(tools)} tools from MCP")
-        return tools
-    except Exception as e:
-        logger.error(f"Failed to load tools from MCP: {e}", exc_info=True)
-        return []
-
-
-def get_mcp_tools_formatted() -> str:
+    return tool_catalog.tools
+
+def get_mcp_tools_formatted(query: Optional[str] = None) -> str:
     """
     Get MCP tools formatted as a string for prompt injection.
-    
+
+    The rendering is precomputed whenever the catalog refreshes. Given a query,
+    only the TOOL_TOP_K tools most relevant to it are included.
+
     Returns:
         Formatted string describing available tools
     """
-    tools = get_mcp_tools()
-    if not tools:
-        return "No tools available."
-    
-    tool_descriptions = []
-    for tool in tools:
-        name = getattr(tool, 'name', 'Unknown')
-        description = getattr(tool, 'description', 'No description')
-        tool_descriptions.append(f"- {name}: {description}")
-    
-    return "\n".join(tool_descriptions)0
\ No newline at end of file
+    if query:
+        return tool_catalog.select(query, settings.TOOL_TOP_K)
+    return tool_catalog.rendered
@@ -4,7 +4,6 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
 import logging
-import time
 
 from services.api.api.routes.genie import router as genie_router
 from services.api.api.routes.users import router as user_router
@@ -17,8 +16,14 @@ from services.api.api.routes.sleeper import router as sleeper_router
 from services.api.api.routes.nfl_players import router as nfl_players_router
 from services.api.api.routes.agents import router as agents_router
 from services.api.redis.client import startup_redis, shutdown_redis
+from services.api.agent.backends import llm_backends
+from services.api.agent.catalog import tool_catalog
+from services.api.agent.routing import llm_large_backends
+from services.api.agent.scheduler import LLMQueueFullError
 from services.api.crud.mongodb import mongodb_client
 from services.api.core.config import settings
+from services.api.utils.deadline import ClientDisconnectedError, DeadlineExceededError
+from services.api.utils.tracing import TracingMiddleware, trace_exporter
 
 # Configure logging
 logging.basicConfig(level=getattr(logging, settings.LOG_LEVEL))
@@ -34,11 +39,19 @@ async def lifespan(app: FastAPI):
     await startup_redis()
     await mongodb_client.connect()
     logger.info("MongoDB connected successfully")
+    await tool_catalog.start()
+    await llm_backends.start()
+    if llm_large_backends is not llm_backends:
+        await llm_large_backends.start()
     yield
     
     # Shutdown
+    await llm_backends.stop()
+    await llm_large_backends.stop()
+    await tool_catalog.stop()
     await shutdown_redis()
     await mongodb_client.disconnect()
+    await trace_exporter.aclose()
     logger.info(f"Shutting down {settings.NAME}")
 
 # Initialize FastAPI app with lifespan
@@ -58,15 +71,29 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Add response time middleware
-@app.middleware("http")
-async def add_response_time_header(request: Request, call_next):
-    """Add X-Response-Time header to all responses."""
-    start_time = time.perf_counter()
-    response = await call_next(request)
-    process_time = time.perf_counter() - start_time
-    response.headers["X-Response-Time"] = f"{process_time:.4f}s"
-    return response
+# Add tracing middleware (Server-Timing and X-Response-Time headers)
+app.add_middleware(TracingMiddleware)
+
+@app.exception_handler(LLMQueueFullError)
+async def llm_queue_full_handler(request: Request, exc: LLMQueueFullError):
+    """Reject requests fast when the LLM queue is saturated."""
+    return JSONResponse(
+        status_code=429,
+        content={"detail": f"The {exc.lane} LLM queue is full, please retry shortly."},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+@app.exception_handler(DeadlineExceededError)
+async def deadline_exceeded_handler(request: Request, exc: DeadlineExceededError):
+    """Report requests that ran past their deadline."""
+    logger.warning(f"{request.method} {request.url.path}: {exc}")
+    return JSONResponse(status_code=504, content={"detail": "The response took too long, please try again."})
+
+@app.exception_handler(ClientDisconnectedError)
+async def client_disconnected_handler(request: Request, exc: ClientDisconnectedError):
+    """Requests abandoned by the client; the response is never read."""
+    logger.info(f"{request.method} {request.url.path}: client disconnected, work cancelled")
+    return JSONResponse(status_code=499, content={"detail": "Client closed request"})
 
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
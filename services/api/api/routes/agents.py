@@ -6,9 +6,15 @@ from fastapi import APIRouter, HTTPException
 from langchain_core.messages import HumanMessage
 from langchain_core.runnables import RunnableConfig
 
+from services.api.agent.backends import llm_backends
+from services.api.agent.cache import answer_cache, plan_cache
 from services.api.agent.nodes.gatekeeper import gatekeeper
 from services.api.agent.nodes.planner import planner
 from services.api.agent.nodes.executor import executor
+from services.api.agent.routing import model_router
+from services.api.agent.scheduler import llm_scheduler
+from services.api.agent.structured import structured_output_stats
+from services.api.agent.tokens import token_usage
 from services.api.agent.schemas import AgentState, MessageCounts, PlanResponse
 from services.api.schemas.agents import GatekeeperRequest, PlannerRequest, ExecutorRequest
 
@@ -32,7 +38,7 @@ async def test_gatekeeper(request: GatekeeperRequest) -> dict:
         config = RunnableConfig(configurable={})
         
         # Call the gatekeeper node and extract the response
-        updated_state = gatekeeper(state, config)        
+        updated_state = await gatekeeper(state, config)        
         last_message = updated_state.messages[-1]
 
         return {
@@ -45,6 +51,54 @@ async def test_gatekeeper(request: GatekeeperRequest) -> dict:
         logger.error(f"Error in gatekeeper endpoint: {type(exc).__name__}: {str(exc)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to process gatekeeper: {str(exc)}")
 
+@router.get("/gatekeeper/cache")
+async def gatekeeper_cache_stats() -> dict:
+    """
+    Hit-rate metrics for the gatekeeper answer cache.
+    """
+    return answer_cache.stats()
+
+@router.get("/planner/cache")
+async def planner_cache_stats() -> dict:
+    """
+    Hit-rate metrics for the planner plan cache.
+    """
+    return plan_cache.stats()
+
+@router.get("/backends")
+async def llm_backend_stats() -> list:
+    """
+    Health and load of each llama.cpp replica.
+    """
+    return llm_backends.stats()
+
+@router.get("/structured-output")
+async def structured_output_metrics() -> dict:
+    """
+    Parse outcomes (fast path, recovered, retried, failed) per response schema.
+    """
+    return structured_output_stats.stats()
+
+@router.get("/routing")
+async def model_routing_stats() -> dict:
+    """
+    Small/large model routing decisions and recent latency per tier.
+    """
+    return model_router.stats()
+
+@router.get("/scheduler")
+async def llm_scheduler_stats() -> dict:
+    """
+    Queue depth, concurrency and wait-time metrics per LLM scheduler lane.
+    """
+    return llm_scheduler.stats()
+
+@router.get("/tokens")
+async def prompt_token_stats() -> dict:
+    """
+    Prompt token counts recorded per node.
+    """
+    return token_usage.stats()
 
 @router.post("/planner")
 async def test_planner(request: PlannerRequest) -> dict:
@@ -63,7 +117,7 @@ async def test_planner(request: PlannerRequest) -> dict:
         config = RunnableConfig(configurable={})
         
         # Call the planner node
-        updated_state = planner(state, config)
+        updated_state = await planner(state, config)
     
         return {
             "subtasks": updated_state.messages[-1].content # type: ignore
@@ -1,59 +1,180 @@
 
+import json
 import logging
-from fastapi import APIRouter, HTTPException, Depends
+import uuid
+from typing import AsyncIterator
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from langchain_core.messages import HumanMessage
+from langchain_core.runnables import RunnableConfig
+from langgraph.types import Command
+from starlette.background import BackgroundTask
 
 from services.api.agent.graph import graph
+from services.api.agent.nodes.summarize import summarize
+from services.api.agent.scheduler import llm_scheduler
 from services.api.agent.schemas import AgentState
 from services.api.agent.utils import count_messages
-from services.api.redis.client import get_redis_client, RedisClient
+from services.api.core.config import settings
 from services.api.redis.agent_state import AgentStateRedis
+from services.api.redis.client import redis_client
+from services.api.utils.deadline import ClientDisconnectedError, DeadlineExceededError, cancel_on_disconnect, deadline_scope, with_deadline
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/genie")
 
 @router.post("/")
-async def lox_genie(message: str, thread_id: str | None = None, redis_client: RedisClient = Depends(get_redis_client)) -> dict:
+async def lox_genie(request: Request, message: str, background_tasks: BackgroundTasks, thread_id: str | None = None) -> dict:
     """
     Chat with the Lox Genie.
 
+    The turn runs under REQUEST_DEADLINE_SECONDS and is cancelled, along with
+    any in-flight LLM generation, if the client disconnects first.
+
     Args:
         message: User message to chat with Lox Genie
         thread_id: Optional thread ID for conversation continuity
     Returns:
-        dict: AI response wit   h content and metadata
+        dict: AI response with content and metadata
     """
+    llm_scheduler.admit("interactive")
     try:
-        if thread_id:
-            state_dict = await redis_client.get_agent_state(thread_id)
-            if state_dict:
-                logger.info(f"Retrieved state_dict type: {type(state_dict)}")
-                logger.info(f"State dict keys: {list(state_dict.keys())}")
-                if 'message_counts' in state_dict:
-                    logger.info(f"message_counts type: {type(state_dict['message_counts'])}")
-                state = AgentStateRedis.to_agent_state(state_dict)
-            else:
-                state = AgentState(thread_id=thread_id, messages=[HumanMessage(content=message)])
-        else:
-            # Create new conversation
-            state = AgentState(messages=[HumanMessage(content=message)])
-            state.message_counts = count_messages(state.messages)
-
-        # Invoke the graph with the state
-        state = graph.invoke(state)
-        
-        # Save state to Redis as dictionary
-        state_dict = AgentStateRedis.from_agent_state(state)
-        
-        # Handle both dict and AgentState
-        thread_id = state.get("thread_id") if isinstance(state, dict) else state.thread_id
-        last_message = state.get("messages", [])[-1] if isinstance(state, dict) else state.messages[-1]
-        last_message_content = last_message.get("content") if isinstance(last_message, dict) else last_message.content
-        
-        await redis_client.set_agent_state(thread_id, state_dict)
+        with deadline_scope(settings.REQUEST_DEADLINE_SECONDS):
+            graph_input, config = await load_thread_input(message, thread_id)
+
+            # Invoke the graph asynchronously; the checkpointer persists each step
+            result = await cancel_on_disconnect(request, with_deadline(graph.ainvoke(graph_input, config), "graph run"))
+        state = AgentState.model_validate(result)
+
+        # Fold older messages into the thread summary once the response is sent
+        background_tasks.add_task(summarize_thread, state.thread_id)
 
         # Return the response
-        return {"response": last_message_content, "thread_id": thread_id}
+        return {"response": state.messages[-1].content, "thread_id": state.thread_id}
+    except (DeadlineExceededError, ClientDisconnectedError):
+        raise
     except Exception as exc:
         logger.error(f"Error in lox_genie: {exc}", exc_info=True)
-        raise HTTPException(status_code=500, detail=f"Failed to generate response: {str(exc)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Failed to generate response: {str(exc)}")
+
+@router.post("/stream")
+async def lox_genie_stream(message: str, thread_id: str | None = None) -> StreamingResponse:
+    """
+    Chat with the Lox Genie, streaming progress as newline-delimited JSON.
+
+    Events, one JSON object per line:
+        {"event": "start", "thread_id": ...}
+        {"event": "node", "node": "gatekeeper"}      when a graph node completes
+        {"event": "token", "content": "..."}         answer text as it is generated
+        {"event": "interrupt", "value": ...}         the graph is waiting for the user's reply
+        {"event": "done", "response": ..., "thread_id": ...}
+        {"event": "error", "detail": ...}
+
+    Each step is checkpointed as it completes, and the thread summary is updated
+    after the response has finished. The run is bounded by REQUEST_DEADLINE_SECONDS
+    and is cancelled with the stream when the client disconnects.
+    """
+    llm_scheduler.admit("interactive")
+    try:
+        graph_input, config = await load_thread_input(message, thread_id)
+    except Exception as exc:
+        logger.error(f"Error in lox_genie_stream: {exc}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Failed to load thread: {str(exc)}")
+
+    thread_id = config["configurable"]["thread_id"]
+    return StreamingResponse(
+        stream_graph_events(graph_input, config),
+        media_type="application/x-ndjson",
+        background=BackgroundTask(summarize_thread, thread_id),
+    )
+
+async def stream_graph_events(graph_input: AgentState | Command, config: RunnableConfig) -> AsyncIterator[str]:
+    """Run the graph in streaming mode and serialize its events as NDJSON lines."""
+    thread_id = config["configurable"]["thread_id"]
+    yield json.dumps({"event": "start", "thread_id": thread_id}) + "\n"
+    events = graph.astream(graph_input, config, stream_mode=["updates", "custom", "values"]).__aiter__()
+    try:
+        final = None
+        with deadline_scope(settings.REQUEST_DEADLINE_SECONDS):
+            while True:
+                try:
+                    mode, chunk = await with_deadline(events.__anext__(), "graph run")
+                except StopAsyncIteration:
+                    break
+                if mode == "custom":
+                    yield json.dumps(chunk) + "\n"
+                elif mode == "updates":
+                    for node, update in chunk.items():
+                        if node == "__interrupt__":
+                            yield json.dumps({"event": "interrupt", "value": [item.value for item in update]}, default=str) + "\n"
+                        elif not node.startswith("__"):
+                            yield json.dumps({"event": "node", "node": node}) + "\n"
+                else:
+                    final = chunk
+
+        state = AgentState.model_validate(final)
+        yield json.dumps({"event": "done", "response": state.messages[-1].content, "thread_id": state.thread_id}) + "\n"
+    except DeadlineExceededError as exc:
+        logger.warning(f"lox_genie_stream for thread {thread_id}: {exc}")
+        yield json.dumps({"event": "error", "detail": "The response took too long, please try again."}) + "\n"
+    except Exception as exc:
+        logger.error(f"Error in lox_genie_stream: {exc}", exc_info=True)
+        yield json.dumps({"event": "error", "detail": f"Failed to generate response: {str(exc)}"}) + "\n"
+    finally:
+        await events.aclose()
+
+def thread_config(thread_id: str) -> RunnableConfig:
+    """Runnable config addressing a thread's checkpoints."""
+    return RunnableConfig(configurable={"thread_id": thread_id})
+
+async def load_thread_input(message: str, thread_id: str | None) -> tuple[AgentState | Command, RunnableConfig]:
+    """
+    Build the graph input for a user message.
+
+    A thread paused at an interrupt (human_in_loop) is resumed with the message;
+    otherwise the message is appended to the thread's latest checkpointed state,
+    or to its agent state stored before the graph was checkpointed (which the
+    run then checkpoints), or a new thread is started.
+    """
+    thread_id = thread_id or str(uuid.uuid4())
+    config = thread_config(thread_id)
+    snapshot = await graph.aget_state(config)
+    if snapshot.next:
+        return Command(resume=message), config
+
+    if snapshot.values:
+        state = AgentState.model_validate(snapshot.values)
+    elif legacy_state := await redis_client.get_agent_state(thread_id):
+        logger.info(f"Continuing thread {thread_id} from its legacy agent state")
+        state = AgentStateRedis.to_agent_state(legacy_state)
+        state.thread_id = thread_id
+    else:
+        state = AgentState(thread_id=thread_id)
+    state.messages.append(HumanMessage(content=message))
+    state.message_counts = count_messages(state.messages)
+    return state, config
+
+async def summarize_thread(thread_id: str) -> None:
+    """
+    Update a thread's rolling summary off the request path.
+
+    The summary is applied as a state update on the latest checkpoint, skipped if
+    the thread is paused at an interrupt or a newer summary already exists.
+    """
+    try:
+        config = thread_config(thread_id)
+        snapshot = await graph.aget_state(config)
+        if not snapshot.values or snapshot.next:
+            return
+        state = AgentState.model_validate(snapshot.values)
+        covered = state.reduced_context.covered
+        state = await summarize(state, RunnableConfig(configurable={}))
+        if state.reduced_context.covered == covered:
+            return
+
+        latest = await graph.aget_state(config)
+        if latest.next or AgentState.model_validate(latest.values).reduced_context.covered >= state.reduced_context.covered:
+            return
+        await graph.aupdate_state(config, {"reduced_context": state.reduced_context})
+    except Exception as exc:
+        logger.error(f"Error summarizing thread {thread_id}: {exc}", exc_info=True)
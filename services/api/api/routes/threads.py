@@ -1,16 +1,61 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from langchain_core.runnables import RunnableConfig
+
+from services.api.agent.graph import graph
+from services.api.agent.schemas import AgentState
+from services.api.redis.checkpointer import redis_checkpointer
+from services.api.redis.agent_state_crud import THREAD_BATCH_SIZE
 from services.api.redis.client import get_redis_client, RedisClient
 from services.api.utils.logger import logger
 
 router = APIRouter(prefix="/threads")
 
 
+# Declared before /{thread_id}, which would otherwise match "active"
+@router.get("/active")
+async def list_active_threads(
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=THREAD_BATCH_SIZE),
+    redis_client: RedisClient = Depends(get_redis_client),
+) -> dict:
+    """
+    List active thread IDs from the thread index, most recently updated first.
+    """
+    thread_ids = await redis_client.list_thread_ids(offset=offset, limit=limit)
+    logger.info(f"Listed {len(thread_ids)} threads")
+    return {"thread_ids": thread_ids, "count": len(thread_ids), "offset": offset, "limit": limit}
+
+
+@router.delete("/active")
+async def delete_all_active_threads(redis_client: RedisClient = Depends(get_redis_client)) -> dict:
+    """
+    Delete all threads from Redis, a page of the thread index at a time.
+    """
+    deleted_count = 0
+    while thread_ids := await redis_client.list_thread_ids(limit=THREAD_BATCH_SIZE):
+        for thread_id in thread_ids:
+            # Both deletes drop the thread from the index
+            await redis_checkpointer.adelete_thread(thread_id)
+            await redis_client.delete_agent_state(thread_id)
+        deleted_count += len(thread_ids)
+    logger.info(f"All {deleted_count} threads deleted")
+    return {"success": True, "deleted_count": deleted_count}
+
+
 @router.get("/{thread_id}")
 async def get_thread_by_id(thread_id: str, redis_client: RedisClient = Depends(get_redis_client)) -> dict:
     """
     Retrieve a thread by its thread_id from Redis.
+
+    Reads the latest checkpointed state, falling back to threads stored before
+    the graph was checkpointed.
     """
-    agent_state = await redis_client.get_agent_state(thread_id)
+    snapshot = await graph.aget_state(RunnableConfig(configurable={"thread_id": thread_id}))
+    if snapshot.values:
+        agent_state = AgentState.model_validate(snapshot.values).model_dump(mode="json")
+        agent_state["last_updated"] = snapshot.created_at
+    else:
+        agent_state = await redis_client.get_agent_state(thread_id)
     if not agent_state:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Thread not found")
     logger.info(f"Thread {thread_id} found")
@@ -28,33 +73,12 @@ async def get_thread_by_id(thread_id: str, redis_client: RedisClient = Depends(g
     }
 
 
-@router.get("/active")
-async def list_active_threads(redis_client: RedisClient = Depends(get_redis_client)) -> dict:
-    """
-    List all active thread IDs from Redis.
-    """
-    thread_ids = await redis_client.list_thread_ids()
-    logger.info(f"Listed {len(thread_ids)} threads")
-    return {"thread_ids": thread_ids, "count": len(thread_ids)}
-
-
 @router.delete("/{thread_id}")
 async def delete_thread(thread_id: str, redis_client: RedisClient = Depends(get_redis_client)) -> dict:
     """
     Delete a thread by its thread_id from Redis.
     """
+    await redis_checkpointer.adelete_thread(thread_id)
     await redis_client.delete_agent_state(thread_id)
     logger.info(f"Thread {thread_id} deleted")
     return {"success": True, "thread_id": thread_id}
-
-
-@router.delete("/active")
-async def delete_all_active_threads(redis_client: RedisClient = Depends(get_redis_client)) -> dict:
-    """
-    Delete all threads from Redis.
-    """
-    thread_ids = await redis_client.list_thread_ids()
-    for thread_id in thread_ids:
-        await redis_client.delete_agent_state(thread_id)
-    logger.info(f"All {len(thread_ids)} threads deleted")
-    return {"success": True, "deleted_count": len(thread_ids)}
\ No newline at end of file
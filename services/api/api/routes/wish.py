@@ -2,45 +2,48 @@
 Generate a creative fantasy football question using LLM.
 """
 import logging
-from fastapi import APIRouter, HTTPException
-from langchain_openai import ChatOpenAI
+from fastapi import APIRouter, HTTPException, Request
 from langchain_core.messages import SystemMessage
+from services.api.agent.backends import llm_backends
 from services.api.agent.config import Configuration
+from services.api.agent.llm import get_llm
+from services.api.agent.scheduler import llm_scheduler
 from services.api.agent.utils import get_current_date
 from services.api.agent.prompts.wish import prompt
 from services.api.core.config import settings
+from services.api.utils.deadline import ClientDisconnectedError, DeadlineExceededError, cancel_on_disconnect, deadline_scope
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/wish")
 
 @router.post("/generate")
-async def generate_wish() -> dict:
+async def generate_wish(request: Request) -> dict:
     """
     Generate a creative fantasy football question using LLM.
+
+    Bounded by REQUEST_DEADLINE_SECONDS and cancelled if the client disconnects.
     
     Returns:
         dict: Generated question
     """
+    llm_scheduler.admit("interactive")
     try:
         # Initialize configuration
         config = Configuration.from_runnable_config()
         logger.info(f"Configuration: {config}")
 
-        # Initialize LLM
-        llm = ChatOpenAI(
-            base_url=settings.LLM_BASE_URL,
-            api_key="not-needed",
-            model=config.wish_generator_model,
-            temperature=0.7,
-            max_tokens=100,
-        )
-        
         # Format the prompt
         formatted_prompt = prompt.format(current_date=get_current_date())
         messages = [SystemMessage(content=formatted_prompt)]
         
         # Invoke the LLM asynchronously
-        response = await llm.ainvoke(messages)
+        async def invoke_llm():
+            async with llm_scheduler.slot("interactive"):
+                return await llm_backends.run(
+                    lambda base_url: get_llm(config.wish_generator_model, 0.7, base_url=base_url, max_tokens=100).ainvoke(messages)
+                )
+        with deadline_scope(settings.REQUEST_DEADLINE_SECONDS):
+            response = await cancel_on_disconnect(request, invoke_llm())
         generated_question = response.content.strip()
         
         # Remove quotes if the LLM wrapped the question in them
@@ -52,6 +55,8 @@ async def generate_wish() -> dict:
         logger.info(f"Generated wish: {generated_question}")
         return {"question": generated_question}
     
+    except (DeadlineExceededError, ClientDisconnectedError):
+        raise
     except Exception as exc:
         logger.error(f"Error generating wish: {exc}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to generate wish: {str(exc)}")
\ No newline at end of file
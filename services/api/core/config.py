@@ -1,3 +1,4 @@
+from typing import List, Literal
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -17,9 +18,54 @@ class Settings(BaseSettings):
 
     # LLM
     LLM_BASE_URL: str = "http://llama:8002"
+    LLM_BASE_URLS: List[str] = []  # llama.cpp replicas; defaults to [LLM_BASE_URL]
+    LLM_HEALTH_CHECK_SECONDS: float = 10
+    LLM_AFFINITY_SLACK: int = 2  # Extra outstanding requests tolerated to keep a thread on its replica
+    LLM_PARALLEL_SLOTS: int = 1  # Match llama.cpp's --parallel (per replica)
+    LLM_BACKGROUND_SLOTS: int = 1  # Slots background work (summaries) may hold at once
+    LLM_INTERACTIVE_QUEUE_LIMIT: int = 32
+    LLM_BACKGROUND_QUEUE_LIMIT: int = 64
+    LLM_CONTEXT_TOKENS: int = 4096  # Per-slot context: llama.cpp's -c divided by --parallel
+    LLM_RESPONSE_TOKENS: int = 512  # Reserved for the completion
+    LLM_STRUCTURED_OUTPUT: Literal["json_schema", "function_calling"] = "json_schema"  # json_schema: llama.cpp grammar
+    LLM_STRUCTURED_RETRIES: int = 1  # Regenerations after a response fails to parse
+    LLM_LARGE_MODEL: str = ""  # Stronger model for complex questions; empty disables routing
+    LLM_LARGE_BASE_URLS: List[str] = []  # Its replicas; required for routing, which is disabled without them
+    LLM_ROUTING_COMPLEXITY_THRESHOLD: float = 0.5
+    LLM_ROUTING_MAX_QUEUE_DEPTH: int = 2  # Queued interactive calls beyond which everything goes to the small model
+    LLM_ROUTING_LATENCY_SLO_SECONDS: float = 8
+
+    # Requests
+    REQUEST_DEADLINE_SECONDS: float = 90  # Budget for a whole chat turn (queueing, LLM and tool calls)
+
+    # Tracing
+    TRACE_FILE: str = ""  # Append OTLP/JSON traces here, e.g. "traces/otlp.jsonl"
+    TRACE_OTLP_ENDPOINT: str = ""  # OTLP/HTTP collector, e.g. "http://otel-collector:4318/v1/traces"
 
     # MCP
     MCP_BASE_URL: str = "http://mcp:8001"
+    MCP_CATALOG_TTL_SECONDS: float = 300
+    MCP_CATALOG_RETRY_SECONDS: float = 5
+    MCP_CATALOG_MAX_BACKOFF_SECONDS: float = 300
+    TOOL_TOP_K: int = 8
+
+    # Agent
+    EXECUTOR_MAX_CONCURRENCY: int = 4
+    TOOL_MEMO_TTL_SECONDS: float = 600
+    TOOL_MEMO_MAX_ENTRIES: int = 64
+    TRIAGE_MIN_CONFIDENCE: float = 0.9
+    TRIAGE_MAX_TRIVIAL_WORDS: int = 12
+    CONTEXT_VERBATIM_MESSAGES: int = 6  # Last 3 turns stay verbatim in prompts
+    SUMMARIZE_MIN_NEW_MESSAGES: int = 4
+    SUMMARY_MAX_WORDS: int = 150
+    SUMMARY_MAX_TOKENS: int = 300
+    ANSWER_CACHE_MAX_ENTRIES: int = 2048
+    ANSWER_CACHE_TTL_SECONDS: float = 6 * 3600
+    ANSWER_CACHE_THREAD_TTL_SECONDS: float = 1800
+    ANSWER_CACHE_MIN_SIMILARITY: float = 92
+    PLAN_CACHE_MAX_ENTRIES: int = 512
+    PLAN_CACHE_TTL_SECONDS: float = 24 * 3600
+    PLAN_CACHE_THREAD_TTL_SECONDS: float = 1800
 
     # MongoDB
     MONGODB_HOST: str = "mongodb"
@@ -8,11 +8,13 @@ import sys
 import argparse
 import asyncio
 from typing import Optional
-from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.runnables import RunnableConfig
 from langchain_community.document_loaders import YoutubeLoader
 from services.api.agent.config import Configuration
+from services.api.agent.backends import llm_backends
+from services.api.agent.llm import get_llm
+from services.api.agent.scheduler import llm_scheduler
 from services.api.utils.logger import logger
 
 FANTASY_ADVICE_PROMPT = """
@@ -111,7 +113,7 @@ def get_video_transcript(video_id: str) -> Optional[str]:
         return None
 
 
-async def extract_fantasy_advice(title: str, transcript: str, config: RunnableConfig) -> str:
+async def extract_fantasy_advice(title: str, transcript: str, config: Optional[RunnableConfig] = None) -> str:
     """
     Use LLM to extract general fantasy football advice from a transcript.
     
@@ -124,18 +126,13 @@ async def extract_fantasy_advice(title: str, transcript: str, config: RunnableCo
         str: Extracted fantasy football advice synopsis
     """
     try:
-        # Initialize LLM with same pattern as other agents
+        # Get the shared LLM client with same pattern as other agents
         configuration = Configuration.from_runnable_config(config)
-        llm = ChatOpenAI(
-            base_url=configuration.llm_base_url,
-            api_key="not-needed",  # llama.cpp doesn't require API key
-            model=configuration.summarizer_model,
-            temperature=0.0,
-        )
         
         # Format prompt with transcript, invoke LLM
         prompt = ChatPromptTemplate.from_template(FANTASY_ADVICE_PROMPT).format(title=title, transcript=transcript)
-        response = await llm.ainvoke(prompt)
+        async with llm_scheduler.slot("background"):
+            response = await llm_backends.run(lambda base_url: get_llm(configuration.summarizer_model, 0.0, base_url=base_url).ainvoke(prompt))
 
         return response.content
     except Exception as e:
@@ -3,46 +3,40 @@ Simple CRUD operations for AgentState in Redis
 """
 import json
 import logging
+import time
 from typing import Dict, Any, Optional, List
 import redis.asyncio as redis
 
 from services.api.redis.agent_state import AgentStateRedis
+from services.api.redis.codec import StateCodec, StateCodecError
 from services.api.redis.config import get_redis_settings
 
 logger = logging.getLogger(__name__)
 
+# Threads per SCAN and index page when walking every thread
+THREAD_BATCH_SIZE = 500
+
 class AgentStateCRUD:
-    """Simple CRUD operations for AgentState in Redis"""
+    """
+    Simple CRUD operations for AgentState in Redis
+
+    Threads are written by the graph checkpointer, which scores each thread in a
+    sorted-set index by its last update, so listing and counting never need KEYS.
+    The `thread:{id}` agent state blobs here are only those stored before it: they
+    are read with StateCodec (which also accepts their plain-JSON form), deleted
+    with their thread, and backfilled into the index. Deleting every thread is
+    done through the index by DELETE /threads/active.
+    """
     
     def __init__(self):
         self.settings = get_redis_settings()
+        self.codec = StateCodec()
+        self._index_checked = False
     
     def _get_key(self, thread_id: str) -> str:
         """Get Redis key for thread_id"""
         return AgentStateRedis.get_redis_key(thread_id)
     
-    async def set_agent_state(self, redis_client: redis.Redis, thread_id: str, state_dict: Dict[str, Any]) -> bool:
-        """Store agent state as dictionary in Redis"""
-        try:
-            key = self._get_key(thread_id)
-            
-            # Add timestamp
-            redis_time = await redis_client.time()
-            state_dict['redis_updated_at'] = json.dumps({"timestamp": redis_time[0]})
-            
-            # Serialize to JSON
-            data = json.dumps(state_dict, default=str)
-            
-            # Store with TTL
-            await redis_client.setex(key, self.settings.redis_ttl_seconds, data)
-            
-            logger.info(f"Stored agent state for thread {thread_id}")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Failed to store agent state for thread {thread_id}: {e}")
-            return False
-    
     async def get_agent_state(self, redis_client: redis.Redis, thread_id: str) -> Optional[Dict[str, Any]]:
         """Retrieve agent state as dictionary from Redis"""
         try:
@@ -52,16 +46,13 @@ class AgentStateCRUD:
             if not data:
                 return None
             
-            # Parse JSON back to dict
-            state_dict = json.loads(data)
+            # Decode back to dict (legacy JSON values are still readable)
+            state_dict = self.codec.loads(data)
             logger.info(f"Retrieved agent state for thread {thread_id}")
-            logger.info(f"Parsed state_dict type: {type(state_dict)}")
-            if 'message_counts' in state_dict:
-                logger.info(f"message_counts type after JSON parse: {type(state_dict['message_counts'])}")
             return state_dict
             
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse JSON for thread {thread_id}: {e}")
+        except (json.JSONDecodeError, StateCodecError) as e:
+            logger.error(f"Failed to decode agent state for thread {thread_id}: {e}")
             return None
         except Exception as e:
             logger.error(f"Failed to get agent state for thread {thread_id}: {e}")
@@ -71,7 +62,10 @@ class AgentStateCRUD:
         """Delete specific agent state by thread_id"""
         try:
             key = self._get_key(thread_id)
-            result = await redis_client.delete(key)
+            pipe = redis_client.pipeline(transaction=False)
+            pipe.delete(key)
+            pipe.zrem(self.settings.redis_thread_index_key, thread_id)
+            result, _ = await pipe.execute()
             
             if result:
                 logger.info(f"Deleted agent state for thread {thread_id}")
@@ -84,38 +78,51 @@ class AgentStateCRUD:
             logger.error(f"Failed to delete agent state for thread {thread_id}: {e}")
             return False
     
-    async def delete_all_threads(self, redis_client: redis.Redis) -> int:
-        """Delete all agent states (all threads)"""
-        try:
-            # Find all keys with thread: prefix
-            pattern = "thread:*"
-            keys = await redis_client.keys(pattern)
-            
+    async def _ensure_index(self, redis_client: redis.Redis) -> None:
+        """
+        Index threads stored before the thread index existed (once per process).
+
+        Uses SCAN in batches rather than KEYS, so other clients are not blocked.
+        Every write resets a thread's TTL, so a backfilled thread is scored by the
+        update time its remaining TTL implies and is pruned like any other.
+        """
+        if self._index_checked:
+            return
+        index_key = self.settings.redis_thread_index_key
+        prefix = f"{self.settings.redis_key_prefix}:"
+        now = time.time()
+        cursor = None
+        while cursor != 0:
+            cursor, keys = await redis_client.scan(cursor or 0, match=f"{prefix}*", count=THREAD_BATCH_SIZE)
             if not keys:
-                logger.info("No agent states found to delete")
-                return 0
-            
-            # Delete all keys
-            deleted_count = await redis_client.delete(*keys)
-            
-            logger.info(f"Deleted {deleted_count} agent states (all threads)")
-            return deleted_count
-            
-        except Exception as e:
-            logger.error(f"Failed to delete all threads: {e}")
-            return 0
+                continue
+            pipe = redis_client.pipeline(transaction=False)
+            for key in keys:
+                pipe.ttl(key)
+            scores = {
+                key.decode()[len(prefix):]: now - (self.settings.redis_ttl_seconds - ttl if ttl >= 0 else 0)
+                for key, ttl in zip(keys, await pipe.execute())
+                if ttl != -2
+            }
+            if scores:
+                await redis_client.zadd(index_key, scores, nx=True)
+        self._index_checked = True
+    
+    async def _prune_index(self, redis_client: redis.Redis) -> None:
+        """Drop index entries for threads whose TTL has lapsed without an update."""
+        cutoff = time.time() - self.settings.redis_ttl_seconds
+        await redis_client.zremrangebyscore(self.settings.redis_thread_index_key, "-inf", cutoff)
     
-    async def list_thread_ids(self, redis_client: redis.Redis) -> List[str]:
-        """List all thread IDs"""
+    async def list_thread_ids(self, redis_client: redis.Redis, offset: int = 0, limit: Optional[int] = None) -> List[str]:
+        """List thread IDs, most recently updated first"""
         try:
-            pattern = "thread:*"
-            keys = await redis_client.keys(pattern)
-            
-            # Extract thread IDs from keys
-            thread_ids = []
-            for key in keys:
-                thread_id = key.decode('utf-8').replace("thread:", "")
-                thread_ids.append(thread_id)
+            await self._ensure_index(redis_client)
+            await self._prune_index(redis_client)
+            end = offset + limit - 1 if limit is not None else -1
+            thread_ids = [
+                thread_id.decode()
+                for thread_id in await redis_client.zrevrange(self.settings.redis_thread_index_key, offset, end)
+            ]
             
             logger.info(f"Found {len(thread_ids)} threads")
             return thread_ids
@@ -136,9 +143,9 @@ class AgentStateCRUD:
     async def get_thread_count(self, redis_client: redis.Redis) -> int:
         """Get total number of threads"""
         try:
-            pattern = "thread:*"
-            keys = await redis_client.keys(pattern)
-            return len(keys)
+            await self._ensure_index(redis_client)
+            await self._prune_index(redis_client)
+            return await redis_client.zcard(self.settings.redis_thread_index_key)
         except Exception as e:
             logger.error(f"Failed to count threads: {e}")
             return 0
\ No newline at end of file
@@ -0,0 +1,371 @@
+"""
+Redis-backed LangGraph checkpointer with incremental writes
+"""
+import json
+import logging
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+import redis.asyncio as redis
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+
+from services.api.redis.client import RedisClient, redis_client
+from services.api.redis.codec import StateCodec
+from services.api.redis.config import get_redis_settings
+from services.api.utils.tracing import traced
+
+logger = logging.getLogger(__name__)
+
+# AgentState fields that nodes only ever append to
+APPEND_ONLY_CHANNELS = ("messages", "tool_calls")
+LIST_MARKER = "__list__"
+LIST_TAIL_MARKER = "__tail__"
+
+class RedisCheckpointSaver(BaseCheckpointSaver[int]):
+    """
+    LangGraph checkpointer storing per-channel deltas in Redis.
+
+    Layout, per thread and checkpoint namespace (prefix "checkpoint:{thread}:{ns}"):
+        :index                   sorted set of checkpoint ids (lexicographic = chronological)
+        :{checkpoint_id}         hash of the checkpoint (without values), metadata and parent id
+        :writes:{checkpoint_id}  hash of pending writes, so interrupted runs can be resumed
+        :blob:{channel}          hash of version -> serialized channel value
+        :list:{channel}:{gen}    list holding an append-only channel's items
+        :lists                   hash of append-only channel -> current list generation
+
+    Every checkpoint also scores its thread in the shared thread index (the sorted
+    set at `redis_thread_index_key`) by the time of the write, so threads are
+    listed most recently active first without scanning the keyspace.
+
+    Only channels updated in a step are written. Append-only channels (messages,
+    tool_calls) are stored as Redis lists: a step RPUSHes just its new items and
+    the channel version records the list length, so a turn's write cost does not
+    grow with the thread. If a list was not simply appended to (e.g. a fork from an
+    older checkpoint), a new list generation is started. Pending writes of those
+    channels store only the items past the prefix they share with the channel's
+    stored list (checked against Redis when the write is stored, so it holds
+    whichever process wrote the checkpoint) and are rebuilt from that prefix on
+    load; a value that diverges from the list is stored in full. Items of a list
+    generation never change, so the prefix stays valid. Only the newest
+    `max_checkpoints` checkpoints are retained; blobs they no longer reference are
+    removed when older checkpoints are pruned, and every key shares the thread TTL.
+
+    Values are serialized with StateCodec, which compresses large payloads.
+    Commands go through the shared RedisClient's connection pool, so they get its
+    health checks and retries on dropped connections.
+
+    Only the async API is implemented; the graph is always run asynchronously.
+    """
+
+    def __init__(self, append_only_channels: Sequence[str] = APPEND_ONLY_CHANNELS, max_checkpoints: Optional[int] = None, serde: Any = None, client: Optional[RedisClient] = None):
+        self.settings = get_redis_settings()
+        super().__init__(serde=serde or StateCodec(compress_threshold=self.settings.redis_state_compress_threshold))
+        self.append_only_channels = set(append_only_channels)
+        self.max_checkpoints = max_checkpoints or self.settings.redis_max_checkpoints
+        self.client = client or redis_client
+
+    async def _client(self) -> redis.Redis:
+        """The shared binary (non-decoding) Redis connection."""
+        await self.client.ensure_connected()
+        return self.client.redis_client
+
+    def _key(self, thread_id: str, checkpoint_ns: str, *parts: str) -> str:
+        return ":".join([self.settings.redis_checkpoint_prefix, thread_id, checkpoint_ns, *parts])
+
+    @staticmethod
+    def _pack(typed: Tuple[str, bytes]) -> bytes:
+        return typed[0].encode() + b"|" + typed[1]
+
+    @staticmethod
+    def _unpack(data: bytes) -> Tuple[str, bytes]:
+        type_, _, payload = data.partition(b"|")
+        return type_.decode(), payload
+
+    # Writes
+    @traced("redis.checkpoint.put")
+    async def aput(self, config: RunnableConfig, checkpoint: Checkpoint, metadata: CheckpointMetadata, new_versions: ChannelVersions) -> RunnableConfig:
+        """Store a checkpoint, writing only the channels updated since its parent."""
+        client = await self._client()
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        stored = checkpoint.copy()
+        values: Dict[str, Any] = stored.pop("channel_values")  # type: ignore[misc]
+
+        pipe = client.pipeline(transaction=True)
+        touched = {self._key(thread_id, checkpoint_ns, "index"), self._key(thread_id, checkpoint_ns, checkpoint["id"])}
+        for channel, version in new_versions.items():
+            blob_key = self._key(thread_id, checkpoint_ns, "blob", channel)
+            if channel not in values:
+                blob = self._pack(("empty", b""))
+            elif channel in self.append_only_channels and isinstance(values[channel], list):
+                blob = await self._append_list(client, pipe, touched, thread_id, checkpoint_ns, channel, values[channel])
+            else:
+                blob = self._pack(self.serde.dumps_typed(values[channel]))
+            pipe.hset(blob_key, str(version), blob)
+            touched.add(blob_key)
+
+        pipe.hset(self._key(thread_id, checkpoint_ns, checkpoint["id"]), mapping={
+            "checkpoint": self._pack(self.serde.dumps_typed(stored)),
+            "metadata": self._pack(self.serde.dumps_typed(get_checkpoint_metadata(config, metadata))),
+            "parent_id": config["configurable"].get("checkpoint_id") or "",
+        })
+        pipe.zadd(self._key(thread_id, checkpoint_ns, "index"), {checkpoint["id"]: 0})
+        pipe.zadd(self.settings.redis_thread_index_key, {thread_id: time.time()})
+        for key in touched:
+            pipe.expire(key, self.settings.redis_ttl_seconds)
+        await pipe.execute()
+
+        await self._prune(client, thread_id, checkpoint_ns)
+        return {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint["id"]}}
+
+    async def _append_list(self, client: redis.Redis, pipe: Any, touched: set, thread_id: str, checkpoint_ns: str, channel: str, items: List[Any]) -> bytes:
+        """Queue RPUSH of the items not yet stored; return the version marker."""
+        lists_key = self._key(thread_id, checkpoint_ns, "lists")
+        generation = int(await client.hget(lists_key, channel) or 0)
+        list_key = self._key(thread_id, checkpoint_ns, "list", channel, str(generation))
+        length, last = await client.pipeline(transaction=False).llen(list_key).lindex(list_key, -1).execute()
+
+        if length > len(items) or (length and last != self._pack(self.serde.dumps_typed(items[length - 1]))):
+            # Not an append to the stored list: start a new generation
+            generation += 1
+            list_key = self._key(thread_id, checkpoint_ns, "list", channel, str(generation))
+            pipe.hset(lists_key, channel, generation)
+            length = 0
+
+        packed_items = [self._pack(self.serde.dumps_typed(item)) for item in items[length:]]
+        if packed_items:
+            pipe.rpush(list_key, *packed_items)
+        touched.update({lists_key, list_key})
+        return self._pack((LIST_MARKER, f"{generation}:{len(items)}".encode()))
+
+    async def _dump_list_writes(self, client: redis.Redis, thread_id: str, checkpoint_ns: str, writes: Sequence[Tuple[str, Any]]) -> Dict[int, Tuple[str, bytes]]:
+        """
+        Serialize pending writes of append-only channels as tails of the channel's stored list.
+
+        The prefix a value shares with the current list generation is found from the
+        list's length and checked on its last item, as in `_append_list`; only the
+        items after it are serialized. Writes that do not match are left out, to be
+        serialized in full.
+        """
+        candidates = [
+            (idx, channel, value) for idx, (channel, value) in enumerate(writes)
+            if channel in self.append_only_channels and isinstance(value, list) and value
+        ]
+        if not candidates:
+            return {}
+        generations = [int(generation or 0) for generation in await client.hmget(
+            self._key(thread_id, checkpoint_ns, "lists"), [channel for _, channel, _ in candidates]
+        )]
+        pipe = client.pipeline(transaction=False)
+        for (_, channel, value), generation in zip(candidates, generations):
+            list_key = self._key(thread_id, checkpoint_ns, "list", channel, str(generation))
+            pipe.llen(list_key).lindex(list_key, -1).lindex(list_key, len(value) - 1)
+        heads = await pipe.execute()
+
+        dumped: Dict[int, Tuple[str, bytes]] = {}
+        for position, ((idx, _, value), generation) in enumerate(zip(candidates, generations)):
+            length, last, at_value_end = heads[3 * position:3 * position + 3]
+            shared = min(length, len(value))
+            stored = last if length <= len(value) else at_value_end
+            if shared and stored == self._pack(self.serde.dumps_typed(value[shared - 1])):
+                tail = self._pack(self.serde.dumps_typed(value[shared:]))
+                dumped[idx] = LIST_TAIL_MARKER, f"{generation}:{shared}".encode() + b"\n" + tail
+        return dumped
+
+    @traced("redis.checkpoint.writes")
+    async def aput_writes(self, config: RunnableConfig, writes: Sequence[Tuple[str, Any]], task_id: str, task_path: str = "") -> None:
+        """Store a task's pending writes against its checkpoint."""
+        client = await self._client()
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        writes_key = self._key(thread_id, checkpoint_ns, "writes", config["configurable"]["checkpoint_id"])
+
+        dumped = await self._dump_list_writes(client, thread_id, checkpoint_ns, writes)
+
+        pipe = client.pipeline(transaction=True)
+        for idx, (channel, value) in enumerate(writes):
+            write_idx = WRITES_IDX_MAP.get(channel, idx)
+            type_, payload = dumped[idx] if idx in dumped else self.serde.dumps_typed(value)
+            data = json.dumps([task_id, channel, task_path, write_idx, type_]).encode() + b"\n" + payload
+            field = f"{task_id}|{write_idx}"
+            # Regular writes are never overwritten; special writes (errors, interrupts) are
+            if write_idx >= 0:
+                pipe.hsetnx(writes_key, field, data)
+            else:
+                pipe.hset(writes_key, field, data)
+        pipe.expire(writes_key, self.settings.redis_ttl_seconds)
+        await pipe.execute()
+
+    # Reads
+    @traced("redis.checkpoint.get")
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        """Load a checkpoint (the latest unless the config names one) with its values and pending writes."""
+        client = await self._client()
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = get_checkpoint_id(config)
+        if not checkpoint_id:
+            latest = await client.zrevrangebylex(self._key(thread_id, checkpoint_ns, "index"), "+", "-", start=0, num=1)
+            if not latest:
+                return None
+            checkpoint_id = latest[0].decode()
+        return await self._load_tuple(client, thread_id, checkpoint_ns, checkpoint_id)
+
+    async def _load_tuple(self, client: redis.Redis, thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> Optional[CheckpointTuple]:
+        saved, writes = await (
+            client.pipeline(transaction=False)
+            .hgetall(self._key(thread_id, checkpoint_ns, checkpoint_id))
+            .hgetall(self._key(thread_id, checkpoint_ns, "writes", checkpoint_id))
+            .execute()
+        )
+        if not saved:
+            return None
+
+        checkpoint: Checkpoint = self.serde.loads_typed(self._unpack(saved[b"checkpoint"]))
+        channel_values = await self._load_channel_values(client, thread_id, checkpoint_ns, checkpoint["channel_versions"])
+        parent_id = saved.get(b"parent_id", b"").decode()
+        return CheckpointTuple(
+            config={"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint_id}},
+            checkpoint={**checkpoint, "channel_values": channel_values},
+            metadata=self.serde.loads_typed(self._unpack(saved[b"metadata"])),
+            pending_writes=await self._load_writes(client, thread_id, checkpoint_ns, writes),
+            parent_config=(
+                {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": parent_id}}
+                if parent_id else None
+            ),
+        )
+
+    async def _load_channel_values(self, client: redis.Redis, thread_id: str, checkpoint_ns: str, versions: ChannelVersions) -> Dict[str, Any]:
+        channels = list(versions.keys())
+        pipe = client.pipeline(transaction=False)
+        for channel in channels:
+            pipe.hget(self._key(thread_id, checkpoint_ns, "blob", channel), str(versions[channel]))
+        blobs = await pipe.execute()
+
+        values: Dict[str, Any] = {}
+        list_reads: List[Tuple[str, str, int]] = []
+        for channel, blob in zip(channels, blobs):
+            if blob is None:
+                continue
+            type_, payload = self._unpack(blob)
+            if type_ == "empty":
+                continue
+            if type_ == LIST_MARKER:
+                generation, length = payload.decode().split(":")
+                list_reads.append((channel, generation, int(length)))
+            else:
+                values[channel] = self.serde.loads_typed((type_, payload))
+
+        if list_reads:
+            pipe = client.pipeline(transaction=False)
+            for channel, generation, length in list_reads:
+                pipe.lrange(self._key(thread_id, checkpoint_ns, "list", channel, generation), 0, length - 1)
+            for (channel, _, _), items in zip(list_reads, await pipe.execute()):
+                values[channel] = [self.serde.loads_typed(self._unpack(item)) for item in items]
+        return values
+
+    async def _load_writes(self, client: redis.Redis, thread_id: str, checkpoint_ns: str, writes: Dict[bytes, bytes]) -> List[Tuple[str, str, Any]]:
+        pending = []
+        tails: List[Tuple[int, str, str, int, Any]] = []
+        for data in writes.values():
+            header, _, payload = data.partition(b"\n")
+            task_id, channel, task_path, write_idx, type_ = json.loads(header)
+            if type_ == LIST_TAIL_MARKER:
+                # The stored list prefix plus the write's new items
+                head, _, tail = payload.partition(b"\n")
+                generation, length = head.decode().split(":")
+                tails.append((len(pending), channel, generation, int(length), self.serde.loads_typed(self._unpack(tail))))
+                value = None
+            else:
+                value = self.serde.loads_typed((type_, payload))
+            pending.append((task_path, task_id, write_idx, channel, value))
+
+        if tails:
+            pipe = client.pipeline(transaction=False)
+            for _, channel, generation, length, _ in tails:
+                pipe.lrange(self._key(thread_id, checkpoint_ns, "list", channel, generation), 0, length - 1)
+            for (position, _, _, _, tail), items in zip(tails, await pipe.execute()):
+                task_path, task_id, write_idx, channel, _ = pending[position]
+                value = [self.serde.loads_typed(self._unpack(item)) for item in items] + tail
+                pending[position] = (task_path, task_id, write_idx, channel, value)
+
+        pending.sort(key=lambda write: write[:3])
+        return [(task_id, channel, value) for _, task_id, _, channel, value in pending]
+
+    async def alist(self, config: Optional[RunnableConfig], *, filter: Optional[Dict[str, Any]] = None, before: Optional[RunnableConfig] = None, limit: Optional[int] = None) -> AsyncIterator[CheckpointTuple]:
+        """List checkpoints newest first, for one thread or (without config) all threads."""
+        client = await self._client()
+        checkpoint_ns = (config or {}).get("configurable", {}).get("checkpoint_ns", "")
+        if config:
+            thread_ids = [config["configurable"]["thread_id"]]
+        else:
+            thread_ids = [thread_id.decode() for thread_id in await client.zrevrange(self.settings.redis_thread_index_key, 0, -1)]
+        upper = f"({get_checkpoint_id(before)}" if before and get_checkpoint_id(before) else "+"
+
+        for thread_id in thread_ids:
+            checkpoint_ids = await client.zrevrangebylex(self._key(thread_id, checkpoint_ns, "index"), upper, "-")
+            for checkpoint_id in checkpoint_ids:
+                checkpoint_tuple = await self._load_tuple(client, thread_id, checkpoint_ns, checkpoint_id.decode())
+                if checkpoint_tuple is None:
+                    continue
+                if filter and not all(checkpoint_tuple.metadata.get(k) == v for k, v in filter.items()):
+                    continue
+                yield checkpoint_tuple
+                if limit is not None:
+                    limit -= 1
+                    if limit <= 0:
+                        return
+
+    # Retention
+    async def _prune(self, client: redis.Redis, thread_id: str, checkpoint_ns: str) -> None:
+        """Drop the oldest checkpoints once the thread holds 1.5x max_checkpoints, and unreferenced blobs."""
+        index_key = self._key(thread_id, checkpoint_ns, "index")
+        count = await client.zcard(index_key)
+        if count <= self.max_checkpoints + self.max_checkpoints // 2:
+            return
+
+        checkpoint_ids = [checkpoint_id.decode() for checkpoint_id in await client.zrangebylex(index_key, "-", "+")]
+        pruned, kept = checkpoint_ids[:count - self.max_checkpoints], checkpoint_ids[count - self.max_checkpoints:]
+
+        pipe = client.pipeline(transaction=False)
+        for checkpoint_id in checkpoint_ids:
+            pipe.hget(self._key(thread_id, checkpoint_ns, checkpoint_id), "checkpoint")
+        saved = dict(zip(checkpoint_ids, await pipe.execute()))
+
+        def channel_versions(checkpoint_id: str) -> set:
+            if not saved.get(checkpoint_id):
+                return set()
+            checkpoint = self.serde.loads_typed(self._unpack(saved[checkpoint_id]))
+            return {(channel, str(version)) for channel, version in checkpoint["channel_versions"].items()}
+
+        referenced = set().union(*(channel_versions(checkpoint_id) for checkpoint_id in kept))
+        orphaned = set().union(*(channel_versions(checkpoint_id) for checkpoint_id in pruned)) - referenced
+
+        pipe = client.pipeline(transaction=True)
+        for channel, version in orphaned:
+            pipe.hdel(self._key(thread_id, checkpoint_ns, "blob", channel), version)
+        for checkpoint_id in pruned:
+            pipe.delete(self._key(thread_id, checkpoint_ns, checkpoint_id), self._key(thread_id, checkpoint_ns, "writes", checkpoint_id))
+        pipe.zrem(index_key, *pruned)
+        await pipe.execute()
+        logger.debug(f"Pruned {len(pruned)} checkpoints for thread {thread_id}")
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        """Delete every checkpoint, blob and write of a thread, and drop it from the thread index."""
+        client = await self._client()
+        keys = [key async for key in client.scan_iter(match=f"{self.settings.redis_checkpoint_prefix}:{thread_id}:*", count=500)]
+        for start in range(0, len(keys), 500):
+            await client.unlink(*keys[start:start + 500])
+        await client.zrem(self.settings.redis_thread_index_key, thread_id)
+
+# Global checkpointer instance
+redis_checkpointer = RedisCheckpointSaver()
@@ -3,6 +3,8 @@ import asyncio
 import logging
 from typing import Optional, Dict, Any, List
 import redis.asyncio as redis
+from redis.asyncio.retry import Retry
+from redis.backoff import ExponentialBackoff
 
 from services.api.redis.config import get_redis_settings
 from services.api.redis.agent_state import AgentStateRedis
@@ -12,7 +14,14 @@ logger = logging.getLogger(__name__)
 
 
 class RedisClient:
-    """Redis client wrapper for API service"""
+    """
+    Redis client wrapper for API service
+
+    Connection health is left to the pool: idle connections are checked with a
+    PING only after `redis_health_check_interval` seconds, and a command that
+    hits a dropped connection is retried on a fresh one with exponential
+    backoff. Each operation is therefore a single round trip.
+    """
 
     def __init__(self):
         self.settings = get_redis_settings()
@@ -23,7 +32,7 @@ class RedisClient:
     async def connect(self) -> None:
         """Connect to Redis server"""
         async with self._connection_lock:
-            if self.redis_client and await self._is_connected():
+            if self.redis_client:
                 return
 
             try:
@@ -36,14 +45,18 @@ class RedisClient:
                     port=self.settings.redis_port,
                     password=self.settings.redis_password,
                     db=self.settings.redis_db,
-                    decode_responses=True,
                     socket_connect_timeout=self.settings.redis_socket_connect_timeout,
                     socket_timeout=self.settings.redis_socket_timeout,
                     health_check_interval=self.settings.redis_health_check_interval,
                     max_connections=self.settings.redis_max_connections,
+                    retry=Retry(
+                        ExponentialBackoff(cap=self.settings.redis_retry_backoff_cap, base=self.settings.redis_retry_backoff_base),
+                        self.settings.redis_retry_attempts,
+                    ),
+                    retry_on_error=[redis.ConnectionError, redis.TimeoutError] if self.settings.redis_retry_on_timeout else [redis.ConnectionError],
                 )
 
-                # Test connection
+                # Test connection once; afterwards the pool's health checks and retries take over
                 await self.redis_client.ping()
                 logger.info(
                     f"Connected to Redis at {self.settings.redis_host}:{self.settings.redis_port}"
@@ -62,19 +75,9 @@ class RedisClient:
                 self.redis_client = None
                 logger.info("Disconnected from Redis")
 
-    async def _is_connected(self) -> bool:
-        """Check if Redis client is connected"""
-        try:
-            if self.redis_client:
-                await self.redis_client.ping()
-                return True
-        except Exception:
-            pass
-        return False
-
     async def ensure_connected(self) -> None:
-        """Ensure Redis connection is established"""
-        if not self.redis_client or not await self._is_connected():
+        """Ensure the Redis client exists (no round trip once connected)"""
+        if not self.redis_client:
             await self.connect()
 
     async def health_check(self) -> Dict[str, Any]:
@@ -85,9 +88,6 @@ class RedisClient:
             if not self.redis_client:
                 return {"status": "disconnected", "error": "No Redis connection"}
 
-            # Test basic operations
-            await self.redis_client.ping()
-
             # Get Redis info
             info = await self.redis_client.info()
 
@@ -113,15 +113,6 @@ class RedisClient:
             logger.error(f"Failed to get agent state for thread {thread_id}: {e}")
             return None
 
-    async def set_agent_state(self, thread_id: str, state_dict: Dict[str, Any]) -> bool:
-        """Set agent state as dictionary with thread_id as key"""
-        try:
-            await self.ensure_connected()
-            return await self.crud.set_agent_state(self.redis_client, thread_id, state_dict)
-        except Exception as e:
-            logger.error(f"Failed to set agent state for thread {thread_id}: {e}")
-            return False
-
     async def delete_agent_state(self, thread_id: str) -> bool:
         """Delete agent state by thread_id"""
         try:
@@ -131,20 +122,11 @@ class RedisClient:
             logger.error(f"Failed to delete agent state for thread {thread_id}: {e}")
             return False
 
-    async def delete_all_threads(self) -> int:
-        """Delete all agent states (all threads)"""
-        try:
-            await self.ensure_connected()
-            return await self.crud.delete_all_threads(self.redis_client)
-        except Exception as e:
-            logger.error(f"Failed to delete all threads: {e}")
-            return 0
-
-    async def list_thread_ids(self) -> List[str]:
-        """List all thread IDs"""
+    async def list_thread_ids(self, offset: int = 0, limit: Optional[int] = None) -> List[str]:
+        """List thread IDs, most recently updated first"""
         try:
             await self.ensure_connected()
-            return await self.crud.list_thread_ids(self.redis_client)
+            return await self.crud.list_thread_ids(self.redis_client, offset=offset, limit=limit)
         except Exception as e:
             logger.error(f"Failed to list thread IDs: {e}")
             return []
@@ -174,8 +156,7 @@ redis_client = RedisClient()
 
 async def get_redis_client() -> RedisClient:
     """Get Redis client instance - FastAPI dependency"""
-    if not redis_client.redis_client or not await redis_client._is_connected():
-        await redis_client.connect()
+    await redis_client.ensure_connected()
     return redis_client
 
 
@@ -0,0 +1,122 @@
+"""
+Compact binary encoding for agent state and graph checkpoints stored in Redis
+"""
+import json
+import zlib
+from typing import Any, Dict, Literal, Optional, Tuple
+
+from langgraph.checkpoint.serde.base import SerializerProtocol
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+try:
+    import ormsgpack
+    HAS_ORMSGPACK = True
+except ImportError:
+    HAS_ORMSGPACK = False
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+try:
+    import zstandard
+    HAS_ZSTD = True
+except ImportError:
+    HAS_ZSTD = False
+
+# Header: magic, schema version, payload encoding, compression
+MAGIC = b"LXS"
+SCHEMA_VERSION = 1
+HEADER_SIZE = len(MAGIC) + 3
+
+ENCODINGS = {"msgpack": b"m", "json": b"j"}
+COMPRESSIONS = {"none": b"n", "zstd": b"z", "zlib": b"d"}
+
+class StateCodecError(ValueError):
+    """Raised when stored state cannot be decoded."""
+
+class StateCodec:
+    """
+    Encodes state dicts as versioned, optionally compressed bytes.
+
+    Payloads are msgpack (ormsgpack) or JSON (orjson, else the standard library),
+    and are compressed with zstd (zlib without the zstandard package) once they
+    exceed `compress_threshold` bytes. A 6-byte header records the schema version,
+    encoding and compression, so every combination stays readable; data without
+    the header is read as the legacy plain-JSON format.
+
+    It is also the graph checkpointer's serializer (SerializerProtocol): values are
+    serialized by `serde` (LangGraph's msgpack-based JsonPlusSerializer by default)
+    and compressed past the same threshold, with the compression appended to the
+    type (e.g. "msgpack+zstd") so uncompressed values stay readable as they are.
+    """
+
+    def __init__(self, encoding: Literal["msgpack", "json"] = "msgpack", compress_threshold: int = 16384, compression_level: int = 3, serde: Optional[SerializerProtocol] = None):
+        self.encoding = encoding if encoding == "json" or HAS_ORMSGPACK else "json"
+        self.compress_threshold = compress_threshold
+        self.compression_level = compression_level
+        self.compression = "zstd" if HAS_ZSTD else "zlib"
+        self.serde = serde or JsonPlusSerializer()
+
+    def _compress(self, payload: bytes) -> Tuple[str, bytes]:
+        """Compress a payload over the threshold; return the compression used and the bytes."""
+        if not self.compress_threshold or len(payload) <= self.compress_threshold:
+            return "none", payload
+        if self.compression == "zstd":
+            return "zstd", zstandard.ZstdCompressor(level=self.compression_level).compress(payload)
+        return "zlib", zlib.compress(payload, self.compression_level)
+
+    @staticmethod
+    def _decompress(compression: str, payload: bytes) -> bytes:
+        if compression == "zstd":
+            if not HAS_ZSTD:
+                raise StateCodecError("State is zstd-compressed but zstandard is not installed")
+            return zstandard.ZstdDecompressor().decompress(payload)
+        if compression == "zlib":
+            return zlib.decompress(payload)
+        return payload
+
+    def dumps(self, state: Dict[str, Any]) -> bytes:
+        if self.encoding == "msgpack":
+            payload = ormsgpack.packb(state, default=str, option=ormsgpack.OPT_NON_STR_KEYS)
+        elif HAS_ORJSON:
+            payload = orjson.dumps(state, default=str, option=orjson.OPT_NON_STR_KEYS)
+        else:
+            payload = json.dumps(state, default=str, separators=(",", ":")).encode("utf-8")
+
+        compression, payload = self._compress(payload)
+        return MAGIC + bytes([SCHEMA_VERSION]) + ENCODINGS[self.encoding] + COMPRESSIONS[compression] + payload
+
+    def loads(self, data: bytes | str) -> Dict[str, Any]:
+        if isinstance(data, str) or not data.startswith(MAGIC):
+            # Legacy format: plain JSON text
+            return json.loads(data)
+
+        version, encoding, compression = data[len(MAGIC)], data[len(MAGIC) + 1:len(MAGIC) + 2], data[len(MAGIC) + 2:HEADER_SIZE]
+        if version > SCHEMA_VERSION:
+            raise StateCodecError(f"Unsupported state schema version {version}")
+        compression = next((name for name, flag in COMPRESSIONS.items() if flag == compression), None)
+        if compression is None:
+            raise StateCodecError("Unknown state compression")
+        payload = self._decompress(compression, data[HEADER_SIZE:])
+
+        if encoding == ENCODINGS["msgpack"]:
+            if not HAS_ORMSGPACK:
+                raise StateCodecError("State is msgpack-encoded but ormsgpack is not installed")
+            return ormsgpack.unpackb(payload)
+        return orjson.loads(payload) if HAS_ORJSON else json.loads(payload)
+
+    # SerializerProtocol, for the graph checkpointer
+    def dumps_typed(self, obj: Any) -> Tuple[str, bytes]:
+        type_, payload = self.serde.dumps_typed(obj)
+        compression, payload = self._compress(payload)
+        return (type_ if compression == "none" else f"{type_}+{compression}"), payload
+
+    def loads_typed(self, data: Tuple[str, bytes]) -> Any:
+        type_, payload = data
+        type_, _, compression = type_.partition("+")
+        if compression and compression not in COMPRESSIONS:
+            raise StateCodecError(f"Unknown checkpoint compression {compression}")
+        return self.serde.loads_typed((type_, self._decompress(compression, payload)))
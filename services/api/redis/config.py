@@ -17,10 +17,19 @@ class RedisSettings(BaseSettings):
     # Redis key settings
     redis_key_prefix: str = "thread"
     redis_ttl_seconds: int = 86400 * 30  # 30 days default TTL
+    redis_thread_index_key: str = "threads:index"  # Sorted set of thread ids scored by last update
+    redis_checkpoint_prefix: str = "checkpoint"
+    redis_max_checkpoints: int = 20  # Checkpoints retained per thread
+
+    # Checkpoint encoding
+    redis_state_compress_threshold: int = 16384  # Compress values larger than this (bytes); 0 disables
 
     # Connection pool settings
     redis_max_connections: int = 10
     redis_retry_on_timeout: bool = True
+    redis_retry_attempts: int = 3  # Retries of a command after a connection error
+    redis_retry_backoff_base: float = 0.05
+    redis_retry_backoff_cap: float = 1.0
     redis_socket_connect_timeout: int = 5
     redis_socket_timeout: int = 5
     redis_health_check_interval: int = 30
@@ -0,0 +1,181 @@
+"""
+Deterministic mock of the llama.cpp OpenAI-compatible server for benchmarks.
+
+Replies are generated from the request's json_schema response_format (or a fixed
+text for plain completions), so the same request always produces the same
+response. Latency is simulated as a fixed time to first token plus
+completion tokens at a fixed generation rate, streamed or not. Like llama-server
+with --parallel, at most `slots` completions are generated at once; the rest
+queue for a free slot.
+"""
+import asyncio
+import json
+import re
+import socket
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Any, List, Optional
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+# Characters per simulated token, matching the agent's token estimator
+CHARS_PER_TOKEN = 4
+PLAIN_TEXT_RESPONSE = "Start Justin Jefferson; his target share gives him the higher floor this week."
+
+def schema_instance(schema: dict, defs: Optional[dict] = None, name: str = "value") -> Any:
+    """Build a deterministic instance of a JSON schema (first enum value, one array item, ...)."""
+    defs = defs if defs is not None else schema.get("$defs", {})
+    if "$ref" in schema:
+        return schema_instance(defs[schema["$ref"].split("/")[-1]], defs, name)
+    if "const" in schema:
+        return schema["const"]
+    if "enum" in schema:
+        return schema["enum"][0]
+    if "default" in schema:
+        return schema["default"]
+    for key in ("anyOf", "oneOf", "allOf"):
+        if key in schema:
+            options = [option for option in schema[key] if option.get("type") != "null"] or schema[key]
+            return schema_instance(options[0], defs, name)
+
+    kind = schema.get("type", "object")
+    if kind == "object":
+        return {prop: schema_instance(sub, defs, prop) for prop, sub in schema.get("properties", {}).items()}
+    if kind == "array":
+        return [schema_instance(schema.get("items", {"type": "string"}), defs, name)]
+    if kind == "string":
+        return f"mock {name.replace('_', ' ')}"
+    if kind == "integer":
+        return 0
+    if kind == "number":
+        return 0.0
+    if kind == "boolean":
+        return False
+    return None
+
+def split_tokens(text: str) -> List[str]:
+    """Split text into fixed-size pseudo tokens."""
+    return re.findall(f".{{1,{CHARS_PER_TOKEN}}}", text, flags=re.DOTALL) or [""]
+
+class MockLLMServer:
+    """
+    OpenAI-compatible /v1/chat/completions and /health served from a background thread.
+
+    Running outside the benchmark's event loop keeps the mock's own work out of
+    the measured graph overhead.
+    """
+
+    def __init__(self, ttft_ms: float = 50.0, tokens_per_second: float = 200.0, slots: int = 4, port: Optional[int] = None):
+        self.ttft_ms = ttft_ms
+        self.tokens_per_second = tokens_per_second
+        self.slots = slots
+        self.port = port or free_port()
+        self.requests = 0
+        self.queued = 0
+        self.max_queued = 0
+        self._slots = asyncio.Semaphore(slots)
+        self.app = self._build_app()
+        self._server: Optional[uvicorn.Server] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}/v1"
+
+    def _build_app(self) -> FastAPI:
+        app = FastAPI()
+
+        @app.get("/health")
+        async def health() -> dict:
+            return {"status": "ok"}
+
+        @app.post("/v1/chat/completions")
+        async def chat_completions(request: Request):
+            body = await request.json()
+            self.requests += 1
+            text = self.reply(body)
+            tokens = split_tokens(text)
+            usage = {
+                "prompt_tokens": sum(len(str(message.get("content", ""))) for message in body.get("messages", [])) // CHARS_PER_TOKEN,
+                "completion_tokens": len(tokens),
+            }
+            usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+            if body.get("stream"):
+                return StreamingResponse(self._stream(body, tokens, usage), media_type="text/event-stream")
+
+            async with self.slot():
+                await asyncio.sleep(self.ttft_ms / 1000 + len(tokens) / self.tokens_per_second)
+            return {
+                "id": f"mock-{self.requests}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": body.get("model", "mock"),
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+                "usage": usage,
+            }
+
+        return app
+
+    @asynccontextmanager
+    async def slot(self):
+        """Hold one of the server's slots for a completion, queueing while all are busy."""
+        self.queued += 1
+        self.max_queued = max(self.max_queued, self.queued - self.slots)
+        try:
+            async with self._slots:
+                yield
+        finally:
+            self.queued -= 1
+
+    def reply(self, body: dict) -> str:
+        """The deterministic completion text for a request."""
+        response_format = body.get("response_format") or {}
+        schema = response_format.get("json_schema", {}).get("schema") or response_format.get("schema")
+        if schema:
+            return json.dumps(schema_instance(schema))
+        return PLAIN_TEXT_RESPONSE
+
+    async def _stream(self, body: dict, tokens: List[str], usage: dict):
+        def chunk(choices: List[dict], **extra) -> str:
+            payload = {
+                "id": f"mock-{self.requests}",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": body.get("model", "mock"),
+                "choices": choices,
+                **extra,
+            }
+            return f"data: {json.dumps(payload)}\n\n"
+
+        async with self.slot():
+            await asyncio.sleep(self.ttft_ms / 1000)
+            yield chunk([{"index": 0, "delta": {"role": "assistant", "content": ""}, "finish_reason": None}])
+            for token in tokens:
+                await asyncio.sleep(1 / self.tokens_per_second)
+                yield chunk([{"index": 0, "delta": {"content": token}, "finish_reason": None}])
+            yield chunk([{"index": 0, "delta": {}, "finish_reason": "stop"}])
+        if (body.get("stream_options") or {}).get("include_usage"):
+            yield chunk([], usage=usage)
+        yield "data: [DONE]\n\n"
+
+    def start(self) -> None:
+        """Start serving and wait until the server accepts connections."""
+        config = uvicorn.Config(self.app, host="127.0.0.1", port=self.port, log_level="warning", lifespan="off")
+        self._server = uvicorn.Server(config)
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+        self._thread.start()
+        while not self._server.started:
+            time.sleep(0.01)
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.should_exit = True
+            self._thread.join(timeout=5)
+
+def free_port() -> int:
+    """An unused local TCP port."""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Offline agent benchmark.
+
+Replays agents_test_data.json through the agent in-process against the mock
+llama.cpp server (mock_llm.py), with an in-memory checkpointer and simulated MCP
+tools, so no live stack is needed. Gatekeeper cases run the compiled graph;
+planner, executor and summarize cases call their nodes directly. Reports
+throughput, end-to-end latency percentiles and, per node, time spent in the LLM
+(queue + inference) versus the rest of the node's time (graph, prompt assembly,
+parsing and simulated tool calls), taken from the trace spans.
+
+Usage (from the repository root):
+    python -m services.api.tests.benchmark.run_benchmark --iterations 20 --concurrency 4
+    python -m services.api.tests.benchmark.run_benchmark --output baseline.json
+    python -m services.api.tests.benchmark.run_benchmark --baseline baseline.json --tolerance 0.2
+
+With --baseline, exits with status 1 if the p95 latency or any node's p95
+overhead regressed by more than the tolerance.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List
+
+from services.api.tests.benchmark.mock_llm import MockLLMServer
+
+TEST_DATA_PATH = Path(__file__).parent.parent / "agents_test_data.json"
+LLM_SPANS = ("llm", "llm.queue")
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))]
+
+def summarize_values(values: List[float]) -> Dict[str, float]:
+    return {
+        "mean": round(sum(values) / len(values), 2) if values else 0.0,
+        "p50": round(percentile(values, 50), 2),
+        "p95": round(percentile(values, 95), 2),
+        "p99": round(percentile(values, 99), 2),
+    }
+
+def covered_ms(intervals: List[tuple]) -> float:
+    """Total time covered by (start_ns, end_ns) intervals, counting overlaps once."""
+    total, covered_until = 0, 0
+    for start, end in sorted(intervals):
+        start = max(start, covered_until)
+        if end > start:
+            total += end - start
+            covered_until = end
+    return total / 1e6
+
+def node_breakdown(trace: Any) -> Dict[str, Dict[str, float]]:
+    """
+    Per node: total duration and the wall time spent in LLM spans beneath it.
+
+    Concurrent LLM calls (executor subtasks) overlap, so LLM time is the union of
+    their intervals rather than the sum of their durations.
+    """
+    by_id = {span.span_id: span for span in trace.spans}
+    nodes = {span.span_id: span for span in trace.spans if span.name.startswith("node.")}
+    llm_intervals: Dict[str, List[tuple]] = {span_id: [] for span_id in nodes}
+    for span in trace.spans:
+        if span.name not in LLM_SPANS:
+            continue
+        parent = by_id.get(span.parent_id)
+        while parent is not None and parent.span_id not in nodes:
+            parent = by_id.get(parent.parent_id)
+        if parent is not None:
+            llm_intervals[parent.span_id].append((span.start_ns, span.end_ns))
+
+    breakdown: Dict[str, Dict[str, float]] = {}
+    for span_id, node in nodes.items():
+        stats = breakdown.setdefault(node.name[len("node."):], {"total_ms": 0.0, "llm_ms": 0.0})
+        stats["total_ms"] += node.duration_ms
+        stats["llm_ms"] += covered_ms(llm_intervals[span_id])
+    return breakdown
+
+def build_cases(test_data: dict) -> List[tuple]:
+    """(kind, case) pairs for every test case the benchmark can replay."""
+    return [(kind, case) for kind in ("gatekeeper", "planner", "executor", "summarize") for case in test_data.get(kind, [])]
+
+async def run_benchmark(args: argparse.Namespace) -> dict:
+    # Imported after the environment points the agent at the mock server
+    from langchain_core.messages import AIMessage, HumanMessage
+    from langchain_core.runnables import RunnableConfig
+    from langgraph.checkpoint.memory import MemorySaver
+    from services.api.agent.cache import answer_cache, plan_cache
+    from services.api.agent.catalog import tool_catalog
+    from services.api.agent.graph import builder
+    from services.api.agent.nodes.executor import executor
+    from services.api.agent.nodes.planner import planner
+    from services.api.agent.nodes.summarize import summarize
+    from services.api.agent.schemas import AgentState, PlanResponse
+    from services.api.agent.utils import count_messages
+    from services.api.utils.tracing import span
+
+    graph = builder.compile(checkpointer=MemorySaver())
+
+    async def mock_tool_call(name: str, arguments: dict) -> Any:
+        await asyncio.sleep(args.tool_ms / 1000)
+        return {"tool": name, "arguments": arguments, "result": "mock"}
+    tool_catalog.call = mock_tool_call
+
+    with open(TEST_DATA_PATH) as f:
+        cases = build_cases(json.load(f))
+    history = [case["input"]["message"] for kind, case in cases if case["input"].get("message")]
+
+    async def run_case(kind: str, case: dict) -> tuple:
+        thread_id = f"bench-{uuid.uuid4()}"
+        message = case["input"].get("message", "")
+        config = RunnableConfig(configurable={"thread_id": thread_id})
+        if not args.cache:
+            answer_cache.cache.clear()
+            plan_cache.cache.clear()
+
+        with span(f"benchmark.{kind}") as root:
+            if kind == "gatekeeper":
+                state = AgentState(thread_id=thread_id, messages=[HumanMessage(content=message)])
+                state.message_counts = count_messages(state.messages)
+                await graph.ainvoke(state, config)
+            elif kind == "planner":
+                with span("node.planner"):
+                    await planner(AgentState(thread_id=thread_id, messages=[HumanMessage(content=message)]), config)
+            elif kind == "executor":
+                plan = PlanResponse(plan_id=case["input"]["plan_id"], subtasks=case["input"]["subtasks"])
+                with span("node.executor"):
+                    await executor(AgentState(thread_id=thread_id, messages=[HumanMessage(content=message)], plan=[plan]), config)
+            else:
+                # A long thread, so there are older messages to fold into the summary
+                messages = [(HumanMessage if i % 2 == 0 else AIMessage)(content=text) for i, text in enumerate(history * 2)]
+                with span("node.summarize"):
+                    await summarize(AgentState(thread_id=thread_id, messages=messages), config)
+        return root.duration_ms, node_breakdown(root.trace)
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+    async def bounded(kind: str, case: dict) -> tuple:
+        async with semaphore:
+            return await run_case(kind, case)
+
+    # Warm up clients, caches and imports outside the measurement
+    await asyncio.gather(*(run_case(kind, case) for kind, case in cases))
+
+    started = time.perf_counter()
+    runs = await asyncio.gather(*(bounded(kind, case) for _ in range(args.iterations) for kind, case in cases))
+    wall_seconds = time.perf_counter() - started
+
+    latencies = [latency for latency, _ in runs]
+    per_node: Dict[str, Dict[str, List[float]]] = {}
+    for _, breakdown in runs:
+        for node, stats in breakdown.items():
+            values = per_node.setdefault(node, {"total_ms": [], "llm_ms": [], "overhead_ms": []})
+            values["total_ms"].append(stats["total_ms"])
+            values["llm_ms"].append(stats["llm_ms"])
+            values["overhead_ms"].append(stats["total_ms"] - stats["llm_ms"])
+
+    return {
+        "config": {"iterations": args.iterations, "concurrency": args.concurrency, "ttft_ms": args.ttft_ms, "tokens_per_second": args.tokens_per_second, "tool_ms": args.tool_ms},
+        "runs": len(runs),
+        "wall_seconds": round(wall_seconds, 3),
+        "throughput_rps": round(len(runs) / wall_seconds, 2),
+        "latency_ms": summarize_values(latencies),
+        "nodes": {node: {metric: summarize_values(series) for metric, series in values.items()} for node, values in sorted(per_node.items())},
+    }
+
+def print_report(results: dict) -> None:
+    print(f"Runs: {results['runs']} in {results['wall_seconds']}s ({results['throughput_rps']} runs/s)")
+    latency = results["latency_ms"]
+    print(f"Latency ms: mean {latency['mean']}  p50 {latency['p50']}  p95 {latency['p95']}  p99 {latency['p99']}")
+    if "mock_server" in results:
+        server = results["mock_server"]
+        print(f"Mock server: {server['requests']} completions on {server['slots']} slots, up to {server['max_queued']} queued")
+    print("-----------------------------------")
+    print(f"{'node':<14}{'total p50':>11}{'llm p50':>10}{'overhead p50':>14}{'overhead p95':>14}{'overhead p99':>14}")
+    for node, metrics in results["nodes"].items():
+        print(f"{node:<14}{metrics['total_ms']['p50']:>11}{metrics['llm_ms']['p50']:>10}{metrics['overhead_ms']['p50']:>14}{metrics['overhead_ms']['p95']:>14}{metrics['overhead_ms']['p99']:>14}")
+
+def find_regressions(results: dict, baseline: dict, tolerance: float) -> List[str]:
+    """Metrics whose p95 exceeds the baseline's by more than the tolerance."""
+    checks = [("latency p95", results["latency_ms"]["p95"], baseline["latency_ms"]["p95"])]
+    for node, metrics in results["nodes"].items():
+        if node in baseline.get("nodes", {}):
+            checks.append((f"{node} overhead p95", metrics["overhead_ms"]["p95"], baseline["nodes"][node]["overhead_ms"]["p95"]))
+    return [
+        f"{name}: {current}ms vs baseline {previous}ms"
+        for name, current, previous in checks
+        if previous and current > previous * (1 + tolerance)
+    ]
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Offline agent benchmark against a mock LLM server.")
+    parser.add_argument("--iterations", type=int, default=10, help="Replays of the whole test data set")
+    parser.add_argument("--concurrency", type=int, default=4, help="Cases run at once")
+    parser.add_argument("--ttft-ms", type=float, default=50.0, help="Mock time to first token")
+    parser.add_argument("--tokens-per-second", type=float, default=200.0, help="Mock generation rate")
+    parser.add_argument("--tool-ms", type=float, default=20.0, help="Simulated MCP tool latency")
+    parser.add_argument("--slots", type=int, default=4, help="Parallel slots of the mock server (and LLM_PARALLEL_SLOTS for the agent)")
+    parser.add_argument("--cache", action="store_true", help="Keep the answer and plan caches between runs")
+    parser.add_argument("--output", help="Write the results as JSON")
+    parser.add_argument("--baseline", help="Compare against an earlier --output file")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed p95 regression against the baseline")
+    args = parser.parse_args()
+
+    server = MockLLMServer(ttft_ms=args.ttft_ms, tokens_per_second=args.tokens_per_second, slots=args.slots)
+    server.start()
+    os.environ["LLM_BASE_URL"] = server.base_url
+    os.environ["LLM_BASE_URLS"] = "[]"
+    os.environ["LLM_PARALLEL_SLOTS"] = str(args.slots)
+    os.environ["TRACE_FILE"] = ""
+    os.environ["TRACE_OTLP_ENDPOINT"] = ""
+    try:
+        results = asyncio.run(run_benchmark(args))
+    finally:
+        server.stop()
+    results["mock_server"] = {"slots": args.slots, "requests": server.requests, "max_queued": server.max_queued}
+
+    print_report(results)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = find_regressions(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
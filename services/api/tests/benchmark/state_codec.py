@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Agent state serialization benchmark.
+
+Compares, on transcripts of increasing length:
+- json: the legacy Redis path (json.dumps of the JSON-mode dump, json.loads then
+  model_validate)
+- codec: the compact StateCodec path for stored agent state (msgpack, compressed
+  above a size threshold)
+- jsonplus / checkpoint: per-channel serialization as the graph checkpointer
+  stores it, with LangGraph's JsonPlusSerializer and with StateCodec as its
+  serializer (list channels item by item, like the checkpointer's Redis lists)
+
+Reports encode and decode time, including the AgentState conversions each path
+needs, and the stored size. No Redis is needed.
+
+Transcripts are either exported threads (the JSON returned by GET
+/threads/{thread_id}, passed with --transcripts) or generated from the agent test
+questions, with varied player names, stat lines and tool responses, so that
+compression is not flattered by repeated text.
+
+Usage (from the repository root):
+    python -m services.api.tests.benchmark.state_codec --messages 50 200 1000 --repeat 20
+    python -m services.api.tests.benchmark.state_codec --transcripts thread-1.json thread-2.json
+"""
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+from services.api.agent.schemas import AgentState, MessageCounts, PlanResponse, ToolExecutorResponse
+from services.api.redis.agent_state import AgentStateRedis
+from services.api.redis.checkpointer import APPEND_ONLY_CHANNELS
+from services.api.redis.codec import StateCodec
+
+TEST_DATA_PATH = Path(__file__).parent.parent / "agents_test_data.json"
+
+PLAYERS = [
+    "Justin Jefferson", "Ja'Marr Chase", "CeeDee Lamb", "Amon-Ra St. Brown", "Puka Nacua", "Garrett Wilson",
+    "Nico Collins", "Drake London", "Bijan Robinson", "Breece Hall", "Jahmyr Gibbs", "De'Von Achane",
+    "Saquon Barkley", "Kyren Williams", "Travis Kelce", "Sam LaPorta", "Trey McBride", "Josh Allen",
+    "Jalen Hurts", "Lamar Jackson", "Patrick Mahomes", "Jayden Daniels", "Tyreek Hill", "Stefon Diggs",
+]
+TEAMS = ["ARI", "ATL", "BAL", "BUF", "CAR", "CHI", "CIN", "CLE", "DAL", "DEN", "DET", "GB", "HOU", "IND", "JAX", "KC",
+         "LAC", "LAR", "LV", "MIA", "MIN", "NE", "NO", "NYG", "NYJ", "PHI", "PIT", "SEA", "SF", "TB", "TEN", "WAS"]
+FOLLOW_UPS = [
+    "What about {player} instead?",
+    "How has {player} looked over the last three weeks?",
+    "Is {player} worth a waiver claim in a 12-team PPR league?",
+    "Would you trade {player} for {other} straight up?",
+    "Who has the better rest-of-season outlook, {player} or {other}?",
+]
+
+def test_questions() -> List[str]:
+    with open(TEST_DATA_PATH) as f:
+        test_data = json.load(f)
+    return [case["input"]["message"] for cases in test_data.values() for case in cases if case["input"].get("message")]
+
+def stat_line(rng: random.Random, week: int) -> Dict[str, Any]:
+    targets = rng.randint(2, 13)
+    receptions = rng.randint(1, targets)
+    return {
+        "week": week,
+        "opponent": rng.choice(TEAMS),
+        "snap_share": round(rng.uniform(0.45, 0.98), 3),
+        "targets": targets,
+        "receptions": receptions,
+        "receiving_yards": round(receptions * rng.uniform(6, 16), 1),
+        "rushing_attempts": rng.randint(0, 22),
+        "rushing_yards": round(rng.uniform(0, 120), 1),
+        "touchdowns": rng.choice([0, 0, 0, 1, 1, 2]),
+        "fantasy_points_ppr": round(rng.uniform(2, 34), 2),
+    }
+
+def answer(rng: random.Random, player: str, other: str) -> str:
+    """A gatekeeper-style answer citing varied stats."""
+    sentences = [
+        f"{player} has seen {rng.randint(18, 36)} targets over the last three weeks, a {rng.uniform(0.18, 0.33):.1%} target share.",
+        f"{other} draws {rng.choice(TEAMS)}, which allows the {rng.randint(1, 32)}th-most fantasy points to his position.",
+        f"Vegas has {player}'s team implied for {rng.uniform(17, 29):.1f} points in week {rng.randint(1, 18)}.",
+        f"{other} played {rng.uniform(0.55, 0.95):.0%} of snaps last week and turned {rng.randint(8, 24)} touches into {rng.uniform(6, 28):.1f} PPR points.",
+        f"Projections have {player} at {rng.uniform(9, 24):.1f} points against {other} at {rng.uniform(9, 24):.1f}.",
+        f"I'd lean {rng.choice([player, other])}: the floor is higher and the red-zone role ({rng.randint(2, 9)} looks in the last month) is secure.",
+    ]
+    return " ".join(rng.sample(sentences, k=rng.randint(2, len(sentences))))
+
+def generated_transcript(messages: int, seed: int = 0) -> AgentState:
+    """A thread of `messages` messages built from the test questions, with a plan and tool calls every other turn."""
+    rng = random.Random(seed)
+    questions = test_questions()
+    state = AgentState(thread_id="bench-thread")
+    for turn in range(messages // 2):
+        player, other = rng.sample(PLAYERS, 2)
+        question = rng.choice(questions) if turn == 0 or rng.random() < 0.4 else rng.choice(FOLLOW_UPS).format(player=player, other=other)
+        state.messages.append(HumanMessage(content=question))
+        state.messages.append(AIMessage(content=answer(rng, player, other)))
+        if turn % 2 == 0:
+            plan = PlanResponse(subtasks=[f"Get weekly stats for {player}", f"Get weekly stats for {other}"], depends_on=[[], []])
+            state.plan.append(plan)
+            for name in (player, other):
+                season = rng.choice([2023, 2024, 2025])
+                state.tool_calls.append(ToolExecutorResponse(
+                    plan_id=plan.plan_id,
+                    tool="get_player_stats",
+                    parameters={"player": name, "season": season},
+                    tool_response={"player": name, "season": season, "weeks": [stat_line(rng, week) for week in range(1, rng.randint(4, 18))]},
+                ))
+    state.message_counts = MessageCounts(total=len(state.messages), user=len(state.messages) // 2, lox=len(state.messages) // 2)
+    return state
+
+def exported_transcript(path: Path) -> AgentState:
+    """A thread exported from GET /threads/{thread_id}."""
+    with open(path) as f:
+        exported = json.load(f)
+    return AgentState.model_validate({key: value for key, value in exported.items() if key in AgentState.model_fields and value is not None})
+
+def dump_channels(serde: Any, state: AgentState) -> Dict[str, Any]:
+    """Serialize each AgentState channel as the checkpointer does: list channels item by item."""
+    return {
+        channel: [serde.dumps_typed(item) for item in getattr(state, channel)] if channel in APPEND_ONLY_CHANNELS else serde.dumps_typed(getattr(state, channel))
+        for channel in AgentState.model_fields
+    }
+
+def load_channels(serde: Any, channels: Dict[str, Any]) -> AgentState:
+    return AgentState.model_validate({
+        channel: [serde.loads_typed(item) for item in value] if channel in APPEND_ONLY_CHANNELS else serde.loads_typed(value)
+        for channel, value in channels.items()
+    })
+
+def channel_bytes(channels: Dict[str, Any]) -> int:
+    typed: List[Tuple[str, bytes]] = []
+    for value in channels.values():
+        typed.extend(value if isinstance(value, list) else [value])
+    return sum(len(type_) + 1 + len(payload) for type_, payload in typed)
+
+def timed_ms(fn: Callable[[], object], repeat: int) -> float:
+    """Median wall time of `fn` in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+def benchmark(state: AgentState, repeat: int, codec: StateCodec) -> Dict[str, Dict[str, float]]:
+    jsonplus = JsonPlusSerializer()
+    legacy = json.dumps(AgentStateRedis.from_agent_state(state), default=str)
+    compact = codec.dumps(AgentStateRedis.from_agent_state(state))
+    plain_channels = dump_channels(jsonplus, state)
+    codec_channels = dump_channels(codec, state)
+    # Every path must round-trip to the same state
+    expected = AgentStateRedis.to_agent_state(json.loads(legacy))
+    assert AgentStateRedis.to_agent_state(codec.loads(compact)) == expected
+    assert load_channels(jsonplus, plain_channels) == load_channels(codec, codec_channels) == state
+
+    return {
+        "json": {
+            "encode_ms": timed_ms(lambda: json.dumps(AgentStateRedis.from_agent_state(state), default=str), repeat),
+            "decode_ms": timed_ms(lambda: AgentStateRedis.to_agent_state(json.loads(legacy)), repeat),
+            "bytes": len(legacy.encode("utf-8")),
+        },
+        "codec": {
+            "encode_ms": timed_ms(lambda: codec.dumps(AgentStateRedis.from_agent_state(state)), repeat),
+            "decode_ms": timed_ms(lambda: AgentStateRedis.to_agent_state(codec.loads(compact)), repeat),
+            "bytes": len(compact),
+        },
+        "jsonplus": {
+            "encode_ms": timed_ms(lambda: dump_channels(jsonplus, state), repeat),
+            "decode_ms": timed_ms(lambda: load_channels(jsonplus, plain_channels), repeat),
+            "bytes": channel_bytes(plain_channels),
+        },
+        "checkpoint": {
+            "encode_ms": timed_ms(lambda: dump_channels(codec, state), repeat),
+            "decode_ms": timed_ms(lambda: load_channels(codec, codec_channels), repeat),
+            "bytes": channel_bytes(codec_channels),
+        },
+    }
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark agent state serialization on long threads.")
+    parser.add_argument("--messages", type=int, nargs="+", default=[50, 200, 1000], help="Generated transcript lengths to measure")
+    parser.add_argument("--transcripts", type=Path, nargs="+", default=[], help="Exported threads (GET /threads/{thread_id}) to measure instead")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed repetitions per measurement")
+    parser.add_argument("--encoding", choices=["msgpack", "json"], default="msgpack", help="Codec payload encoding")
+    parser.add_argument("--compress-threshold", type=int, default=16384, help="Codec compression threshold in bytes (0 disables)")
+    args = parser.parse_args()
+
+    codec = StateCodec(encoding=args.encoding, compress_threshold=args.compress_threshold)
+    transcripts = [exported_transcript(path) for path in args.transcripts] or [generated_transcript(messages) for messages in args.messages]
+    print(f"Codec: {codec.encoding}, {codec.compression} above {args.compress_threshold} bytes")
+    print(f"{'messages':>9}{'path':>12}{'encode ms':>11}{'decode ms':>11}{'bytes':>10}")
+    for state in transcripts:
+        for path, result in benchmark(state, args.repeat, codec).items():
+            print(f"{len(state.messages):>9}{path:>12}{result['encode_ms']:>11.2f}{result['decode_ms']:>11.2f}{result['bytes']:>10}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+"""
+Tests for the agent's in-process caches.
+
+These run without the API, Redis or an LLM:
+- AnswerCache: scoping and near-duplicate matching of gatekeeper answers
+- PlanCache: question templates, entity slots and scoping of planner plans
+"""
+import pytest
+
+from services.api.agent.cache import AnswerCache, PlanCache, canonicalize_question
+from services.api.agent.schemas import PlanResponse
+
+
+@pytest.fixture
+def answer_cache() -> AnswerCache:
+    return AnswerCache(max_entries=64, global_ttl_seconds=60, thread_ttl_seconds=60, min_similarity=92)
+
+
+@pytest.fixture
+def plan_cache() -> PlanCache:
+    return PlanCache(max_entries=64, ttl_seconds=60, thread_ttl_seconds=60)
+
+
+class TestAnswerCache:
+    """Tests for AnswerCache scoping and matching."""
+
+    def test_near_duplicate_hit(self, answer_cache: AnswerCache):
+        """A near-identical global question reuses the cached answer."""
+        question = "Who is the best PPR running back this season?"
+        scope = answer_cache.scope(question, "thread-a", has_history=False)
+        assert scope == "global"
+        answer_cache.set(question, scope, "Bijan Robinson")
+
+        assert answer_cache.get("Who is the best PPR runningback this season?", scope) == "Bijan Robinson"
+        assert answer_cache.stats()["hits"] == 1
+
+    def test_personal_and_follow_up_questions_are_thread_scoped(self, answer_cache: AnswerCache):
+        """First-person questions and follow-ups are never shared across threads."""
+        assert answer_cache.scope("Should I start my kicker?", "thread-a", has_history=False) == "thread:thread-a"
+        assert answer_cache.scope("What about Puka Nacua?", "thread-a", has_history=True) == "thread:thread-a"
+
+    @pytest.mark.parametrize("cached, asked", [
+        ("Mahomes vs Allen, who is the better QB?", "Allen vs Mahomes, who is the better QB?"),
+        ("How many touchdowns did Josh Allen throw in 2024?", "How many touchdowns did Josh Allen throw in 2023?"),
+        ("Who were the top scoring tight ends in week 6?", "Who were the top scoring tight ends in week 5?"),
+        ("Show the standings for league 1048213541257097345", "Show the standings for league 1048213541257097344"),
+    ])
+    def test_no_hit_when_entities_or_numbers_differ(self, answer_cache: AnswerCache, cached: str, asked: str):
+        """Reordered names, other seasons, weeks and league IDs are different questions."""
+        # Even in a shared scope, the cached answer must not be served
+        answer_cache.set(cached, "global", "cached answer")
+        assert answer_cache.get(asked, "global") is None
+
+    @pytest.mark.parametrize("question", [
+        "How many touchdowns did Josh Allen throw in 2024?",
+        "Who were the top scoring tight ends in week 6?",
+        "Show the standings for league 1048213541257097345",
+    ])
+    def test_questions_with_numbers_are_thread_scoped(self, answer_cache: AnswerCache, question: str):
+        """Questions with numbers or IDs are cached under their thread only."""
+        assert answer_cache.scope(question, "thread-a", has_history=False) == "thread:thread-a"
+
+
+class TestPlanCache:
+    """Tests for PlanCache templates and slots."""
+
+    def test_canonicalize_question(self):
+        """Names become numbered slots; template words stay in the template."""
+        template, entities = canonicalize_question("Should I start Patrick Mahomes or Josh Allen?")
+        assert entities == ["Patrick Mahomes", "Josh Allen"]
+        assert template == "should i start slot0 or slot1"
+
+    def test_plan_reused_with_new_entities(self, plan_cache: PlanCache):
+        """A plan for one pair of players is refilled for another pair."""
+        plan = PlanResponse(
+            subtasks=["Get weekly stats for Patrick Mahomes", "Get weekly stats for Josh Allen"],
+            depends_on=[[], []],
+        )
+        assert plan_cache.set("Compare Patrick Mahomes and Josh Allen", "global", "v1", plan)
+
+        cached = plan_cache.get("Compare Joe Burrow and Justin Herbert", "global", "v1")
+        assert cached is not None
+        assert cached.subtasks == ["Get weekly stats for Joe Burrow", "Get weekly stats for Justin Herbert"]
+        assert cached.depends_on == [[], []]
+        assert cached.plan_id != plan.plan_id
+
+    def test_catalog_version_and_scope_isolate_plans(self, plan_cache: PlanCache):
+        """A new tool catalog version or another thread never sees the plan."""
+        plan = PlanResponse(subtasks=["Get weekly stats for Patrick Mahomes"])
+        assert plan_cache.set("Tell me about Patrick Mahomes", "thread:a", "v1", plan)
+
+        assert plan_cache.get("Tell me about Joe Burrow", "thread:a", "v2") is None
+        assert plan_cache.get("Tell me about Joe Burrow", "thread:b", "v1") is None
+        assert plan_cache.get("Tell me about Joe Burrow", "thread:a", "v1") is not None
+
+    def test_partial_entity_mentions_are_not_cached(self, plan_cache: PlanCache):
+        """A subtask naming only a surname cannot be slotted, so the plan is not cached."""
+        plan = PlanResponse(subtasks=["Get weekly stats for Mahomes"])
+        assert not plan_cache.set("Tell me about Patrick Mahomes", "global", "v1", plan)
@@ -0,0 +1,237 @@
+"""
+Tests for the Redis LangGraph checkpointer.
+
+These run against an in-memory fakeredis server, without the API or an LLM,
+using a small graph whose nodes return the whole state like the agent's do.
+"""
+import time
+from typing import List
+
+import fakeredis
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.base import empty_checkpoint
+from langgraph.graph import END, START, StateGraph
+from langgraph.types import Command, interrupt
+from pydantic import BaseModel, Field
+
+from services.api.redis.agent_state_crud import AgentStateCRUD
+from services.api.redis.checkpointer import LIST_TAIL_MARKER, RedisCheckpointSaver
+from services.api.redis.client import RedisClient
+
+pytestmark = pytest.mark.asyncio
+
+
+class ChatState(BaseModel):
+    messages: List[HumanMessage | AIMessage] = Field(default_factory=list)
+    turns: int = 0
+
+
+def answer(state: ChatState) -> ChatState:
+    state.messages.append(AIMessage(content=f"Answer to: {state.messages[-1].content}"))
+    state.turns += 1
+    return state
+
+
+def clarify(state: ChatState) -> ChatState:
+    reply = interrupt("Which league?")
+    state.messages.append(HumanMessage(content=reply))
+    return state
+
+
+def build_graph(saver: RedisCheckpointSaver, with_interrupt: bool = False):
+    builder = StateGraph(ChatState)
+    builder.add_node("answer", answer)
+    if with_interrupt:
+        builder.add_node("clarify", clarify)
+        builder.add_edge(START, "clarify")
+        builder.add_edge("clarify", "answer")
+    else:
+        builder.add_edge(START, "answer")
+    builder.add_edge("answer", END)
+    return builder.compile(checkpointer=saver)
+
+
+@pytest.fixture
+def redis_server():
+    return fakeredis.FakeServer()
+
+
+@pytest.fixture
+def saver(redis_server) -> RedisCheckpointSaver:
+    client = RedisClient()
+    client.redis_client = fakeredis.aioredis.FakeRedis(server=redis_server)
+    return RedisCheckpointSaver(max_checkpoints=4, client=client)
+
+
+async def run_turn(graph, thread_id: str, text: str) -> dict:
+    config = {"configurable": {"thread_id": thread_id}}
+    snapshot = await graph.aget_state(config)
+    state = ChatState.model_validate(snapshot.values) if snapshot.values else ChatState()
+    state.messages.append(HumanMessage(content=text))
+    return await graph.ainvoke(state, config)
+
+
+class TestRedisCheckpointSaver:
+    """Tests for RedisCheckpointSaver put/get/list/prune and pending writes."""
+
+    async def test_state_round_trips_across_turns(self, saver: RedisCheckpointSaver):
+        graph = build_graph(saver)
+        for turn in range(3):
+            await run_turn(graph, "thread-a", f"question {turn}")
+
+        snapshot = await graph.aget_state({"configurable": {"thread_id": "thread-a"}})
+        state = ChatState.model_validate(snapshot.values)
+        assert state.turns == 3
+        assert [message.content for message in state.messages] == [
+            "question 0", "Answer to: question 0",
+            "question 1", "Answer to: question 1",
+            "question 2", "Answer to: question 2",
+        ]
+
+    async def test_messages_are_appended_not_rewritten(self, saver: RedisCheckpointSaver):
+        """Each turn RPUSHes only its new messages onto one list generation."""
+        graph = build_graph(saver)
+        for turn in range(3):
+            await run_turn(graph, "thread-a", f"question {turn}")
+
+        client = saver.client.redis_client
+        assert await client.llen(saver._key("thread-a", "", "list", "messages", "0")) == 6
+        assert not await client.exists(saver._key("thread-a", "", "list", "messages", "1"))
+
+    async def test_pending_writes_store_only_the_new_tail(self, saver: RedisCheckpointSaver):
+        """A write extending a checkpointed list stores its new items, and loads as the full list."""
+        history = [HumanMessage(content=f"message {index} " + "x" * 200) for index in range(40)]
+        checkpoint = empty_checkpoint()
+        checkpoint["channel_values"] = {"messages": history}
+        checkpoint["channel_versions"] = {"messages": 1}
+        config = await saver.aput({"configurable": {"thread_id": "thread-a", "checkpoint_ns": ""}}, checkpoint, {}, {"messages": 1})
+
+        extended = history + [AIMessage(content="new answer")]
+        await saver.aput_writes(config, [("messages", extended)], task_id="task-1")
+
+        stored = await saver.client.redis_client.hgetall(saver._key("thread-a", "", "writes", checkpoint["id"]))
+        (data,) = stored.values()
+        assert LIST_TAIL_MARKER.encode() in data.split(b"\n", 1)[0]
+        assert len(data) < 500
+
+        checkpoint_tuple = await saver.aget_tuple(config)
+        ((task_id, channel, value),) = checkpoint_tuple.pending_writes
+        assert (task_id, channel) == ("task-1", "messages")
+        assert [message.content for message in value] == [message.content for message in extended]
+
+    async def test_tail_writes_do_not_depend_on_the_writing_process(self, redis_server, saver: RedisCheckpointSaver):
+        """Another saver (a restarted or second API worker) still stores only the tail."""
+        history = [HumanMessage(content=f"message {index} " + "x" * 200) for index in range(40)]
+        checkpoint = empty_checkpoint()
+        checkpoint["channel_values"] = {"messages": history}
+        checkpoint["channel_versions"] = {"messages": 1}
+        config = await saver.aput({"configurable": {"thread_id": "thread-a", "checkpoint_ns": ""}}, checkpoint, {}, {"messages": 1})
+
+        client = RedisClient()
+        client.redis_client = fakeredis.aioredis.FakeRedis(server=redis_server)
+        other = RedisCheckpointSaver(max_checkpoints=4, client=client)
+        await other.aput_writes(config, [("messages", history + [AIMessage(content="new answer")])], task_id="task-1")
+
+        (data,) = (await client.redis_client.hgetall(other._key("thread-a", "", "writes", checkpoint["id"]))).values()
+        assert LIST_TAIL_MARKER.encode() in data.split(b"\n", 1)[0]
+        assert len(data) < 500
+
+    async def test_writes_stored_after_the_next_checkpoint_reference_the_list(self, saver: RedisCheckpointSaver):
+        """A write whose items the list already holds (the next checkpoint was stored first) is an empty tail."""
+        history = [HumanMessage(content=f"message {index}") for index in range(10)]
+        checkpoint = empty_checkpoint()
+        checkpoint["channel_values"] = {"messages": history}
+        checkpoint["channel_versions"] = {"messages": 1}
+        config = await saver.aput({"configurable": {"thread_id": "thread-a", "checkpoint_ns": ""}}, checkpoint, {}, {"messages": 1})
+        extended = history + [AIMessage(content="new answer")]
+        following = empty_checkpoint()
+        following["channel_values"] = {"messages": extended}
+        following["channel_versions"] = {"messages": 2}
+        await saver.aput(config, following, {}, {"messages": 2})
+
+        await saver.aput_writes(config, [("messages", extended)], task_id="task-1")
+
+        ((_, channel, value),) = (await saver.aget_tuple(config)).pending_writes
+        assert channel == "messages"
+        assert [message.content for message in value] == [message.content for message in extended]
+        (data,) = (await saver.client.redis_client.hgetall(saver._key("thread-a", "", "writes", checkpoint["id"]))).values()
+        assert LIST_TAIL_MARKER.encode() in data.split(b"\n", 1)[0]
+
+    async def test_pending_write_size_does_not_grow_with_the_thread(self, saver: RedisCheckpointSaver):
+        graph = build_graph(saver)
+        largest = []
+        for turn in range(12):
+            await run_turn(graph, "thread-a", f"question {turn}")
+            sizes = []
+            async for key in saver.client.redis_client.scan_iter(match="checkpoint:thread-a::writes:*"):
+                sizes.extend(len(value) for value in (await saver.client.redis_client.hgetall(key)).values())
+            largest.append(max(sizes))
+        # Only the turn number in the new messages grows, not the history
+        assert largest[-1] < largest[1] + 64
+
+    async def test_interrupt_and_resume(self, saver: RedisCheckpointSaver):
+        graph = build_graph(saver, with_interrupt=True)
+        config = {"configurable": {"thread_id": "thread-a"}}
+        await graph.ainvoke(ChatState(messages=[HumanMessage(content="How is my team?")]), config)
+
+        snapshot = await graph.aget_state(config)
+        assert snapshot.next == ("clarify",)
+
+        result = await graph.ainvoke(Command(resume="The dynasty one"), config)
+        state = ChatState.model_validate(result)
+        assert [message.content for message in state.messages] == ["How is my team?", "The dynasty one", "Answer to: The dynasty one"]
+
+    async def test_old_checkpoints_are_pruned(self, saver: RedisCheckpointSaver):
+        graph = build_graph(saver)
+        for turn in range(8):
+            await run_turn(graph, "thread-a", f"question {turn}")
+
+        index_size = await saver.client.redis_client.zcard(saver._key("thread-a", "", "index"))
+        assert index_size <= saver.max_checkpoints + saver.max_checkpoints // 2
+        history = [checkpoint async for checkpoint in saver.alist({"configurable": {"thread_id": "thread-a"}})]
+        assert len(history) == index_size
+        assert ChatState.model_validate(history[0].checkpoint["channel_values"]).turns == 8
+
+    async def test_delete_thread(self, saver: RedisCheckpointSaver):
+        graph = build_graph(saver)
+        await run_turn(graph, "thread-a", "question")
+        await run_turn(graph, "thread-b", "question")
+
+        await saver.adelete_thread("thread-a")
+        assert await saver.aget_tuple({"configurable": {"thread_id": "thread-a"}}) is None
+        assert await saver.aget_tuple({"configurable": {"thread_id": "thread-b"}}) is not None
+
+    async def test_threads_are_indexed_by_last_checkpoint(self, saver: RedisCheckpointSaver):
+        graph = build_graph(saver)
+        await run_turn(graph, "thread-a", "question")
+        await run_turn(graph, "thread-b", "question")
+        await run_turn(graph, "thread-a", "follow-up")
+
+        crud = AgentStateCRUD()
+        client = saver.client.redis_client
+        assert await crud.list_thread_ids(client) == ["thread-a", "thread-b"]
+        assert await crud.list_thread_ids(client, offset=1, limit=1) == ["thread-b"]
+        assert [checkpoint.config["configurable"]["thread_id"] async for checkpoint in saver.alist(None, limit=1)] == ["thread-a"]
+
+        await saver.adelete_thread("thread-a")
+        assert await crud.list_thread_ids(client) == ["thread-b"]
+
+
+class TestThreadIndex:
+    """Tests for backfilling and pruning the thread index."""
+
+    async def test_backfilled_threads_are_scored_by_their_ttl_and_pruned(self, redis_server):
+        client = fakeredis.aioredis.FakeRedis(server=redis_server)
+        crud = AgentStateCRUD()
+        ttl = crud.settings.redis_ttl_seconds
+        await client.set(crud._get_key("recent"), b"{}", ex=ttl)
+        await client.set(crud._get_key("older"), b"{}", ex=ttl - 3600)
+
+        assert await crud.list_thread_ids(client) == ["recent", "older"]
+        score = await client.zscore(crud.settings.redis_thread_index_key, "older")
+        assert score == pytest.approx(time.time() - 3600, abs=5)
+
+        # An entry whose TTL has lapsed is pruned, backfilled or not
+        await client.zadd(crud.settings.redis_thread_index_key, {"older": time.time() - ttl - 1})
+        assert await crud.list_thread_ids(client) == ["recent"]
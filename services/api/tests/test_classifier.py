@@ -0,0 +1,52 @@
+"""
+Tests for the triage message classifier.
+
+These run without the API or an LLM; thresholds match the defaults in
+core/config.py (TRIAGE_MIN_CONFIDENCE, TRIAGE_MAX_TRIVIAL_WORDS).
+"""
+import pytest
+
+from services.api.agent.classifier import classify_message
+
+MIN_CONFIDENCE = 0.9
+MAX_TRIVIAL_WORDS = 12
+
+
+def classify(message: str, has_history: bool = False) -> str:
+    return classify_message(message, min_confidence=MIN_CONFIDENCE, max_trivial_words=MAX_TRIVIAL_WORDS, has_history=has_history)
+
+
+class TestClassifyMessage:
+    """Tests for classify_message routing."""
+
+    @pytest.mark.parametrize("message", ["", "   ", "?!"])
+    def test_empty(self, message: str):
+        assert classify(message) == "empty"
+
+    @pytest.mark.parametrize("message", ["hi", "hello", "hey", "thanks", "Thanks!", "Hello there", "thank you"])
+    def test_greetings_are_matched_lexically(self, message: str):
+        """Plain greetings and thanks never reach the LLM, however the model scores them."""
+        assert classify(message) == "greeting"
+
+    @pytest.mark.parametrize("message", [
+        "tell me about Breece Hall",
+        "tell me about the Jets",
+        "what is the score of the Bills game",
+        "tell me about Jayden Daniels",
+        "tell me about breece hall",
+    ])
+    def test_football_questions_are_not_refused(self, message: str):
+        """Player and team names, capitalized or not, go to the gatekeeper."""
+        assert classify(message) == "football"
+
+    @pytest.mark.parametrize("message", ["what is the capital of france", "write me a poem about love"])
+    def test_off_topic(self, message: str):
+        assert classify(message) == "off_topic"
+
+    def test_no_off_topic_with_history(self):
+        """A follow-up may only make sense in context, so it is left to the gatekeeper."""
+        assert classify("what is the capital of france", has_history=True) == "football"
+
+    def test_long_messages_go_to_the_gatekeeper(self):
+        message = "write me a poem about love and the weather and the capital of france and rice please"
+        assert classify(message) == "football"
@@ -0,0 +1,73 @@
+"""
+Tests for the Redis state codec.
+
+These run without Redis: StateCodec's versioned encoding of stored agent state,
+and its typed serialization as the graph checkpointer's serializer.
+"""
+import json
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+from services.api.redis.codec import HEADER_SIZE, MAGIC, SCHEMA_VERSION, StateCodec, StateCodecError
+
+STATE = {
+    "thread_id": "thread-a",
+    "messages": [{"type": "human", "content": "Start Puka Nacua or Nico Collins?"}, {"type": "ai", "content": "Puka Nacua."}],
+    "relevant": True,
+    "message_counts": {"total": 2, "user": 1, "lox": 1},
+}
+
+
+class TestStateCodec:
+    """Tests for StateCodec dumps/loads of stored agent state."""
+
+    @pytest.mark.parametrize("encoding", ["msgpack", "json"])
+    @pytest.mark.parametrize("compress_threshold", [0, 16])
+    def test_round_trip(self, encoding: str, compress_threshold: int):
+        codec = StateCodec(encoding=encoding, compress_threshold=compress_threshold)
+        assert codec.loads(codec.dumps(STATE)) == STATE
+
+    def test_header(self):
+        """The header records the schema version, encoding and compression."""
+        data = StateCodec(encoding="msgpack", compress_threshold=0).dumps(STATE)
+        assert data[:len(MAGIC)] == MAGIC
+        assert data[len(MAGIC)] == SCHEMA_VERSION
+        assert data[len(MAGIC) + 1:HEADER_SIZE] == b"mn"
+
+        compressed = StateCodec(encoding="json", compress_threshold=16).dumps(STATE)
+        assert compressed[len(MAGIC) + 1:HEADER_SIZE] in (b"jz", b"jd")
+
+    def test_legacy_json_is_readable(self):
+        codec = StateCodec()
+        assert codec.loads(json.dumps(STATE)) == STATE
+        assert codec.loads(json.dumps(STATE).encode()) == STATE
+
+    def test_newer_schema_version_is_rejected(self):
+        data = bytearray(StateCodec().dumps(STATE))
+        data[len(MAGIC)] = SCHEMA_VERSION + 1
+        with pytest.raises(StateCodecError):
+            StateCodec().loads(bytes(data))
+
+
+class TestStateCodecSerializer:
+    """Tests for StateCodec as the checkpointer's SerializerProtocol."""
+
+    def test_small_values_are_stored_as_serialized(self):
+        codec = StateCodec(compress_threshold=16384)
+        messages = [HumanMessage(content="Who is the WR1 this week?"), AIMessage(content="Ja'Marr Chase.")]
+        type_, payload = codec.dumps_typed(messages)
+        assert (type_, payload) == codec.serde.dumps_typed(messages)
+        assert codec.loads_typed((type_, payload)) == messages
+
+    def test_large_values_are_compressed(self):
+        codec = StateCodec(compress_threshold=256)
+        messages = [AIMessage(content=f"Week {week}: Justin Jefferson, {week * 7} yards") for week in range(1, 60)]
+        type_, payload = codec.dumps_typed(messages)
+        assert type_ == f"{codec.serde.dumps_typed(messages)[0]}+{codec.compression}"
+        assert len(payload) < len(codec.serde.dumps_typed(messages)[1])
+        assert codec.loads_typed((type_, payload)) == messages
+
+    def test_unknown_compression_is_rejected(self):
+        with pytest.raises(StateCodecError):
+            StateCodec().loads_typed(("msgpack+lz4", b""))
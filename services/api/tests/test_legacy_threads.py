@@ -0,0 +1,90 @@
+"""
+Tests for threads stored before the agent graph was checkpointed.
+
+These run against an in-memory fakeredis server, without an LLM: legacy threads
+are single `thread:{id}` JSON blobs of the whole AgentState.
+"""
+import json
+
+import fakeredis
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.base import empty_checkpoint
+
+from services.api.agent.schemas import AgentState
+from services.api.redis.agent_state import AgentStateRedis
+from services.api.redis.client import redis_client
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture
+def redis_server():
+    return fakeredis.FakeServer()
+
+
+@pytest.fixture
+def redis(monkeypatch, redis_server):
+    """The shared Redis client (and so the checkpointer) backed by fakeredis."""
+    client = fakeredis.aioredis.FakeRedis(server=redis_server)
+    monkeypatch.setattr(redis_client, "redis_client", client)
+    monkeypatch.setattr(redis_client.crud, "_index_checked", False)
+    return client
+
+
+async def store_legacy_thread(redis, thread_id: str) -> AgentState:
+    """Store a thread as the pre-checkpoint API did: a JSON string under thread:{id}."""
+    state = AgentState(
+        thread_id=thread_id,
+        messages=[HumanMessage(content="Should I start Breece Hall?"), AIMessage(content="Yes, start Breece Hall.")],
+    )
+    await redis.set(AgentStateRedis.get_redis_key(thread_id), json.dumps(AgentStateRedis.from_agent_state(state), default=str))
+    return state
+
+
+class TestLegacyThreads:
+    """Tests for continuing and reading legacy threads."""
+
+    async def test_legacy_thread_is_continued_with_its_history(self, redis):
+        from services.api.api.routes.genie import load_thread_input
+
+        await store_legacy_thread(redis, "legacy-thread")
+        state, config = await load_thread_input("What about Kyren Williams?", "legacy-thread")
+
+        assert config["configurable"]["thread_id"] == "legacy-thread"
+        assert state.thread_id == "legacy-thread"
+        assert [message.content for message in state.messages] == [
+            "Should I start Breece Hall?", "Yes, start Breece Hall.", "What about Kyren Williams?",
+        ]
+        assert state.message_counts.total == 3
+
+    async def test_legacy_json_string_is_read_by_the_bytes_client(self, redis, redis_server):
+        """Blobs written by the old decode_responses client are read back intact, non-ASCII text included."""
+        legacy_client = fakeredis.aioredis.FakeRedis(server=redis_server, decode_responses=True)
+        state = AgentState(thread_id="legacy-thread", messages=[HumanMessage(content="Is Amon-Ra St. Brown a WR1? 🏈 ¿Sí?")])
+        await legacy_client.setex(
+            AgentStateRedis.get_redis_key("legacy-thread"), 3600, json.dumps(AgentStateRedis.from_agent_state(state), default=str, ensure_ascii=False),
+        )
+
+        stored = await redis_client.get_agent_state("legacy-thread")
+        assert AgentStateRedis.to_agent_state(stored).messages == state.messages
+
+    async def test_new_thread_starts_empty(self, redis):
+        from services.api.api.routes.genie import load_thread_input
+
+        state, _ = await load_thread_input("Hello", "new-thread")
+        assert [message.content for message in state.messages] == ["Hello"]
+
+    async def test_delete_all_removes_legacy_and_checkpointed_threads(self, redis):
+        from services.api.api.routes.threads import delete_all_active_threads
+        from services.api.redis.checkpointer import redis_checkpointer
+
+        await store_legacy_thread(redis, "legacy-thread")
+        checkpoint = empty_checkpoint()
+        checkpoint["channel_values"] = {"messages": [HumanMessage(content="Who is the TE1?")]}
+        checkpoint["channel_versions"] = {"messages": 1}
+        await redis_checkpointer.aput({"configurable": {"thread_id": "checkpointed-thread", "checkpoint_ns": ""}}, checkpoint, {}, {"messages": 1})
+
+        result = await delete_all_active_threads(redis_client)
+        assert result == {"success": True, "deleted_count": 2}
+        assert await redis.keys("*") == []
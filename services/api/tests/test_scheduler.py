@@ -0,0 +1,122 @@
+"""
+Tests for the LLM request scheduler.
+
+These run without an LLM: calls are simulated by holding and releasing slots.
+"""
+import asyncio
+
+import pytest
+
+from services.api.agent.scheduler import LLMQueueFullError, LLMScheduler
+
+pytestmark = pytest.mark.asyncio
+
+
+def make_scheduler(slots: int = 2, background_slots: int = 1, queue_limit: int = 4) -> LLMScheduler:
+    return LLMScheduler(
+        slots=slots,
+        lane_limits={"interactive": slots, "background": background_slots},
+        queue_limits={"interactive": queue_limit, "background": queue_limit},
+    )
+
+
+async def settle() -> None:
+    """Let waiting tasks run until they block again."""
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+class TestLLMScheduler:
+    """Tests for LLMScheduler admission, priority and cancellation."""
+
+    async def test_calls_beyond_the_slots_queue(self):
+        scheduler = make_scheduler(slots=2)
+        await scheduler.acquire("interactive")
+        await scheduler.acquire("interactive")
+        waiter = asyncio.create_task(scheduler.acquire("interactive"))
+        await settle()
+        assert not waiter.done()
+        assert scheduler.stats()["interactive"]["queued"] == 1
+
+        scheduler.release("interactive")
+        await settle()
+        assert waiter.done()
+        assert scheduler.stats()["interactive"]["active"] == 2
+
+    async def test_interactive_waiters_go_first(self):
+        scheduler = make_scheduler(slots=1)
+        await scheduler.acquire("interactive")
+        order = []
+
+        async def call(lane: str) -> None:
+            await scheduler.acquire(lane)
+            order.append(lane)
+
+        background = asyncio.create_task(call("background"))
+        await settle()
+        interactive = asyncio.create_task(call("interactive"))
+        await settle()
+
+        scheduler.release("interactive")
+        await settle()
+        assert order == ["interactive"]
+        scheduler.release("interactive")
+        await asyncio.gather(background, interactive)
+        assert order == ["interactive", "background"]
+
+    async def test_background_lane_limit(self):
+        scheduler = make_scheduler(slots=2, background_slots=1)
+        await scheduler.acquire("background")
+        waiter = asyncio.create_task(scheduler.acquire("background"))
+        await settle()
+        assert not waiter.done()
+        # The other slot is still free for interactive calls
+        await asyncio.wait_for(scheduler.acquire("interactive"), timeout=1)
+        waiter.cancel()
+
+    async def test_full_queue_rejects(self):
+        scheduler = make_scheduler(slots=1, queue_limit=1)
+        await scheduler.acquire("interactive")
+        waiter = asyncio.create_task(scheduler.acquire("interactive"))
+        await settle()
+
+        with pytest.raises(LLMQueueFullError):
+            scheduler.admit("interactive")
+        with pytest.raises(LLMQueueFullError):
+            await scheduler.acquire("interactive")
+        assert scheduler.stats()["interactive"]["rejected"] == 2
+        waiter.cancel()
+
+    async def test_cancelled_waiter_leaves_the_queue(self):
+        scheduler = make_scheduler(slots=1)
+        await scheduler.acquire("interactive")
+        waiter = asyncio.create_task(scheduler.acquire("interactive"))
+        await settle()
+
+        waiter.cancel()
+        await settle()
+        assert scheduler.stats()["interactive"]["queued"] == 0
+        scheduler.release("interactive")
+        assert scheduler.stats()["interactive"]["active"] == 0
+
+    async def test_slot_granted_to_a_cancelled_waiter_is_handed_on(self):
+        scheduler = make_scheduler(slots=1)
+        await scheduler.acquire("interactive")
+        first = asyncio.create_task(scheduler.acquire("interactive"))
+        second = asyncio.create_task(scheduler.acquire("interactive"))
+        await settle()
+
+        # The slot goes to the first waiter, which is cancelled before it resumes
+        scheduler.release("interactive")
+        first.cancel()
+        await settle()
+        assert first.cancelled()
+        assert second.done()
+        assert scheduler.stats()["interactive"]["active"] == 1
+
+    async def test_slot_context_releases_on_error(self):
+        scheduler = make_scheduler(slots=1)
+        with pytest.raises(RuntimeError):
+            async with scheduler.slot("interactive"):
+                raise RuntimeError("llama.cpp went away")
+        assert scheduler.stats()["interactive"]["active"] == 0
@@ -0,0 +1,52 @@
+"""
+Tests for prompt budgeting.
+
+These run without the API or an LLM.
+"""
+from langchain_core.prompts import PromptTemplate
+
+from services.api.agent.llm import get_structured_llm
+from services.api.agent.schemas import PlanResponse, ToolSelection
+from services.api.agent.tokens import TRUNCATION_MARKER, PromptSection, fit_prompt
+from services.api.core.config import settings
+
+PROMPT = PromptTemplate.from_template("# History\n{messages}\n# Question\n{question}")
+HISTORY = "\n".join(f"User: question {index} about the waiver wire" for index in range(200))
+
+
+class TestFitPrompt:
+    """Tests for fit_prompt section budgeting."""
+
+    def test_lower_priority_sections_are_truncated_first(self):
+        sections = [
+            PromptSection(name="question", text="Who should I pick up?", priority=0, required=True),
+            PromptSection(name="messages", text=HISTORY, priority=1, keep="tail"),
+        ]
+        formatted = fit_prompt(PROMPT, sections, "test", budget=200)
+        assert "Who should I pick up?" in formatted
+        assert TRUNCATION_MARKER in formatted
+        assert "question 199" in formatted and "question 0 " not in formatted
+
+    def test_required_section_is_never_truncated(self):
+        question = "Rank these players for the rest of the season: " + ", ".join(f"player {index}" for index in range(300))
+        sections = [
+            PromptSection(name="question", text=question, priority=0, required=True),
+            PromptSection(name="messages", text=HISTORY, priority=1, keep="tail"),
+        ]
+        formatted = fit_prompt(PROMPT, sections, "test", budget=200)
+        assert question in formatted
+        assert "question 199" not in formatted
+
+
+def test_structured_llm_reserves_the_response_tokens():
+    """The completion cap matches the share of the context prompts leave for it."""
+    structured = get_structured_llm("test-model", 0.0, PlanResponse, base_url="http://localhost:1")
+    # GrammarStructuredLLM binds the response format onto the shared ChatOpenAI
+    assert structured.llm.bound.max_tokens == settings.LLM_RESPONSE_TOKENS
+
+
+def test_executor_grammar_only_covers_the_tool_selection():
+    """The executor fills in the execution fields, so the model is not asked for them."""
+    structured = get_structured_llm("test-model", 0.0, ToolSelection, base_url="http://localhost:1")
+    schema = structured.llm.kwargs["response_format"]["json_schema"]["schema"]
+    assert set(schema["properties"]) == {"tool", "parameters"}
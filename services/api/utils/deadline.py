@@ -0,0 +1,94 @@
+"""
+Per-request deadlines and client-disconnect cancellation.
+
+A deadline is set once per request and read from a context variable by
+everything downstream (graph nodes, the LLM scheduler, LLM calls, MCP tool
+calls), so each wait is bounded by what is left of the request's budget rather
+than its own timeout. Cancelling an in-flight LLM call closes its connection to
+llama.cpp, which stops the generation and frees the slot.
+"""
+import asyncio
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Awaitable, Iterator, Optional, TypeVar
+from starlette.requests import Request
+
+T = TypeVar("T")
+
+# Seconds between checks for a disconnected client
+DISCONNECT_POLL_SECONDS = 0.5
+
+_deadline: ContextVar[Optional[float]] = ContextVar("deadline", default=None)
+
+class DeadlineExceededError(Exception):
+    """Raised when a request's deadline passes; surfaced to clients as 504."""
+
+    def __init__(self, operation: str = "request"):
+        super().__init__(f"Deadline exceeded during {operation}")
+        self.operation = operation
+
+class ClientDisconnectedError(Exception):
+    """Raised when the client went away before its request finished."""
+
+@contextmanager
+def deadline_scope(seconds: float) -> Iterator[float]:
+    """Run a block under a deadline `seconds` from now (or the enclosing one, if sooner)."""
+    deadline = time.monotonic() + seconds
+    enclosing = _deadline.get()
+    if enclosing is not None:
+        deadline = min(deadline, enclosing)
+    token = _deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _deadline.reset(token)
+
+def remaining() -> Optional[float]:
+    """Seconds left before the current deadline, or None without one."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+def check_deadline(operation: str = "request") -> None:
+    """Raise DeadlineExceededError if the current deadline has passed."""
+    left = remaining()
+    if left is not None and left <= 0:
+        raise DeadlineExceededError(operation)
+
+async def with_deadline(awaitable: Awaitable[T], operation: str = "request") -> T:
+    """Await within the current deadline, cancelling the awaitable when it passes."""
+    left = remaining()
+    if left is None:
+        return await awaitable
+    if left <= 0:
+        if asyncio.iscoroutine(awaitable):
+            awaitable.close()
+        raise DeadlineExceededError(operation)
+    # asyncio.timeout cancels in the current task, so context variables set by
+    # the awaitable (e.g. an async generator's __anext__) stay in its context
+    try:
+        async with asyncio.timeout(left):
+            return await awaitable
+    except TimeoutError:
+        raise DeadlineExceededError(operation) from None
+
+async def cancel_on_disconnect(request: Request, awaitable: Awaitable[T]) -> T:
+    """
+    Await while watching the client connection, cancelling the work if it goes away.
+
+    Raises ClientDisconnectedError when the client disconnected first.
+    """
+    task = asyncio.ensure_future(awaitable)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=DISCONNECT_POLL_SECONDS)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                task.cancel()
+                raise ClientDisconnectedError("Client disconnected")
+    finally:
+        if not task.done():
+            task.cancel()
@@ -0,0 +1,238 @@
+"""
+Span-based request tracing.
+
+Spans nest through a context variable, so code only has to open a span where
+the work happens; a request, its graph nodes, LLM calls and tool calls end up
+in one trace. Each finished trace is exported as an OTLP/JSON
+ExportTraceServiceRequest, appended as one line to TRACE_FILE and/or POSTed to
+an OTLP/HTTP collector at TRACE_OTLP_ENDPOINT, and summarized per span name in
+the response's Server-Timing header.
+"""
+import asyncio
+import functools
+import inspect
+import json
+import os
+import secrets
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional
+import httpx
+
+from services.api.core.config import settings
+from services.api.utils.logger import logger
+
+class Trace:
+    """The spans of one request (or background job)."""
+
+    def __init__(self):
+        self.trace_id = secrets.token_hex(16)
+        self.spans: List["Span"] = []
+        self.finished = False
+
+class Span:
+    """A timed operation with attributes."""
+
+    def __init__(self, name: str, trace: Trace, parent: Optional["Span"] = None, attributes: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.trace = trace
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent.span_id if parent else None
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.error: Optional[str] = None
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e6
+
+    def to_otlp(self) -> dict:
+        span = {
+            "traceId": self.trace.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 2 if self.parent_id is None else 1,  # SERVER for roots, INTERNAL otherwise
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns or time.time_ns()),
+            "attributes": [{"key": key, "value": otlp_value(value)} for key, value in self.attributes.items() if value is not None],
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 1},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+def otlp_value(value: Any) -> dict:
+    """Encode an attribute value as an OTLP AnyValue."""
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+def current_span() -> Optional[Span]:
+    """The innermost open span, if any."""
+    return _current_span.get()
+
+def set_span_attributes(**attributes: Any) -> None:
+    """Add attributes to the innermost open span; a no-op outside a trace."""
+    span = _current_span.get()
+    if span is not None:
+        span.set(**attributes)
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Span]:
+    """
+    Time a block as a span.
+
+    The span is a child of the current span, or the root of a new trace if there
+    is none (or the enclosing trace has already been exported, as for background
+    tasks that outlive their request). A root span exports its trace when it ends.
+    """
+    parent = _current_span.get()
+    if parent is None or parent.trace.finished:
+        parent = None
+    trace = parent.trace if parent else Trace()
+    current = Span(name, trace, parent, attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        current.end_ns = time.time_ns()
+        _current_span.reset(token)
+        trace.spans.append(current)
+        if parent is None:
+            trace.finished = True
+            trace_exporter.export(trace)
+
+def traced(name: str) -> Callable:
+    """Decorate a sync or async function so each call runs in a span."""
+    def decorator(func: Callable) -> Callable:
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def server_timing(trace: Trace) -> str:
+    """
+    Summarize a trace as a Server-Timing header value.
+
+    Spans are aggregated by name (total duration, with the call count in the
+    description when a name occurs more than once).
+    """
+    totals: Dict[str, List[float]] = {}
+    for finished in trace.spans:
+        totals.setdefault(finished.name, []).append(finished.duration_ms)
+    return ", ".join(
+        f"{name};dur={sum(durations):.1f}" + (f';desc="x{len(durations)}"' if len(durations) > 1 else "")
+        for name, durations in totals.items()
+    )
+
+class TraceExporter:
+    """Writes finished traces as OTLP/JSON to a file and/or an OTLP/HTTP collector."""
+
+    def __init__(self, path: str, endpoint: str, service_name: str):
+        self.path = path
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self._client: Optional[httpx.AsyncClient] = None
+        self._tasks: set = set()
+
+    def payload(self, trace: Trace) -> dict:
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": self.service_name}}]},
+                "scopeSpans": [{"scope": {"name": __name__}, "spans": [finished.to_otlp() for finished in trace.spans]}],
+            }]
+        }
+
+    def export(self, trace: Trace) -> None:
+        """Export a trace without blocking the caller."""
+        if not (self.path or self.endpoint):
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        task = loop.create_task(self._export(self.payload(trace)))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _write(self, line: str) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+    async def _export(self, payload: dict) -> None:
+        try:
+            if self.path:
+                await asyncio.to_thread(self._write, json.dumps(payload, default=str))
+            if self.endpoint:
+                if self._client is None:
+                    self._client = httpx.AsyncClient(timeout=5.0)
+                await self._client.post(self.endpoint, json=payload)
+        except Exception as e:
+            logger.warning(f"Trace export failed: {type(e).__name__}: {e}")
+
+    async def aclose(self) -> None:
+        """Flush pending exports and close the collector client."""
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+class TracingMiddleware:
+    """
+    ASGI middleware that runs each HTTP request in a root span.
+
+    Adds Server-Timing (spans finished before the response headers are sent, so a
+    streamed response only covers its setup) and X-Response-Time headers. The
+    root span, and the trace export, end once the response body has been sent.
+    """
+
+    def __init__(self, app: Any):
+        self.app = app
+
+    async def __call__(self, scope: dict, receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with span(f"{scope['method']} {scope['path']}", **{"http.method": scope["method"], "http.route": scope["path"]}) as root:
+            async def send_with_timing(message: dict) -> None:
+                if message["type"] == "http.response.start":
+                    root.set(**{"http.status_code": message["status"]})
+                    headers = list(message.get("headers", []))
+                    timing = server_timing(root.trace)
+                    headers.append((b"server-timing", f"{timing}, total;dur={root.duration_ms:.1f}".lstrip(", ").encode("latin-1")))
+                    headers.append((b"x-response-time", f"{root.duration_ms / 1000:.4f}s".encode("latin-1")))
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            await self.app(scope, receive, send_with_timing)
+
+# Global trace exporter instance
+trace_exporter = TraceExporter(path=settings.TRACE_FILE, endpoint=settings.TRACE_OTLP_ENDPOINT, service_name=settings.NAME)
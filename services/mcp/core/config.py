@@ -15,4 +15,10 @@ class Settings(BaseSettings):
     SLEEPER_API_URL: str = "https://api.sleeper.app/v1"
     NFL_YEAR: int = 2025
 
+    # Trending players cache
+    TRENDING_LOOKBACK_HOURS: list[int] = [24, 72, 168]
+    TRENDING_LIMIT: int = 50
+    TRENDING_REFRESH_SECONDS: int = 900
+    PLAYER_INDEX_REFRESH_SECONDS: int = 86400
+
 settings = Settings()
\ No newline at end of file
@@ -334,6 +334,34 @@ def get_all_draft_picks(draft_id):
         else:
             raise Exception(f"Failed to fetch draft picks from draft {draft_id}: {response.status_code}")
 
+def get_nfl_players():
+    """
+    Args:
+        - None
+    Returns:
+        - A dictionary of all NFL players keyed by player_id. The payload is ~5MB,
+          so Sleeper asks that it be fetched at most once per day.
+    Example:
+        {
+            "3086": {
+                "player_id": "3086",
+                "full_name": "Tom Brady",
+                "position": "QB",
+                "team": "NE",
+                "active": true,
+                ...
+            },
+            ...
+        }
+    """
+    url = f"{sleeper_api_url}/players/nfl"
+    with httpx.Client() as client:
+        response = client.get(url)
+        if response.status_code == 200:
+            return response.json()
+        else:
+            raise Exception(f"Failed to fetch NFL players: {response.status_code}")
+
 def get_trending_players(type: str, hours: int = 24, limit: int = 50):
     """
     Args:
@@ -362,7 +390,7 @@ def get_trending_players(type: str, hours: int = 24, limit: int = 50):
     if limit > 100:
         raise Exception(f"Invalid limit: {limit}. Must be less than 100.")
 
-    url = f"{sleeper_api_url}/players/nfl/trending/{type}/lookback_hours={hours}&limit={limit}"
+    url = f"{sleeper_api_url}/players/nfl/trending/{type}?lookback_hours={hours}&limit={limit}"
     with httpx.Client() as client:
         response = client.get(url)
         if response.status_code == 200:
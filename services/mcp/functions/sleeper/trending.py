@@ -0,0 +1,132 @@
+
+import threading
+import time
+from services.mcp.core.config import settings
+from services.mcp.functions.sleeper.api import get_trending_players
+from services.mcp.functions.sleeper.players import get_fantasy_players
+
+# Sleeper aggregates add/drop trends over hours, so a background thread keeps
+# every configured lookback window warm and tools only ever read from memory.
+# Snapshots are rebuilt and swapped in whole under the lock, so readers never
+# need it and never see a half-written cache. The server starts the thread at
+# boot, and the first cache read starts it wherever the tools are imported
+# without it, so windows filled by the cold-start fallback are kept fresh too.
+_trending: dict[tuple[str, int], list[dict]] = {}
+_trending_refreshed_at: dict[tuple[str, int], float] = {}
+_player_index: dict[str, dict] = {}
+_refreshed_at: dict[str, float] = {"players": 0.0}
+_refresh_lock = threading.Lock()
+_start_lock = threading.Lock()
+_stop_event = threading.Event()
+_refresher: threading.Thread | None = None
+
+def refresh_player_index() -> None:
+    """
+    - Reloads the player_id -> metadata index used to enrich trending players
+    - Keeps the previous index if Sleeper is unavailable
+    """
+    global _player_index
+    players = get_fantasy_players(positions=["QB", "RB", "WR", "TE", "K", "DEF"])
+    if not players:
+        print("refresh_player_index(): No players loaded, keeping previous index.")
+        return
+    _player_index = players
+    _refreshed_at["players"] = time.time()
+    print(f"refresh_player_index(): Indexed {len(players)} players.")
+
+def enrich_trending_player(trending_player: dict) -> dict:
+    """
+    - Joins a raw Sleeper trend ({"player_id", "count"}) with player metadata
+    """
+    player_id = trending_player.get("player_id")
+    player = _player_index.get(player_id, {})
+    return {
+        "player_id": player_id,
+        "full_name": player.get("full_name"),
+        "position": player.get("position"),
+        "headshot": player.get("headshot"),
+        "count": trending_player.get("count", 0),
+    }
+
+def fetch_trending_window(trend_type: str, hours: int) -> list[dict]:
+    """
+    - Fetches and enriches a single trend type / lookback window from Sleeper
+    """
+    raw = get_trending_players(trend_type, hours, settings.TRENDING_LIMIT)
+    return [enrich_trending_player(player) for player in raw]
+
+def refresh_trending_players() -> None:
+    """
+    - Pulls add/drop trends for every configured lookback window
+    - Windows that fail to refresh keep serving their previous snapshot
+    """
+    for trend_type in ("add", "drop"):
+        for hours in settings.TRENDING_LOOKBACK_HOURS:
+            try:
+                store_trending_window(trend_type, hours, fetch_trending_window(trend_type, hours))
+            except Exception as e:
+                print(f"refresh_trending_players(): Failed to refresh {trend_type}/{hours}h: {e}")
+
+def store_trending_window(trend_type: str, hours: int, players: list[dict]) -> None:
+    """
+    - Swaps a freshly fetched window into the cache, with its own refresh time
+    """
+    global _trending, _trending_refreshed_at
+    with _refresh_lock:
+        snapshot = dict(_trending)
+        snapshot[(trend_type, hours)] = players
+        refreshed_at = dict(_trending_refreshed_at)
+        refreshed_at[(trend_type, hours)] = time.time()
+        _trending, _trending_refreshed_at = snapshot, refreshed_at
+
+def get_cached_trending_players(trend_type: str, hours: int, limit: int) -> dict:
+    """
+    - Serves trending players from memory, snapping to the closest cached lookback window
+    - Falls back to a single live fetch only while the cache is still warming up
+    - Starts the background refresher if it is not already running
+    """
+    if trend_type not in ["add", "drop"]:
+        raise Exception(f"Invalid trend_type: {trend_type}. Must be 'add' or 'drop'.")
+    if limit < 1:
+        raise Exception(f"Invalid limit: {limit}. Must be greater than 0.")
+    start_trending_refresher()
+
+    window = min(settings.TRENDING_LOOKBACK_HOURS, key=lambda cached_hours: abs(cached_hours - hours))
+    players = _trending.get((trend_type, window))
+    if players is None:
+        players = fetch_trending_window(trend_type, window)
+        store_trending_window(trend_type, window, players)
+
+    return {
+        "trend_type": trend_type,
+        "lookback_hours": window,
+        "refreshed_at": _trending_refreshed_at.get((trend_type, window), 0.0),
+        "players": players[:limit],
+    }
+
+def _run_refresher() -> None:
+    while not _stop_event.is_set():
+        if time.time() - _refreshed_at["players"] >= settings.PLAYER_INDEX_REFRESH_SECONDS:
+            refresh_player_index()
+        refresh_trending_players()
+        _stop_event.wait(settings.TRENDING_REFRESH_SECONDS)
+
+def start_trending_refresher() -> None:
+    """
+    - Starts the background refresher thread (idempotent)
+    """
+    global _refresher
+    if _refresher and _refresher.is_alive():
+        return
+    with _start_lock:
+        if _refresher and _refresher.is_alive():
+            return
+        _stop_event.clear()
+        _refresher = threading.Thread(target=_run_refresher, name="trending-refresher", daemon=True)
+        _refresher.start()
+
+def stop_trending_refresher() -> None:
+    """
+    - Signals the background refresher thread to exit
+    """
+    _stop_event.set()
@@ -7,6 +7,8 @@ from services.mcp.tools.sleeper_draft import get_all_draft_picks_metadata, get_l
 from services.mcp.tools.sleeper_league import get_league_rosters_metadata, get_users_teams
 from services.mcp.tools.sleeper_team import get_user_roster, get_user_record, get_waiver_budget
 from services.mcp.tools.sleeper_user import get_nfl_leagues_user_metadata, get_current_league_records, get_previous_league_records
+from services.mcp.tools.sleeper_trending import get_trending_players_metadata
+from services.mcp.functions.sleeper.trending import start_trending_refresher
 # from services.mcp.tools.reddit import reddit_search
 
 # from services.mcp.resources.quarterbacks import quarterback_strategy
@@ -29,6 +31,7 @@ mcp_tools = [
     get_nfl_leagues_user_metadata,
     get_current_league_records,
     get_previous_league_records,
+    get_trending_players_metadata,
     # reddit_search
 ]
 
@@ -58,4 +61,5 @@ async def health_check(request: Request) -> PlainTextResponse:
     return PlainTextResponse("OK")
 
 if __name__ == "__main__":
+    start_trending_refresher()
     mcp.run(transport="http", host="0.0.0.0", port=8001, path="/mcp")
\ No newline at end of file
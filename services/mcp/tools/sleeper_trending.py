@@ -0,0 +1,17 @@
+
+from services.mcp.functions.sleeper.trending import get_cached_trending_players
+
+def get_trending_players_metadata(trend_type: str = "add", lookback_hours: int = 24, limit: int = 25) -> dict:
+    """
+    Get the players most added or dropped across Sleeper leagues over a recent lookback window.
+    Parameters:
+        trend_type (str): Either 'add' or 'drop'
+        lookback_hours (int): Hours to look back; snapped to the nearest cached window (24, 72 or 168)
+        limit (int): Maximum number of players to return
+    Example:
+        get_trending_players_metadata("add", 24, 10)
+    Returns:
+        A dictionary with the lookback window used, when it was refreshed, and the
+        trending players (player_id, full_name, position, headshot, count).
+    """
+    return get_cached_trending_players(trend_type, lookback_hours, limit)